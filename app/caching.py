@@ -0,0 +1,88 @@
+"""HTTP response caching helpers for HTMX partials and read-only pages.
+
+A partial's ETag is a digest of the data it renders, so an unchanged
+partial is answered with 304 Not Modified before any template work.  Every
+ETag also includes a per-process boot token, so pages cached by browsers
+before a deploy (rendered by the old templates) are re-rendered after it.
+memoize_html() keeps whole rendered bodies for routes that cannot change.
+"""
+import functools
+import hashlib
+import os
+import threading
+import time
+from typing import Callable
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from app.dependencies import request_today
+
+
+# Differs for every process start, so no ETag survives a restart or upgrade.
+_BOOT_TOKEN = f"{os.getpid()}-{time.time_ns()}"
+
+
+def compute_etag(*parts) -> str:
+    """Return a weak ETag for the given render inputs (must have a stable repr)."""
+    digest = hashlib.blake2b(repr((_BOOT_TOKEN, parts)).encode("utf-8"), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {tag.strip() for tag in header.split(",")}
+    return "*" in candidates or etag in candidates or etag[2:] in candidates
+
+
+def conditional_response(request: Request, etag: str, render: Callable[[], Response]) -> Response:
+    """Answer 304 if the client already has etag, else call render() and tag the result.
+
+    Responses are marked no-cache so browsers revalidate on every HTMX swap.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response = render()
+    response.headers.update(headers)
+    return response
+
+
+def memoize_html(ttl: float, max_entries: int = 256):
+    """Cache a sync route's rendered 200 responses for ttl seconds.
+
+    Only for routes whose output depends on nothing but the URL and the date
+    (e.g. the read-only demo pages). The wrapped route must take `request`.
+    The oldest entry is evicted once max_entries is reached, so arbitrary
+    query strings can't grow the cache without bound.
+    """
+    def decorator(func):
+        entries: dict[tuple, tuple[float, bytes, dict]] = {}
+        # Sync routes run on the threadpool; eviction must not race a concurrent one.
+        lock = threading.Lock()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            request = kwargs["request"]
+            key = (request.url.path, request.url.query, request_today(request))
+            now = time.monotonic()
+            hit = entries.get(key)
+            if hit is not None and hit[0] > now:
+                etag = hit[2].get("etag")
+                if etag and _matches(request, etag):
+                    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+                return Response(hit[1], headers=hit[2])
+            response = func(*args, **kwargs)
+            if response.status_code == 200:
+                headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+                with lock:
+                    if key not in entries and len(entries) >= max_entries:
+                        entries.pop(next(iter(entries), None), None)
+                    entries[key] = (now + ttl, response.body, headers)
+            return response
+
+        wrapper.cache_clear = entries.clear
+        return wrapper
+    return decorator
@@ -1,26 +1,40 @@
 import os
-from itsdangerous import URLSafeTimedSerializer
+from datetime import date
+from functools import lru_cache
+from itsdangerous import BadSignature, TimestampSigner, URLSafeTimedSerializer
+from itsdangerous.encoding import base64_encode
 from fastapi import Request
 
 SESSION_COOKIE = "mp_session"
 SESSION_MAX_AGE = 60 * 60 * 24 * 7  # 7 days
 
+# The session payload is always the JSON string "ok"; encode it once instead
+# of serializing on every login. Tokens stay identical to
+# URLSafeTimedSerializer(key).dumps("ok").
+_SESSION_PAYLOAD = base64_encode(b'"ok"')
 
-def _get_signer() -> URLSafeTimedSerializer:
-    key = os.environ.get("SECRET_KEY", "dev-secret-change-in-production")
-    return URLSafeTimedSerializer(key)
+
+@lru_cache(maxsize=1)
+def _signer_for(key: str) -> TimestampSigner:
+    serializer = URLSafeTimedSerializer(key)
+    return serializer.make_signer(serializer.salt)
+
+
+def _get_signer() -> TimestampSigner:
+    """Return the session signer, reusing it while SECRET_KEY is unchanged."""
+    return _signer_for(os.environ.get("SECRET_KEY", "dev-secret-change-in-production"))
 
 
 def create_session_token() -> str:
-    return _get_signer().dumps("ok")
+    return _get_signer().sign(_SESSION_PAYLOAD).decode("ascii")
 
 
 def verify_session_token(token: str) -> bool:
     try:
-        _get_signer().loads(token, max_age=SESSION_MAX_AGE)
-        return True
-    except Exception:
+        payload = _get_signer().unsign(token, max_age=SESSION_MAX_AGE)
+    except (BadSignature, UnicodeError):
         return False
+    return payload == _SESSION_PAYLOAD
 
 
 # Paths that don't require auth
@@ -28,4 +42,16 @@ _PUBLIC_PREFIXES = ("/login", "/static", "/demo", "/help")
 
 
 def is_public(path: str) -> bool:
-    return any(path.startswith(p) for p in _PUBLIC_PREFIXES)
+    return path.startswith(_PUBLIC_PREFIXES)
+
+
+def request_today(request: Request) -> date:
+    """Return the date stamped on this request by auth_middleware.
+
+    Every handler and partial in one request sees the same "today", even
+    across midnight. Falls back to date.today() if the stamp is missing.
+    """
+    today = getattr(request.state, "today", None)
+    if today is None:
+        today = request.state.today = date.today()
+    return today
@@ -1,5 +1,6 @@
 import os
 from contextlib import asynccontextmanager
+from datetime import date
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -11,22 +12,30 @@ from fastapi.staticfiles import StaticFiles
 
 from meal_planner.db.database import init_db
 from app.dependencies import verify_session_token, is_public, SESSION_COOKIE
-from app.routers import auth, pantry, recipes, meal_plan, shopping, stores, settings, demo, help, admin, staples, known_prices
+from app.templating import warm_templates
+from app.routers import auth, pantry, recipes, meal_plan, shopping, stores, settings, demo, help, admin, staples, known_prices, batch
+
+STATIC_DIR = Path(__file__).parent / "static"
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Initialize main DB
     init_db()
+    # Compile templates up front so first page loads skip Jinja parsing
+    # (and fill the on-disk bytecode cache). Skipped in DEBUG, where
+    # templates reload on edit anyway.
+    if not os.environ.get("DEBUG"):
+        warm_templates()
     # Ensure photo upload directory exists
-    uploads_dir = Path(__file__).parent / "static" / "uploads" / "recipes"
+    uploads_dir = STATIC_DIR / "uploads" / "recipes"
     uploads_dir.mkdir(parents=True, exist_ok=True)
     # Initialize and seed demo DB if DEMO_DB_URL is set
     demo_url = os.environ.get("DEMO_DB_URL")
     if demo_url:
-        from meal_planner.db.database import override_db_path
+        from meal_planner.db.database import override_db_path, shared_connection
         from demo.seed import seed_if_empty
-        with override_db_path(Path(demo_url)):
+        with override_db_path(Path(demo_url)), shared_connection():
             init_db()
             seed_if_empty()
     yield
@@ -34,11 +43,12 @@ async def lifespan(app: FastAPI):
 
 app = FastAPI(lifespan=lifespan)
 
-app.mount("/static", StaticFiles(directory=Path(__file__).parent / "static"), name="static")
+app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 
 
 @app.middleware("http")
 async def auth_middleware(request: Request, call_next):
+    request.state.today = date.today()
     if not is_public(request.url.path):
         token = request.cookies.get(SESSION_COOKIE)
         if not token or not verify_session_token(token):
@@ -58,3 +68,4 @@ app.include_router(settings.router)
 app.include_router(demo.router)
 app.include_router(help.router)
 app.include_router(admin.router)
+app.include_router(batch.router)
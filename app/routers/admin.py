@@ -4,13 +4,14 @@ from pathlib import Path
 
 from fastapi import APIRouter, Request, UploadFile, File
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 
-from meal_planner.db.database import get_db_path, get_connection
-from meal_planner.config import get_setting, set_setting
+from meal_planner.db.database import get_db_path, get_connection, init_db, reset_connections
+from meal_planner.config import get_setting, set_setting, invalidate_cache as invalidate_settings
+from meal_planner.core import recipes as recipes_core, stores as stores_core
+from meal_planner.core import ai_assistant, shopping_list
+from app.templating import templates
 
 router = APIRouter(prefix="/admin", tags=["admin"])
-templates = Jinja2Templates(directory=Path(__file__).parent.parent / "templates")
 
 _SQLITE_MAGIC = b"SQLite format 3\x00"
 
@@ -49,12 +50,13 @@ def do_migrate(request: Request, db_file: UploadFile = File(...)):
 
     db_path = get_db_path()
 
-    # Write to a temp file alongside the target, then atomically replace
+    # Write to a temp file alongside the target, then copy it into the live DB
     tmp = Path(tempfile.mktemp(dir=db_path.parent, suffix=".db.tmp"))
     try:
         tmp.write_bytes(data)
-        # Mark migration done inside the uploaded DB before replacing
+        # Mark migration done inside the uploaded DB before copying
         conn = None
+        dest = None
         try:
             import sqlite3
             conn = sqlite3.connect(str(tmp))
@@ -64,10 +66,26 @@ def do_migrate(request: Request, db_file: UploadFile = File(...)):
                 "INSERT OR REPLACE INTO settings (key, value) VALUES ('migration_done', '1')"
             )
             conn.commit()
+            # The live DB runs in WAL mode, so swapping the file underneath it
+            # could leave its -wal/-shm files paired with the wrong database.
+            # The backup API replaces the contents in one transaction instead.
+            dest = get_connection(db_path)
+            conn.backup(dest)
         finally:
             if conn:
                 conn.close()
-        tmp.replace(db_path)
+            if dest:
+                dest.close()
+        tmp.unlink()
+        # An export from an older version lacks newer tables and indexes
+        # (e.g. the ON CONFLICT targets of the meal plan and price upserts).
+        init_db(db_path)
+        reset_connections()
+        invalidate_settings()
+        stores_core.invalidate_cache()
+        recipes_core.invalidate_cache()
+        shopping_list.invalidate_cache()
+        ai_assistant.invalidate_cache()
     except Exception as e:
         tmp.unlink(missing_ok=True)
         return templates.TemplateResponse(request, "admin_migrate.html", {
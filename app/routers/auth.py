@@ -1,12 +1,10 @@
 import os
 from fastapi import APIRouter, Request, Form
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
-from pathlib import Path
 from app.dependencies import create_session_token, SESSION_COOKIE, SESSION_MAX_AGE
+from app.templating import templates
 
 router = APIRouter(tags=["auth"])
-templates = Jinja2Templates(directory=Path(__file__).parent.parent / "templates")
 
 def _app_password() -> str:
     """Read APP_PASSWORD at call time so tests can set it via env."""
@@ -0,0 +1,118 @@
+"""POST /batch — run several app requests in one HTTP round-trip.
+
+Body: {"requests": [{"id": ..., "method": "GET", "url": "/recipes/list", "body": ...}]}
+Each sub-request is dispatched through the full ASGI app (auth middleware
+included) with the caller's headers.  Runs of consecutive GETs execute
+concurrently; any other method is a mutation and runs on its own, in order,
+so a later read always sees the writes listed before it.
+
+Response: {"responses": [{"id": ..., "status": 200, "body": "..."}]} in input order.
+"""
+
+import asyncio
+from urllib.parse import urlencode, urlsplit
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+router = APIRouter(tags=["batch"])
+
+MAX_BATCH_SIZE = 20
+_METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE"}
+# Headers that describe the outer /batch body rather than the sub-request.
+_SKIP_HEADERS = {b"content-length", b"content-type"}
+# Scope keys that carry over from the outer request unchanged.
+_SCOPE_KEYS = ("type", "asgi", "http_version", "scheme", "server", "client", "root_path")
+
+
+def _parse_item(item) -> tuple:
+    if not isinstance(item, dict):
+        raise HTTPException(status_code=422, detail="Each batch entry must be an object")
+    method = str(item.get("method") or "GET").upper()
+    url = item.get("url")
+    if method not in _METHODS:
+        raise HTTPException(status_code=422, detail=f"Unsupported method: {method}")
+    if not isinstance(url, str) or not url.startswith("/"):
+        raise HTTPException(status_code=422, detail="Batch URLs must be app-relative paths")
+    if urlsplit(url).path.rstrip("/") == "/batch":
+        raise HTTPException(status_code=422, detail="Batches cannot be nested")
+    return item.get("id"), method, url, item.get("body")
+
+
+def _encode_body(body) -> tuple[bytes, bytes | None]:
+    """Return (raw body, content type) for a sub-request body."""
+    if body is None:
+        return b"", None
+    if isinstance(body, dict):
+        return urlencode(body, doseq=True).encode(), b"application/x-www-form-urlencoded"
+    return str(body).encode(), b"text/plain; charset=utf-8"
+
+
+async def _dispatch(request: Request, method: str, url: str, body) -> tuple[int, str]:
+    """Run one sub-request through the app and return (status, body text)."""
+    parts = urlsplit(url)
+    raw_body, content_type = _encode_body(body)
+    headers = [(k, v) for k, v in request.scope["headers"] if k not in _SKIP_HEADERS]
+    headers.append((b"content-length", str(len(raw_body)).encode()))
+    if content_type:
+        headers.append((b"content-type", content_type))
+    scope = {k: request.scope[k] for k in _SCOPE_KEYS if k in request.scope}
+    scope.update(
+        method=method,
+        path=parts.path,
+        raw_path=parts.path.encode(),
+        query_string=parts.query.encode(),
+        headers=headers,
+    )
+
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": raw_body, "more_body": False}
+
+    status = 500
+    chunks: list[bytes] = []
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await request.app(scope, receive, send)
+    return status, b"".join(chunks).decode("utf-8", errors="replace")
+
+
+@router.post("/batch")
+async def batch(request: Request):
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Body must be JSON")
+    items = payload.get("requests") if isinstance(payload, dict) else None
+    if not isinstance(items, list):
+        raise HTTPException(status_code=422, detail='Expected {"requests": [...]}')
+    if len(items) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=422, detail=f"At most {MAX_BATCH_SIZE} requests per batch")
+    parsed = [_parse_item(item) for item in items]
+
+    results: list[tuple[int, str]] = []
+    reads: list = []
+    for _, method, url, body in parsed:
+        if method == "GET":
+            reads.append(_dispatch(request, method, url, body))
+            continue
+        results.extend(await asyncio.gather(*reads))
+        reads = []
+        results.append(await _dispatch(request, method, url, body))
+    results.extend(await asyncio.gather(*reads))
+
+    return JSONResponse({"responses": [
+        {"id": req_id, "status": status, "body": text}
+        for (req_id, _, _, _), (status, text) in zip(parsed, results)
+    ]})
@@ -4,26 +4,47 @@ Sets db path override ContextVar so all core/ functions use demo.db.
 Write operations (POST/DELETE) are blocked for most routes; only
 /demo/shopping/generate is allowed (it's read-only computation).
 """
+import asyncio
 import os
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 
 from fastapi import APIRouter, Request
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 
-from meal_planner.db.database import override_db_path
+from meal_planner.db.database import override_db_path, shared_connection
 from meal_planner.core import pantry as pantry_core, recipes as recipes_core
 from meal_planner.core import staples as staples_core
 from meal_planner.core import meal_plan as mp_core, stores as stores_core
 from meal_planner.core import known_prices as known_prices_core
 from meal_planner.core.shopping_list import generate as shopping_generate, format_shopping_list
+from app.caching import compute_etag, conditional_response, memoize_html
+from app.dependencies import request_today
+from app.templating import templates
 
 router = APIRouter(prefix="/demo", tags=["demo"])
-templates = Jinja2Templates(directory=Path(__file__).parent.parent / "templates")
+
+
+@lru_cache(maxsize=1)
+def _demo_db_path_for(url: str) -> Path:
+    return Path(url)
 
 
 def _demo_db_path() -> Path:
-    return Path(os.environ.get("DEMO_DB_URL", "data/demo.db"))
+    """Return the demo DB path, reusing the Path while DEMO_DB_URL is unchanged."""
+    return _demo_db_path_for(os.environ.get("DEMO_DB_URL", "data/demo.db"))
+
+
+@contextmanager
+def _demo_db():
+    """Point core/ at the demo DB, sharing one connection across the block."""
+    with override_db_path(_demo_db_path()), shared_connection():
+        yield
+
+
+# The demo DB is read-only, so rendered pages can be reused across visitors.
+_DEMO_CACHE_TTL = 300
 
 
 def _ctx(request: Request, active_tab: str, **kwargs) -> dict:
@@ -33,19 +54,16 @@ def _ctx(request: Request, active_tab: str, **kwargs) -> dict:
 # ── Pantry ─────────────────────────────────────────────────────────────────────
 
 @router.get("/pantry", response_class=HTMLResponse)
+@memoize_html(_DEMO_CACHE_TTL)
 def demo_pantry(request: Request):
-    with override_db_path(_demo_db_path()):
-        items = pantry_core.get_all()
-        stores = pantry_core.get_all_stores()
-        store_map = {s.id: s.name for s in stores}
-        expiring_ids = {i.id for i in pantry_core.get_expiring_soon(7)}
-        locations = [""] + pantry_core.get_locations()
-        categories = [""] + pantry_core.get_categories()
+    with _demo_db():
+        bundle = pantry_core.get_page_bundle(today=request_today(request))
     return templates.TemplateResponse(request, "pantry.html", _ctx(
         request, "pantry",
-        items=items, stores=stores, store_map=store_map,
-        expiring_ids=expiring_ids,
-        locations=locations, categories=categories,
+        items=bundle.items, stores=bundle.stores,
+        store_map={s.id: s.name for s in bundle.stores},
+        expiring_ids=bundle.expiring_ids,
+        locations=[""] + bundle.locations, categories=[""] + bundle.categories,
         filter_location="", filter_category="", today="",
         active_view="inventory",
     ))
@@ -54,8 +72,9 @@ def demo_pantry(request: Request):
 # ── Staples ────────────────────────────────────────────────────────────────────
 
 @router.get("/pantry/staples", response_class=HTMLResponse)
+@memoize_html(_DEMO_CACHE_TTL)
 def demo_staples(request: Request):
-    with override_db_path(_demo_db_path()):
+    with _demo_db():
         staple_list = staples_core.get_all()
     return templates.TemplateResponse(request, "partials/staples_list.html", {
         "staples": staple_list, "demo": True,
@@ -65,8 +84,9 @@ def demo_staples(request: Request):
 # ── Recipes ────────────────────────────────────────────────────────────────────
 
 @router.get("/recipes", response_class=HTMLResponse)
+@memoize_html(_DEMO_CACHE_TTL)
 def demo_recipes(request: Request):
-    with override_db_path(_demo_db_path()):
+    with _demo_db():
         recipe_list = recipes_core.get_all()
     return templates.TemplateResponse(request, "recipes.html", _ctx(
         request, "recipes", recipes=recipe_list,
@@ -74,8 +94,9 @@ def demo_recipes(request: Request):
 
 
 @router.get("/recipes/{recipe_id}", response_class=HTMLResponse)
+@memoize_html(_DEMO_CACHE_TTL)
 def demo_recipe_detail(request: Request, recipe_id: int):
-    with override_db_path(_demo_db_path()):
+    with _demo_db():
         recipe = recipes_core.get(recipe_id)
     return templates.TemplateResponse(request, "partials/recipe_detail.html", {
         "recipe": recipe, "demo": True,
@@ -85,73 +106,79 @@ def demo_recipe_detail(request: Request, recipe_id: int):
 # ── Meal plan ──────────────────────────────────────────────────────────────────
 
 @router.get("/meal-plan", response_class=HTMLResponse)
+@memoize_html(_DEMO_CACHE_TTL)
 def demo_meal_plan(request: Request, week: str = ""):
     from datetime import date as date_type
-    from meal_planner.core.meal_plan import get_week_start, MEAL_SLOTS
+    from meal_planner.core.meal_plan import get_week_start, week_dates, MEAL_SLOTS, DAY_NAMES
     from datetime import timedelta
 
+    today = request_today(request)
     try:
-        week_start = get_week_start(date_type.fromisoformat(week)) if week else get_week_start()
+        week_start = get_week_start(date_type.fromisoformat(week)) if week else get_week_start(today)
     except (ValueError, TypeError):
-        week_start = get_week_start()
+        week_start = get_week_start(today)
 
-    week_dates = [week_start + timedelta(days=i) for i in range(7)]
-    with override_db_path(_demo_db_path()):
+    with _demo_db():
         week_grid = mp_core.get_week(week_start)
 
     return templates.TemplateResponse(request, "meal_plan.html", _ctx(
         request, "meal_plan",
         week_start=week_start,
         week_str=week_start.isoformat(),
-        week_dates=week_dates,
-        day_names=["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"],
+        week_dates=week_dates(week_start),
+        day_names=DAY_NAMES,
         slots=MEAL_SLOTS,
         week_grid=week_grid,
         prev_week=(week_start + timedelta(days=-7)).isoformat(),
         next_week=(week_start + timedelta(days=7)).isoformat(),
-        today_week=get_week_start().isoformat(),
-        today=date_type.today().isoformat(),
+        today_week=mp_core.week_start_iso(today),
+        today=today.isoformat(),
     ))
 
 
 @router.get("/meal-plan/grid", response_class=HTMLResponse)
+@memoize_html(_DEMO_CACHE_TTL)
 def demo_meal_plan_grid(request: Request, week: str = ""):
     from datetime import date as date_type
-    from meal_planner.core.meal_plan import get_week_start, MEAL_SLOTS
+    from meal_planner.core.meal_plan import get_week_start, week_dates, MEAL_SLOTS, DAY_NAMES
     from datetime import timedelta
 
+    today = request_today(request)
     try:
-        week_start = get_week_start(date_type.fromisoformat(week)) if week else get_week_start()
+        week_start = get_week_start(date_type.fromisoformat(week)) if week else get_week_start(today)
     except (ValueError, TypeError):
-        week_start = get_week_start()
+        week_start = get_week_start(today)
 
-    week_dates = [week_start + timedelta(days=i) for i in range(7)]
-    with override_db_path(_demo_db_path()):
+    with _demo_db():
         week_grid = mp_core.get_week(week_start)
 
-    return templates.TemplateResponse(request, "partials/meal_grid.html", {
+    ctx = {
         "demo": True,
         "week_start": week_start,
         "week_str": week_start.isoformat(),
-        "week_dates": week_dates,
-        "day_names": ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"],
+        "week_dates": week_dates(week_start),
+        "day_names": DAY_NAMES,
         "slots": MEAL_SLOTS,
         "week_grid": week_grid,
         "prev_week": (week_start + timedelta(days=-7)).isoformat(),
         "next_week": (week_start + timedelta(days=7)).isoformat(),
-        "today_week": get_week_start().isoformat(),
-        "today": date_type.today().isoformat(),
-    })
+        "today_week": mp_core.week_start_iso(today),
+        "today": today.isoformat(),
+    }
+    etag = compute_etag(week_grid, ctx["week_str"], ctx["today"])
+    return conditional_response(
+        request, etag,
+        lambda: templates.TemplateResponse(request, "partials/meal_grid.html", ctx),
+    )
 
 
 # ── Shopping ───────────────────────────────────────────────────────────────────
 
 @router.get("/shopping", response_class=HTMLResponse)
+@memoize_html(_DEMO_CACHE_TTL)
 def demo_shopping(request: Request):
-    from datetime import date as date_type, timedelta
-    from meal_planner.core import meal_plan as mp_core2
-    today = date_type.today()
-    week_start = mp_core2.get_week_start(today)
+    from datetime import timedelta
+    week_start = mp_core.get_week_start(request_today(request))
     return templates.TemplateResponse(request, "shopping.html", _ctx(
         request, "shopping",
         start_default=week_start.isoformat(),
@@ -159,14 +186,20 @@ def demo_shopping(request: Request):
     ))
 
 
+def _demo_shopping_list(start_date: str, end_date: str):
+    # Opens the demo DB inside the worker thread; sqlite connections can't
+    # cross threads.
+    with _demo_db():
+        shopping = shopping_generate(start_date, end_date, use_pantry=False)
+        return shopping, format_shopping_list(shopping)
+
+
 @router.post("/shopping/generate", response_class=HTMLResponse)
 async def demo_shopping_generate(request: Request):
     form = await request.form()
     start_date = form.get("start_date", "")
     end_date = form.get("end_date", "")
-    with override_db_path(_demo_db_path()):
-        shopping = shopping_generate(start_date, end_date, use_pantry=False)
-        plain_text = format_shopping_list(shopping)
+    shopping, plain_text = await asyncio.to_thread(_demo_shopping_list, start_date, end_date)
     return templates.TemplateResponse(request, "partials/shopping_list.html", {
         "shopping": shopping,
         "plain_text": plain_text,
@@ -179,8 +212,9 @@ async def demo_shopping_generate(request: Request):
 # ── Stores ─────────────────────────────────────────────────────────────────────
 
 @router.get("/stores", response_class=HTMLResponse)
+@memoize_html(_DEMO_CACHE_TTL)
 def demo_stores(request: Request):
-    with override_db_path(_demo_db_path()):
+    with _demo_db():
         store_list = stores_core.get_all()
         price_list = known_prices_core.get_all()
         store_map = {s.id: s.name for s in store_list}
@@ -3,10 +3,9 @@ from pathlib import Path
 import markdown
 from fastapi import APIRouter, Request
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
+from app.templating import templates
 
 router = APIRouter(prefix="/help", tags=["help"])
-templates = Jinja2Templates(directory=Path(__file__).parent.parent / "templates")
 
 _GUIDE_PATH = Path(__file__).parent.parent.parent / "USER_GUIDE.md"
 
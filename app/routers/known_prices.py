@@ -1,16 +1,13 @@
 """Known prices router — Price Book section within the Stores tab."""
-from pathlib import Path
-
 from fastapi import APIRouter, Request, Form
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 
 from meal_planner.core import known_prices as prices_core
 from meal_planner.core import stores as stores_core
 from meal_planner.core.ai_assistant import parse_receipt
+from app.templating import templates
 
 router = APIRouter(prefix="/stores/prices", tags=["known_prices"])
-templates = Jinja2Templates(directory=Path(__file__).parent.parent / "templates")
 
 
 def _price_list_ctx(store_id: int = 0):
@@ -1,42 +1,44 @@
 from datetime import date, timedelta
-from pathlib import Path
 
 from fastapi import APIRouter, Request, Form
-from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
+from fastapi.responses import HTMLResponse, Response
 
 from meal_planner.core import meal_plan as mp_core, recipes as recipes_core
 from meal_planner.core.ai_assistant import suggest_week
+from app.caching import compute_etag, conditional_response
+from app.dependencies import request_today
+from app.templating import templates
 
 router = APIRouter(prefix="/meal-plan", tags=["meal_plan"])
-templates = Jinja2Templates(directory=Path(__file__).parent.parent / "templates")
 
 SLOTS = mp_core.MEAL_SLOTS
-DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+DAY_NAMES = mp_core.DAY_NAMES
 
+# Writes answer 204 with this HX-Trigger; the grid re-fetches /meal-plan/grid.
+GRID_CHANGED = "meal-grid-changed"
 
-def _parse_week(week_str: str = None) -> date:
+
+def _parse_week(week_str: str, today: date) -> date:
     if week_str:
         try:
             return date.fromisoformat(week_str)
         except (ValueError, TypeError):
             pass
-    return mp_core.get_week_start()
+    return mp_core.get_week_start(today)
 
 
-def _week_context(week_start: date) -> dict:
-    week_dates = [week_start + timedelta(days=i) for i in range(7)]
+def _week_context(week_start: date, today: date) -> dict:
     return {
         "week_start": week_start,
         "week_str": week_start.isoformat(),
-        "week_dates": week_dates,
+        "week_dates": mp_core.week_dates(week_start),
         "day_names": DAY_NAMES,
         "slots": SLOTS,
         "week_grid": mp_core.get_week(week_start),
         "prev_week": (week_start - timedelta(days=7)).isoformat(),
         "next_week": (week_start + timedelta(days=7)).isoformat(),
-        "today_week": mp_core.get_week_start().isoformat(),
-        "today": date.today().isoformat(),
+        "today_week": mp_core.week_start_iso(today),
+        "today": today.isoformat(),
     }
 
 
@@ -44,19 +46,24 @@ def _week_context(week_start: date) -> dict:
 
 @router.get("", response_class=HTMLResponse)
 def meal_plan_page(request: Request, week: str = None):
-    week_start = _parse_week(week)
+    today = request_today(request)
+    week_start = _parse_week(week, today)
     return templates.TemplateResponse(request, "meal_plan.html", {
         "active_tab": "meal_plan", "demo": False,
-        **_week_context(week_start),
+        **_week_context(week_start, today),
     })
 
 
 @router.get("/grid", response_class=HTMLResponse)
 def meal_plan_grid(request: Request, week: str = None):
-    week_start = _parse_week(week)
-    return templates.TemplateResponse(request, "partials/meal_grid.html", {
-        "demo": False, **_week_context(week_start),
-    })
+    today = request_today(request)
+    week_start = _parse_week(week, today)
+    ctx = _week_context(week_start, today)
+    etag = compute_etag(ctx["week_grid"], ctx["week_str"], ctx["today"])
+    return conditional_response(
+        request, etag,
+        lambda: templates.TemplateResponse(request, "partials/meal_grid.html", {"demo": False, **ctx}),
+    )
 
 
 # ── Meal picker ────────────────────────────────────────────────────────────────
@@ -66,10 +73,10 @@ def meal_picker(request: Request, entry_date: str, slot: str):
     try:
         d = date.fromisoformat(entry_date)
     except (ValueError, TypeError):
-        d = date.today()
+        d = request_today(request)
     week_start = mp_core.get_week_start(d)
     grid = mp_core.get_week(week_start)
-    current = grid.get(entry_date, {}).get(slot)
+    current = grid.get(entry_date, slot)
     return templates.TemplateResponse(request, "partials/meal_picker.html", {
         "recipes": recipes_core.get_all(),
         "entry_date": entry_date,
@@ -92,20 +99,14 @@ async def meal_set(request: Request):
     recipe_id = int(recipe_id_str) if recipe_id_str else None
     servings = int(servings_str) if servings_str else 1
     mp_core.set_meal(entry_date, slot, recipe_id, servings, notes or None)
-    week_start = _parse_week(form.get("week"))
-    return templates.TemplateResponse(request, "partials/meal_grid.html", {
-        "demo": False, **_week_context(week_start),
-    })
+    return Response(status_code=204, headers={"HX-Trigger": GRID_CHANGED})
 
 
 @router.post("/clear", response_class=HTMLResponse)
 async def meal_clear(request: Request):
     form = await request.form()
     mp_core.clear_meal(form["date"], form["slot"])
-    week_start = _parse_week(form.get("week"))
-    return templates.TemplateResponse(request, "partials/meal_grid.html", {
-        "demo": False, **_week_context(week_start),
-    })
+    return Response(status_code=204, headers={"HX-Trigger": GRID_CHANGED})
 
 
 # ── AI suggest ─────────────────────────────────────────────────────────────────
@@ -116,7 +117,8 @@ def meal_ai_suggest(
     preferences: str = Form(""),
     week: str = Form(""),
 ):
-    week_start = _parse_week(week or None)
+    today = request_today(request)
+    week_start = _parse_week(week or None, today)
     all_recipes = recipes_core.get_all()
     suggestions = suggest_week(all_recipes, preferences)
     return templates.TemplateResponse(request, "partials/meal_ai_suggest.html", {
@@ -128,26 +130,34 @@ def meal_ai_suggest(
 @router.post("/ai/apply", response_class=HTMLResponse)
 async def meal_ai_apply(request: Request):
     form = await request.form()
-    week_start = _parse_week(form.get("week"))
+    today = request_today(request)
+    week_start = _parse_week(form.get("week"), today)
     day_to_date = {
-        day_name: (week_start + timedelta(days=idx)).isoformat()
-        for idx, day_name in enumerate(DAY_NAMES)
+        day_name: d.isoformat()
+        for day_name, d in zip(DAY_NAMES, mp_core.week_dates(week_start))
     }
-    all_recipes = {r.name.lower(): r for r in recipes_core.get_all()}
 
-    i = 0
-    while f"sug_day_{i}" in form:
-        day = form[f"sug_day_{i}"]
-        slot = form[f"sug_slot_{i}"]
+    indices = sorted({
+        int(key[len("sug_day_"):])
+        for key in form.keys()
+        if key.startswith("sug_day_") and key[len("sug_day_"):].isdigit()
+    })
+    suggestions = []
+    for i in indices:
+        day = form.get(f"sug_day_{i}")
+        slot = form.get(f"sug_slot_{i}")
         meal_name = (form.get(f"sug_meal_{i}") or "").strip()
         if day in day_to_date and slot in SLOTS and meal_name:
-            entry_date = day_to_date[day]
-            recipe = all_recipes.get(meal_name.lower())
-            recipe_id = recipe.id if recipe else None
-            notes = None if recipe_id else meal_name
-            mp_core.set_meal(entry_date, slot, recipe_id, 1, notes)
-        i += 1
+            suggestions.append((day_to_date[day], slot, meal_name))
+
+    recipe_ids = recipes_core.get_ids_by_names([name for _, _, name in suggestions])
+    entries = []
+    for entry_date, slot, meal_name in suggestions:
+        recipe_id = recipe_ids.get(meal_name.lower())
+        notes = None if recipe_id else meal_name
+        entries.append((entry_date, slot, recipe_id, 1, notes))
+    mp_core.set_meals(entries)
 
     return templates.TemplateResponse(request, "partials/meal_grid.html", {
-        "demo": False, **_week_context(week_start),
+        "demo": False, **_week_context(week_start, today),
     })
@@ -1,18 +1,20 @@
-import os
-import shutil
-import tempfile
-from datetime import date
-from pathlib import Path
-
-from fastapi import APIRouter, HTTPException, Request, Form, UploadFile, File
-from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
+from fastapi import APIRouter, HTTPException, Request, UploadFile, File
+from fastapi.responses import HTMLResponse, Response
 
 from meal_planner.core import pantry as pantry_core
 from meal_planner.db.models import PantryItem
+from app.caching import compute_etag, conditional_response
+from app.dependencies import request_today
+from app.templating import templates
 
 router = APIRouter(prefix="/pantry", tags=["pantry"])
-templates = Jinja2Templates(directory=Path(__file__).parent.parent / "templates")
+
+# Writes answer 204 with this HX-Trigger; #pantry-tbody re-fetches /pantry/rows.
+ROWS_CHANGED = "pantry-rows-changed"
+
+
+def _rows_changed() -> Response:
+    return Response(status_code=204, headers={"HX-Trigger": ROWS_CHANGED})
 
 
 def _ctx(request: Request, **kwargs) -> dict:
@@ -23,62 +25,63 @@ def _store_map(stores) -> dict:
     return {s.id: s.name for s in stores}
 
 
-def _today() -> str:
-    return str(date.today())
+def _rows_context(request: Request, location: str = "", category: str = "",
+                  with_filters: bool = False, **extra) -> dict:
+    """Context shared by every template that renders pantry rows.
+
+    with_filters adds the location/category dropdown values and echoes the
+    active filters back for the full page and inventory partial.
+    """
+    today = request_today(request)
+    bundle = pantry_core.get_page_bundle(location or None, category or None,
+                                         with_filters=with_filters, today=today)
+    ctx = {
+        "items": bundle.items,
+        "stores": bundle.stores,
+        "store_map": _store_map(bundle.stores),
+        "today": today.isoformat(),
+        "expiring_ids": bundle.expiring_ids,
+        "demo": False,
+    }
+    if with_filters:
+        ctx.update(
+            locations=[""] + bundle.locations,
+            categories=[""] + bundle.categories,
+            filter_location=location,
+            filter_category=category,
+        )
+    ctx.update(extra)
+    return ctx
 
 
 @router.get("", response_class=HTMLResponse)
 def pantry_page(request: Request, location: str = "", category: str = "", migrated: str = ""):
-    items = pantry_core.get_all(location=location or None, category=category or None)
-    stores = pantry_core.get_all_stores()
-    expiring_ids = {i.id for i in pantry_core.get_expiring_soon(7)}
     return templates.TemplateResponse(request, "pantry.html", _ctx(
         request,
-        items=items,
-        stores=stores,
-        store_map=_store_map(stores),
-        locations=[""] + pantry_core.get_locations(),
-        categories=[""] + pantry_core.get_categories(),
-        filter_location=location,
-        filter_category=category,
-        today=_today(),
-        expiring_ids=expiring_ids,
-        active_view="inventory",
-        flash_message="Database imported successfully. Welcome to the web app!" if migrated else None,
-        flash_type="success",
+        **_rows_context(
+            request, location, category, with_filters=True,
+            active_view="inventory",
+            flash_message="Database imported successfully. Welcome to the web app!" if migrated else None,
+            flash_type="success",
+        ),
     ))
 
 
 @router.get("/inventory", response_class=HTMLResponse)
 def pantry_inventory(request: Request, location: str = "", category: str = ""):
-    items = pantry_core.get_all(location=location or None, category=category or None)
-    stores = pantry_core.get_all_stores()
-    expiring_ids = {i.id for i in pantry_core.get_expiring_soon(7)}
-    return templates.TemplateResponse(request, "partials/pantry_inventory.html", {
-        "items": items,
-        "store_map": _store_map(stores),
-        "locations": [""] + pantry_core.get_locations(),
-        "categories": [""] + pantry_core.get_categories(),
-        "filter_location": location,
-        "filter_category": category,
-        "today": _today(),
-        "expiring_ids": expiring_ids,
-        "demo": False,
-    })
+    return templates.TemplateResponse(request, "partials/pantry_inventory.html", _rows_context(
+        request, location, category, with_filters=True,
+    ))
 
 
 @router.get("/rows", response_class=HTMLResponse)
 def pantry_rows(request: Request, location: str = "", category: str = ""):
-    items = pantry_core.get_all(location=location or None, category=category or None)
-    stores = pantry_core.get_all_stores()
-    expiring_ids = {i.id for i in pantry_core.get_expiring_soon(7)}
-    return templates.TemplateResponse(request, "partials/pantry_rows.html", {
-        "items": items,
-        "store_map": _store_map(stores),
-        "today": _today(),
-        "expiring_ids": expiring_ids,
-        "demo": False,
-    })
+    ctx = _rows_context(request, location, category)
+    etag = compute_etag(ctx["items"], ctx["store_map"], ctx["today"], sorted(ctx["expiring_ids"]))
+    return conditional_response(
+        request, etag,
+        lambda: templates.TemplateResponse(request, "partials/pantry_rows.html", ctx),
+    )
 
 
 @router.get("/add", response_class=HTMLResponse)
@@ -91,48 +94,40 @@ def pantry_add_form(request: Request):
     })
 
 
+def _item_fields(form) -> dict:
+    """Read the pantry dialog form into PantryItem field values."""
+    name = (form.get("name") or "").strip()
+    if not name:
+        raise HTTPException(status_code=422, detail="Name is required")
+    try:
+        quantity = float(form.get("quantity") or 1.0)
+        store_id = form.get("preferred_store_id") or ""
+        price = form.get("estimated_price") or ""
+        preferred_store_id = int(store_id) if store_id else None
+        estimated_price = float(price) if price else None
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Invalid number")
+    return {
+        "name": name,
+        "brand": form.get("brand") or None,
+        "category": form.get("category") or None,
+        "location": form.get("location") or None,
+        "quantity": quantity,
+        "unit": form.get("unit") or None,
+        "best_by": form.get("best_by") or None,
+        "preferred_store_id": preferred_store_id,
+        "barcode": form.get("barcode") or None,
+        "product_notes": form.get("product_notes") or None,
+        "item_notes": form.get("item_notes") or None,
+        "estimated_price": estimated_price,
+    }
+
+
 @router.post("/add", response_class=HTMLResponse)
-def pantry_add(
-    request: Request,
-    name: str = Form(...),
-    brand: str = Form(""),
-    category: str = Form(""),
-    location: str = Form(""),
-    quantity: float = Form(1.0),
-    unit: str = Form(""),
-    best_by: str = Form(""),
-    preferred_store_id: str = Form(""),
-    barcode: str = Form(""),
-    product_notes: str = Form(""),
-    item_notes: str = Form(""),
-    estimated_price: str = Form(""),
-):
-    item = PantryItem(
-        id=None,
-        name=name,
-        barcode=barcode or None,
-        category=category or None,
-        location=location or None,
-        brand=brand or None,
-        quantity=quantity,
-        unit=unit or None,
-        best_by=best_by or None,
-        preferred_store_id=int(preferred_store_id) if preferred_store_id else None,
-        product_notes=product_notes or None,
-        item_notes=item_notes or None,
-        estimated_price=float(estimated_price) if estimated_price else None,
-    )
-    pantry_core.add(item)
-    items = pantry_core.get_all()
-    stores = pantry_core.get_all_stores()
-    expiring_ids = {i.id for i in pantry_core.get_expiring_soon(7)}
-    return templates.TemplateResponse(request, "partials/pantry_rows.html", {
-        "items": items,
-        "store_map": _store_map(stores),
-        "today": _today(),
-        "expiring_ids": expiring_ids,
-        "demo": False,
-    })
+async def pantry_add(request: Request):
+    form = await request.form()
+    pantry_core.add(PantryItem(id=None, **_item_fields(form)))
+    return _rows_changed()
 
 
 @router.get("/{item_id}/edit", response_class=HTMLResponse)
@@ -146,48 +141,15 @@ def pantry_edit_form(request: Request, item_id: int):
 
 
 @router.post("/{item_id}/edit", response_class=HTMLResponse)
-def pantry_edit(
-    request: Request,
-    item_id: int,
-    name: str = Form(...),
-    brand: str = Form(""),
-    category: str = Form(""),
-    location: str = Form(""),
-    quantity: float = Form(1.0),
-    unit: str = Form(""),
-    best_by: str = Form(""),
-    preferred_store_id: str = Form(""),
-    barcode: str = Form(""),
-    product_notes: str = Form(""),
-    item_notes: str = Form(""),
-    estimated_price: str = Form(""),
-):
+async def pantry_edit(request: Request, item_id: int):
+    form = await request.form()
     item = pantry_core.get(item_id)
     if item is None:
         raise HTTPException(status_code=404, detail="Item not found")
-    item.name = name
-    item.brand = brand or None
-    item.category = category or None
-    item.location = location or None
-    item.quantity = quantity
-    item.unit = unit or None
-    item.best_by = best_by or None
-    item.preferred_store_id = int(preferred_store_id) if preferred_store_id else None
-    item.barcode = barcode or None
-    item.product_notes = product_notes or None
-    item.item_notes = item_notes or None
-    item.estimated_price = float(estimated_price) if estimated_price else None
-    pantry_core.update(item)
-    items = pantry_core.get_all()
-    stores = pantry_core.get_all_stores()
-    expiring_ids = {i.id for i in pantry_core.get_expiring_soon(7)}
-    return templates.TemplateResponse(request, "partials/pantry_rows.html", {
-        "items": items,
-        "store_map": _store_map(stores),
-        "today": _today(),
-        "expiring_ids": expiring_ids,
-        "demo": False,
-    })
+    new_values = _item_fields(form)
+    changed = {k: v for k, v in new_values.items() if getattr(item, k) != v}
+    pantry_core.update_partial(item_id, changed)
+    return _rows_changed()
 
 
 @router.delete("/{item_id}", response_class=HTMLResponse)
@@ -198,27 +160,13 @@ def pantry_delete(item_id: int):
 
 @router.post("/import", response_class=HTMLResponse)
 def pantry_import(request: Request, file: UploadFile = File(...)):
-    with tempfile.NamedTemporaryFile(suffix=".csv", delete=False) as tmp:
-        shutil.copyfileobj(file.file, tmp)
-        tmp_path = tmp.name
     try:
-        inserted, updated = pantry_core.import_csv(tmp_path)
+        inserted, updated = pantry_core.import_csv_stream(file.file)
         flash_message = f"Imported: {inserted} new items, {updated} updated."
         flash_type = "success"
     except Exception as e:
         flash_message = f"Import failed: {e}"
         flash_type = "error"
-    finally:
-        os.unlink(tmp_path)
-    items = pantry_core.get_all()
-    stores = pantry_core.get_all_stores()
-    expiring_ids = {i.id for i in pantry_core.get_expiring_soon(7)}
-    return templates.TemplateResponse(request, "partials/pantry_rows.html", {
-        "items": items,
-        "store_map": _store_map(stores),
-        "today": _today(),
-        "expiring_ids": expiring_ids,
-        "demo": False,
-        "flash_message": flash_message,
-        "flash_type": flash_type,
-    })
+    return templates.TemplateResponse(request, "partials/pantry_rows.html", _rows_context(
+        request, flash_message=flash_message, flash_type=flash_type,
+    ))
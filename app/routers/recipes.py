@@ -1,10 +1,9 @@
 import base64
-import re
+from functools import lru_cache
 from pathlib import Path
 
 from fastapi import APIRouter, HTTPException, Request, Form, UploadFile, File
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 from typing import Optional
 import io
 
@@ -15,51 +14,62 @@ from meal_planner.core.ai_assistant import (
     fetch_og_image,
 )
 from meal_planner.db.models import Recipe, RecipeIngredient
+from app.caching import compute_etag, conditional_response
+from app.templating import templates
 
 router = APIRouter(prefix="/recipes", tags=["recipes"])
-templates = Jinja2Templates(directory=Path(__file__).parent.parent / "templates")
 
 
 def _ctx(request: Request, **kwargs) -> dict:
     return {"active_tab": "recipes", "demo": False, **kwargs}
 
 
-def _collect_ingredients(form) -> list:
-    """Collect indexed ingredient fields, tolerating gaps from deleted rows."""
-    indices = set()
-    for key in form.keys():
-        m = re.match(r"ingredient_name_(\d+)$", key)
-        if m:
-            indices.add(int(m.group(1)))
+_INGREDIENT_PREFIX = "ingredient_"
+_INGREDIENT_FIELDS = ("name", "qty", "unit")
+
+
+def _recipe_from_form(form, recipe_id=None) -> Recipe:
+    """Build a Recipe from the dialog form in a single pass over its fields.
+
+    Ingredient rows arrive as ingredient_{name,qty,unit}_<n>; indices may have
+    gaps from deleted rows and are read back in numeric order.
+    """
+    fields = {}
+    rows: dict[int, dict[str, str]] = {}
+    for key, value in form.multi_items():
+        if key.startswith(_INGREDIENT_PREFIX):
+            field, _, suffix = key[len(_INGREDIENT_PREFIX):].rpartition("_")
+            if field in _INGREDIENT_FIELDS and suffix.isdecimal():
+                rows.setdefault(int(suffix), {})[field] = value
+                continue
+        fields[key] = value
+
     ingredients = []
-    for i in sorted(indices):
-        ing_name = (form.get(f"ingredient_name_{i}") or "").strip()
+    for _, row in sorted(rows.items()):
+        ing_name = (row.get("name") or "").strip()
         if ing_name:
-            qty_str = (form.get(f"ingredient_qty_{i}") or "").strip()
+            qty_str = (row.get("qty") or "").strip()
             ingredients.append(RecipeIngredient(
                 id=None, recipe_id=None,
                 name=ing_name,
                 quantity=float(qty_str) if qty_str else None,
-                unit=form.get(f"ingredient_unit_{i}") or None,
+                unit=row.get("unit") or None,
             ))
-    return ingredients
 
-
-def _recipe_from_form(form, recipe_id=None) -> Recipe:
-    rating_str = (form.get("rating") or "").strip()
-    servings_str = (form.get("servings") or "4").strip()
+    rating_str = (fields.get("rating") or "").strip()
+    servings_str = (fields.get("servings") or "4").strip()
     return Recipe(
         id=recipe_id,
-        name=form["name"],
-        description=form.get("description") or None,
+        name=fields["name"],
+        description=fields.get("description") or None,
         servings=int(servings_str) if servings_str else 4,
-        prep_time=form.get("prep_time") or None,
-        cook_time=form.get("cook_time") or None,
-        instructions=form.get("instructions") or None,
-        source_url=form.get("source_url") or None,
-        tags=form.get("tags") or None,
+        prep_time=fields.get("prep_time") or None,
+        cook_time=fields.get("cook_time") or None,
+        instructions=fields.get("instructions") or None,
+        source_url=fields.get("source_url") or None,
+        tags=fields.get("tags") or None,
         rating=int(rating_str) if rating_str else None,
-        ingredients=_collect_ingredients(form),
+        ingredients=ingredients,
     )
 
 
@@ -84,18 +94,23 @@ def _save_photo(recipe_id: int, file_bytes: bytes) -> Optional[str]:
 
 @router.get("", response_class=HTMLResponse)
 def recipes_page(request: Request):
-    recipe_list = recipes_core.get_all()
-    return templates.TemplateResponse(request, "recipes.html", _ctx(
-        request, recipes=recipe_list,
-    ))
+    return conditional_response(
+        request, compute_etag("page", recipes_core.cache_version()),
+        lambda: templates.TemplateResponse(request, "recipes.html", _ctx(
+            request, recipes=recipes_core.get_all(),
+        )),
+    )
 
 
 @router.get("/list", response_class=HTMLResponse)
 def recipes_list(request: Request, q: str = ""):
-    recipe_list = recipes_core.search(q) if q else recipes_core.get_all()
-    return templates.TemplateResponse(request, "partials/recipe_list.html", {
-        "recipes": recipe_list, "q": q, "selected_id": None, "demo": False,
-    })
+    def render():
+        recipe_list = recipes_core.search(q) if q else recipes_core.get_all()
+        return templates.TemplateResponse(request, "partials/recipe_list.html", {
+            "recipes": recipe_list, "q": q, "selected_id": None, "demo": False,
+        })
+    etag = compute_etag(recipes_core.cache_version(), q)
+    return conditional_response(request, etag, render)
 
 
 @router.post("/seed", response_class=HTMLResponse)
@@ -140,20 +155,29 @@ async def recipes_add(request: Request, photo: Optional[UploadFile] = File(None)
 
 # ── Ingredient row helper ──────────────────────────────────────────────────────
 
+# These partials depend only on their arguments, so the rendered HTML is kept
+# for the life of the process (a deploy restarts it).
+
+@lru_cache(maxsize=1024)
+def _render_ingredient_row(index: int) -> str:
+    return templates.get_template("partials/ingredient_row.html").render(i=index, ing=None)
+
+
+@lru_cache(maxsize=256)
+def _render_ai_form(mode: str, recipe_id: Optional[int] = None) -> str:
+    return templates.get_template("partials/recipe_ai_form.html").render(mode=mode, recipe_id=recipe_id)
+
+
 @router.get("/ingredient-row", response_class=HTMLResponse)
-def ingredient_row(request: Request, index: int = 0):
-    return templates.TemplateResponse(request, "partials/ingredient_row.html", {
-        "i": index, "ing": None,
-    })
+def ingredient_row(index: int = 0):
+    return HTMLResponse(_render_ingredient_row(index))
 
 
 # ── AI — paste text ───────────────────────────────────────────────────────────
 
 @router.get("/ai/paste", response_class=HTMLResponse)
-def ai_paste_form(request: Request):
-    return templates.TemplateResponse(request, "partials/recipe_ai_form.html", {
-        "mode": "paste", "recipe_id": None,
-    })
+def ai_paste_form():
+    return HTMLResponse(_render_ai_form("paste"))
 
 
 @router.post("/ai/parse-text", response_class=HTMLResponse)
@@ -169,10 +193,8 @@ def ai_parse_text(request: Request, text: str = Form(...)):
 # ── AI — from URL ─────────────────────────────────────────────────────────────
 
 @router.get("/ai/url", response_class=HTMLResponse)
-def ai_url_form(request: Request):
-    return templates.TemplateResponse(request, "partials/recipe_ai_form.html", {
-        "mode": "url", "recipe_id": None,
-    })
+def ai_url_form():
+    return HTMLResponse(_render_ai_form("url"))
 
 
 @router.post("/ai/parse-url", response_class=HTMLResponse)
@@ -194,10 +216,8 @@ def ai_parse_url(request: Request, url: str = Form(...)):
 # ── AI — generate ─────────────────────────────────────────────────────────────
 
 @router.get("/ai/generate", response_class=HTMLResponse)
-def ai_generate_form(request: Request):
-    return templates.TemplateResponse(request, "partials/recipe_ai_form.html", {
-        "mode": "generate", "recipe_id": None,
-    })
+def ai_generate_form():
+    return HTMLResponse(_render_ai_form("generate"))
 
 
 @router.post("/ai/generate", response_class=HTMLResponse)
@@ -214,12 +234,15 @@ def ai_generate(request: Request, preferences: str = Form("")):
 
 @router.get("/{recipe_id}", response_class=HTMLResponse)
 def recipe_detail(request: Request, recipe_id: int):
-    recipe = recipes_core.get(recipe_id)
-    if recipe is None:
-        raise HTTPException(status_code=404)
-    return templates.TemplateResponse(request, "partials/recipe_detail.html", {
-        "recipe": recipe, "demo": False,
-    })
+    def render():
+        recipe = recipes_core.get(recipe_id)
+        if recipe is None:
+            raise HTTPException(status_code=404)
+        return templates.TemplateResponse(request, "partials/recipe_detail.html", {
+            "recipe": recipe, "demo": False,
+        })
+    etag = compute_etag("detail", recipes_core.cache_version(), recipe_id)
+    return conditional_response(request, etag, render)
 
 
 @router.get("/{recipe_id}/edit", response_class=HTMLResponse)
@@ -244,8 +267,9 @@ async def recipe_edit(request: Request, recipe_id: int, photo: Optional[UploadFi
         new_path = _save_photo(recipe_id, file_bytes)
         if new_path:
             recipe.photo_path = new_path
-    recipes_core.update(recipe)
-    updated = recipes_core.get(recipe_id)
+    updated = recipes_core.update(recipe)
+    if updated is None:
+        raise HTTPException(status_code=404)
     return templates.TemplateResponse(request, "partials/recipe_detail.html", {
         "recipe": updated, "demo": False,
     })
@@ -260,10 +284,8 @@ def recipe_delete(recipe_id: int):
 # ── AI — modify ───────────────────────────────────────────────────────────────
 
 @router.get("/{recipe_id}/ai/modify", response_class=HTMLResponse)
-def ai_modify_form(request: Request, recipe_id: int):
-    return templates.TemplateResponse(request, "partials/recipe_ai_form.html", {
-        "mode": "modify", "recipe_id": recipe_id,
-    })
+def ai_modify_form(recipe_id: int):
+    return HTMLResponse(_render_ai_form("modify", recipe_id))
 
 
 @router.post("/{recipe_id}/ai/modify", response_class=HTMLResponse)
@@ -1,33 +1,45 @@
+import asyncio
 from datetime import date, timedelta
-from pathlib import Path
+from functools import lru_cache
 
 from fastapi import APIRouter, Request, Form
-from fastapi.responses import HTMLResponse, PlainTextResponse
-from fastapi.templating import Jinja2Templates
+from fastapi.responses import HTMLResponse, StreamingResponse
 
-from meal_planner.core.shopping_list import generate, format_shopping_list
+from meal_planner.core.shopping_list import generate, format_shopping_list, iter_shopping_lines
 from meal_planner.core import meal_plan as mp_core
+from app.caching import compute_etag, conditional_response
+from app.dependencies import request_today
+from app.templating import templates
 
 router = APIRouter(prefix="/shopping", tags=["shopping"])
-templates = Jinja2Templates(directory=Path(__file__).parent.parent / "templates")
 
 
-def _week_defaults() -> tuple[str, str]:
-    today = date.today()
+@lru_cache(maxsize=8)
+def _week_defaults(today: date) -> tuple[str, str]:
+    """Monday–Sunday ISO dates for the week containing today, memoized per day."""
     week_start = mp_core.get_week_start(today)
     week_end = week_start + timedelta(days=6)
     return week_start.isoformat(), week_end.isoformat()
 
 
+def _generate_and_format(start_date: str, end_date: str, use_pantry: bool):
+    """Build the shopping list and its plain-text form. Runs in a worker thread."""
+    shopping = generate(start_date, end_date, use_pantry=use_pantry)
+    return shopping, format_shopping_list(shopping)
+
+
 @router.get("", response_class=HTMLResponse)
 def shopping_page(request: Request):
-    start_default, end_default = _week_defaults()
-    return templates.TemplateResponse(request, "shopping.html", {
-        "active_tab": "shopping",
-        "demo": False,
-        "start_default": start_default,
-        "end_default": end_default,
-    })
+    start_default, end_default = _week_defaults(request_today(request))
+    return conditional_response(
+        request, compute_etag("shopping", start_default, end_default),
+        lambda: templates.TemplateResponse(request, "shopping.html", {
+            "active_tab": "shopping",
+            "demo": False,
+            "start_default": start_default,
+            "end_default": end_default,
+        }),
+    )
 
 
 @router.post("/generate", response_class=HTMLResponse)
@@ -38,10 +50,11 @@ async def shopping_generate(request: Request):
     use_pantry = form.get("use_pantry") is not None
 
     if not start_date or not end_date:
-        start_date, end_date = _week_defaults()
+        start_date, end_date = _week_defaults(request_today(request))
 
-    shopping = generate(start_date, end_date, use_pantry=use_pantry)
-    plain_text = format_shopping_list(shopping)
+    shopping, plain_text = await asyncio.to_thread(
+        _generate_and_format, start_date, end_date, use_pantry,
+    )
 
     return templates.TemplateResponse(request, "partials/shopping_list.html", {
         "shopping": shopping,
@@ -59,10 +72,9 @@ async def shopping_export(request: Request):
     use_pantry = form.get("use_pantry") is not None
 
     if not start_date or not end_date:
-        start_date, end_date = _week_defaults()
+        start_date, end_date = _week_defaults(request_today(request))
 
-    shopping = generate(start_date, end_date, use_pantry=use_pantry)
-    text = format_shopping_list(shopping)
-    return PlainTextResponse(text, headers={
+    shopping = await asyncio.to_thread(generate, start_date, end_date, use_pantry=use_pantry)
+    return StreamingResponse(iter_shopping_lines(shopping), media_type="text/plain", headers={
         "Content-Disposition": "attachment; filename=shopping_list.txt",
     })
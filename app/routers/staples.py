@@ -1,16 +1,14 @@
 """Staples router — CRUD for pantry staples, nested under /pantry/staples."""
-from pathlib import Path
 from typing import List
 
 from fastapi import APIRouter, Request, Form, HTTPException
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 
 from meal_planner.core import staples as staples_core
 from meal_planner.db.models import Staple
+from app.templating import templates
 
 router = APIRouter(prefix="/pantry/staples", tags=["staples"])
-templates = Jinja2Templates(directory=Path(__file__).parent.parent / "templates")
 
 
 def _all_staples():
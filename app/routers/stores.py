@@ -1,27 +1,32 @@
-from pathlib import Path
 from fastapi import APIRouter, Request, Form
 from fastapi.exceptions import HTTPException
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 
 from meal_planner.core import stores as stores_core
 from meal_planner.core import known_prices as prices_core
-from meal_planner.db.models import Store
+from meal_planner.db.database import get_change_count, get_db_path
+from app.caching import compute_etag, conditional_response
+from app.templating import templates
 
 router = APIRouter(prefix="/stores", tags=["stores"])
-templates = Jinja2Templates(directory=Path(__file__).parent.parent / "templates")
 
 
 @router.get("", response_class=HTMLResponse)
 def stores_page(request: Request):
-    all_stores = stores_core.get_all()
-    return templates.TemplateResponse(request, "stores.html", {
-        "active_tab": "stores", "demo": False,
-        "stores": all_stores,
-        "prices": prices_core.get_all(),
-        "store_map": {s.id: s.name for s in all_stores},
-        "filter_store_id": 0,
-    })
+    def render():
+        all_stores = stores_core.get_all()
+        return templates.TemplateResponse(request, "stores.html", {
+            "active_tab": "stores", "demo": False,
+            "stores": all_stores,
+            "prices": prices_core.get_all(),
+            "store_map": {s.id: s.name for s in all_stores},
+            "filter_store_id": 0,
+        })
+    # The page shows stores and known prices, both covered by the DB write counter.
+    version = get_change_count()
+    if version is None:
+        return render()
+    return conditional_response(request, compute_etag("stores", str(get_db_path()), version), render)
 
 
 @router.get("/add", response_class=HTMLResponse)
@@ -38,9 +43,10 @@ def stores_add(
     location: str = Form(""),
     notes: str = Form(""),
 ):
-    stores_core.add(Store(id=None, name=name, location=location or None, notes=notes or None))
+    store = stores_core.create(name, location or None, notes or None)
+    # Appended to #stores-tbody; also drops the "No stores yet" placeholder.
     return templates.TemplateResponse(request, "partials/stores_rows.html", {
-        "stores": stores_core.get_all(), "demo": False,
+        "stores": [store], "demo": False, "remove_empty": True,
     })
 
 
@@ -62,15 +68,12 @@ def stores_edit(
     location: str = Form(""),
     notes: str = Form(""),
 ):
-    store = stores_core.get(store_id)
+    store = stores_core.update_fields(store_id, name, location or None, notes or None)
     if store is None:
         raise HTTPException(status_code=404, detail="Store not found")
-    store.name = name
-    store.location = location or None
-    store.notes = notes or None
-    stores_core.update(store)
+    # Replaces just this store's row (#store-row-<id>)
     return templates.TemplateResponse(request, "partials/stores_rows.html", {
-        "stores": stores_core.get_all(), "demo": False,
+        "stores": [store], "demo": False,
     })
 
 
@@ -0,0 +1,41 @@
+"""Shared Jinja2 template renderer for all routers.
+
+One Environment means each template is parsed and compiled once per process,
+no matter how many routers render it. Compiled bytecode is also cached on disk
+(JINJA_CACHE_DIR, default: a per-user temp dir) so restarts skip the parser.
+Set DEBUG=1 to re-check template files for edits on every render.
+"""
+import os
+from pathlib import Path
+
+import jinja2
+from fastapi.templating import Jinja2Templates
+
+TEMPLATES_DIR = Path(__file__).parent / "templates"
+
+
+def _bytecode_cache() -> jinja2.FileSystemBytecodeCache:
+    cache_dir = os.environ.get("JINJA_CACHE_DIR")
+    if cache_dir:
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    return jinja2.FileSystemBytecodeCache(cache_dir, pattern="__mp_jinja2_%s.cache")
+
+
+templates = Jinja2Templates(env=jinja2.Environment(
+    loader=jinja2.FileSystemLoader(TEMPLATES_DIR),
+    autoescape=jinja2.select_autoescape(),
+    auto_reload=bool(os.environ.get("DEBUG")),
+    bytecode_cache=_bytecode_cache(),
+))
+
+
+def warm_templates() -> int:
+    """Compile every HTML template into the Environment cache. Returns the count.
+
+    Called from the app lifespan so the first request to each page doesn't pay
+    the parse/compile cost.
+    """
+    names = templates.env.list_templates(extensions=["html"])
+    for name in names:
+        templates.env.get_template(name)
+    return len(names)
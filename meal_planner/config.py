@@ -2,22 +2,40 @@
 
 Known keys:
     claude_api_key  — Anthropic API key for AI features (stored as-is, never exported).
+
+Values are normally text; bytes values are stored as BLOBs and read back as bytes.
+
+Values are cached per database file after the first read; set_setting()
+keeps the cache current, and invalidate_cache() drops it when the DB file
+itself is replaced.
 """
 
-from meal_planner.db.database import get_connection
+from meal_planner.db.database import get_connection, get_db_path
+
+# {db path: {key: value or None if the key is absent}}
+_settings_cache: dict[str, dict[str, "str | bytes | None"]] = {}
+
+
+def invalidate_cache() -> None:
+    """Drop all cached settings. Call after swapping out the DB file."""
+    _settings_cache.clear()
 
 
-def get_setting(key: str, default: str = None) -> str:
+def get_setting(key: str, default: str = None) -> "str | bytes":
     """Return the value for a settings key, or default if not found."""
-    conn = get_connection()
-    try:
-        row = conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
-        return row["value"] if row else default
-    finally:
-        conn.close()
+    cache = _settings_cache.setdefault(str(get_db_path()), {})
+    if key not in cache:
+        conn = get_connection()
+        try:
+            row = conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+        finally:
+            conn.close()
+        cache[key] = row["value"] if row else None
+    value = cache[key]
+    return default if value is None else value
 
 
-def set_setting(key: str, value: str) -> None:
+def set_setting(key: str, value: "str | bytes") -> None:
     """Insert or update a settings key-value pair (upsert)."""
     conn = get_connection()
     try:
@@ -28,3 +46,4 @@ def set_setting(key: str, value: str) -> None:
         conn.commit()
     finally:
         conn.close()
+    _settings_cache.setdefault(str(get_db_path()), {})[key] = value
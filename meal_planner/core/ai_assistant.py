@@ -6,15 +6,146 @@ into Recipe/RecipeIngredient dataclasses.  Long-running calls should be wrapped
 in an AIWorker thread from the GUI layer to avoid blocking the UI.
 """
 
+import asyncio
+import atexit
+import base64
 import json
+import mmap
+import os
 import re
+import threading
+import time
+from pathlib import Path
 from typing import Optional
 
+import fastjsonschema
 import httpx
+from selectolax.lexbor import LexborHTMLParser
 
-from meal_planner.db.database import get_connection
+from meal_planner.config import get_setting
+from meal_planner.core import ai_cache
+from meal_planner.db.database import get_change_count, get_connection, get_db_path
 from meal_planner.db.models import Recipe, RecipeIngredient
 
+try:
+    import orjson
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers'
+    # except clauses work with either parser.
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# Compiled JSON-schema validators for the AI response shapes.  Each checks
+# one element (a recipe, an ingredient, a receipt line, ...) so a malformed
+# entry is dropped without discarding the rest of the response.
+_NAME = {"type": "string", "pattern": r"\S"}
+_OPT_STR = {"type": ["string", "null"]}
+_OPT_NUM = {"type": ["number", "null"]}
+_POSITIVE = {"type": "number", "exclusiveMinimum": 0}
+
+# Fills schema defaults in place; field types are coerced in _recipe_from_dict.
+_validate_recipe = fastjsonschema.compile({
+    "type": "object",
+    "properties": {
+        "name": {"default": "Untitled Recipe"},
+        "servings": {"default": 4},
+        "ingredients": {"type": ["array", "null"], "default": []},
+    },
+})
+_validate_ingredient = fastjsonschema.compile({"type": "object", "required": ["name"]})
+_validate_price = fastjsonschema.compile(_POSITIVE)
+_validate_shopping_item = fastjsonschema.compile({
+    "type": "object",
+    "properties": {
+        "index": {"type": "integer"},
+        "shopping_name": _OPT_STR,
+        "shopping_qty": _OPT_NUM,
+        "shopping_unit": _OPT_STR,
+    },
+})
+_validate_receipt_item = fastjsonschema.compile({
+    "type": "object",
+    "required": ["item_name", "price"],
+    "properties": {
+        "item_name": _NAME,
+        "price": _POSITIVE,
+        "quantity": {"type": "integer", "minimum": 1, "default": 1},
+    },
+})
+_validate_receipt_text_item = fastjsonschema.compile({
+    "type": "object",
+    "required": ["item_name", "unit_price"],
+    "properties": {"item_name": _NAME, "unit_price": {"type": "number"}, "unit": _OPT_STR},
+})
+_validate_suggestion = fastjsonschema.compile({
+    "type": "object",
+    "required": ["day", "slot", "meal"],
+    "properties": {"day": _NAME, "slot": _NAME, "meal": {"type": "string"}, "notes": _OPT_STR},
+})
+
+
+def _valid(validate, value) -> bool:
+    """Run a compiled validator; True if value matches (defaults are filled in)."""
+    try:
+        validate(value)
+    except fastjsonschema.JsonSchemaException:
+        return False
+    return True
+
+# Compiled once at import; used on every AI response and fetched page.
+_FENCE_RE = re.compile(r"```(?:json)?\s*([\s\S]+?)\s*```")
+_WS_RE = re.compile(r"\s+")
+# Elements whose text never belongs in a recipe prompt
+_BOILERPLATE_TAGS = "script,style,noscript,nav,footer,aside"
+# og:image meta tags, in either attribute order
+_OG_IMAGE_RE = re.compile(
+    r'<meta[^>]+property=["\']og:image["\'][^>]+content=["\']([^"\']+)["\']', re.IGNORECASE,
+)
+_OG_IMAGE_REVERSED_RE = re.compile(
+    r'<meta[^>]+content=["\']([^"\']+)["\'][^>]+property=["\']og:image["\']', re.IGNORECASE,
+)
+
+# One pooled client for recipe pages and images, so repeat fetches from the
+# same site reuse the open connection (multiplexed over HTTP/2 when offered).
+_HTTP = httpx.Client(
+    http2=True,
+    follow_redirects=True,
+    timeout=15.0,
+    headers={"User-Agent": "MealPlanner/1.0"},
+    limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+)
+atexit.register(_HTTP.close)
+
+
+# Recently fetched pages, keyed by URL: url -> (fetched_at, html).  Entries
+# live for a couple of minutes — long enough to cover one import — so an
+# edited page is picked up on the next import.
+_PAGE_TTL = 120.0
+_PAGE_CACHE_SIZE = 16
+_page_cache: dict[str, tuple[float, str]] = {}
+_page_lock = threading.Lock()
+
+
+def _fetch_page(url: str) -> str:
+    """GET a page's HTML.
+
+    Briefly cached so parsing a URL and then grabbing its og:image (or
+    retrying an import) downloads the page once.
+    """
+    now = time.monotonic()
+    with _page_lock:
+        hit = _page_cache.get(url)
+        if hit is not None and now - hit[0] < _PAGE_TTL:
+            return hit[1]
+    response = _HTTP.get(url)
+    response.raise_for_status()
+    with _page_lock:
+        _page_cache.pop(url, None)
+        while len(_page_cache) >= _PAGE_CACHE_SIZE:
+            _page_cache.pop(next(iter(_page_cache)))
+        _page_cache[url] = (now, response.text)
+    return response.text
+
 
 def _get_api_key() -> Optional[str]:
     """Retrieve the Claude API key.
@@ -27,12 +158,7 @@ def _get_api_key() -> Optional[str]:
     env_key = os.environ.get("CLAUDE_API_KEY", "").strip()
     if env_key:
         return env_key
-    conn = get_connection()
-    try:
-        row = conn.execute("SELECT value FROM settings WHERE key = 'claude_api_key'").fetchone()
-        return row["value"] if row else None
-    finally:
-        conn.close()
+    return get_setting("claude_api_key")
 
 
 def get_api_key_status() -> dict:
@@ -44,55 +170,163 @@ def get_api_key_status() -> dict:
     import os
     if os.environ.get("CLAUDE_API_KEY", "").strip():
         return {"set": True, "source": "env"}
-    conn = get_connection()
-    try:
-        row = conn.execute("SELECT value FROM settings WHERE key = 'claude_api_key'").fetchone()
-        if row and row["value"]:
-            return {"set": True, "source": "database"}
-    finally:
-        conn.close()
+    if get_setting("claude_api_key"):
+        return {"set": True, "source": "database"}
     return {"set": False, "source": None}
 
 
+# (api key, client) — reused until the key changes so calls share one
+# connection pool instead of building a new SDK client each time.
+_client_cache: Optional[tuple[str, object]] = None
+
+
 def _get_client():
-    """Create and return an Anthropic client. Raises ValueError if the API key is not set."""
+    """Return the shared Anthropic client. Raises ValueError if the API key is not set."""
+    global _client_cache
+    api_key = _get_api_key()
+    if not api_key:
+        raise ValueError("Claude API key not set. Configure the CLAUDE_API_KEY environment variable.")
+    if _client_cache is not None and _client_cache[0] == api_key:
+        return _client_cache[1]
+    import anthropic
+    client = anthropic.Anthropic(api_key=api_key)
+    _client_cache = (api_key, client)
+    return client
+
+
+def invalidate_client() -> None:
+    """Drop the shared Anthropic client; the next call builds a fresh one."""
+    global _client_cache
+    _client_cache = None
+
+
+def _get_async_client():
+    """Like _get_client(), but returns a new AsyncAnthropic client for concurrent calls.
+
+    Not shared: each batch closes its client when its event loop finishes.
+    """
     import anthropic
     api_key = _get_api_key()
     if not api_key:
         raise ValueError("Claude API key not set. Configure the CLAUDE_API_KEY environment variable.")
-    return anthropic.Anthropic(api_key=api_key)
+    return anthropic.AsyncAnthropic(api_key=api_key)
+
+
+# {db path: (change count, summary)} — rebuilt only after a DB write.
+_pantry_summary_cache: dict[str, tuple[int, str]] = {}
+
+
+def invalidate_cache() -> None:
+    """Drop memoized pantry summaries and the client. Call after swapping out the DB file."""
+    _pantry_summary_cache.clear()
+    invalidate_client()
 
 
 def _get_pantry_summary() -> str:
-    """Build a brief pantry summary string to include in prompts."""
+    """Return a brief pantry summary string to include in prompts.
+
+    Memoized against the DB change counter so back-to-back AI calls send
+    byte-identical pantry text (and so hit the prompt cache).
+    """
+    version = get_change_count()
+    if version is None:
+        return _build_pantry_summary()
+    key = str(get_db_path())
+    cached = _pantry_summary_cache.get(key)
+    if cached is None or cached[0] != version:
+        cached = (version, _build_pantry_summary())
+        _pantry_summary_cache[key] = cached
+    return cached[1]
+
+
+def _pantry_block() -> dict:
+    """The pantry summary as a user-content block with its own cache breakpoint.
+
+    Placed first in the user message so calls sharing a system prompt also
+    share the cached pantry segment; per-call text follows in a later block.
+    """
+    return {
+        "type": "text",
+        "text": f"My pantry/fridge/freezer contains:\n{_get_pantry_summary()}",
+        "cache_control": {"type": "ephemeral"},
+    }
+
+
+# Prompt budget for the compact summary; items past it collapse to "(+N more)".
+_PANTRY_SUMMARY_LIMIT = 1500
+
+
+def _build_pantry_summary(detailed: bool = False) -> str:
+    """Summarize the pantry for a prompt.
+
+    By default one line per category listing item names only, e.g.
+    "Produce: garlic, onion", capped at _PANTRY_SUMMARY_LIMIT characters.
+    detailed=True lists every item with brand, quantity and location.
+    """
     conn = get_connection()
     try:
-        rows = conn.execute(
-            "SELECT name, brand, quantity, unit, category, location FROM pantry ORDER BY category, name"
-        ).fetchall()
-        if not rows:
-            return "Pantry is empty."
-        lines = []
-        for r in rows:
-            parts = [r["name"]]
-            if r["brand"]:
-                parts.append(f"({r['brand']})")
-            qty = f"{r['quantity']:g}" if r["quantity"] else "?"
-            if r["unit"]:
-                qty += f" {r['unit']}"
-            parts.append(f"— qty: {qty}")
-            if r["location"]:
-                parts.append(f"[{r['location']}]")
-            lines.append(" ".join(parts))
-        return "\n".join(lines)
+        if detailed:
+            rows = conn.execute(
+                "SELECT name, brand, quantity, unit, category, location FROM pantry ORDER BY category, name"
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                """SELECT category, group_concat(name, char(31)) AS names
+                   FROM (SELECT COALESCE(NULLIF(category, ''), 'Other') AS category, name
+                         FROM pantry ORDER BY category, name)
+                   GROUP BY category ORDER BY category"""
+            ).fetchall()
     finally:
         conn.close()
+    if not rows:
+        return "Pantry is empty."
+    if not detailed:
+        return _compact_pantry_lines([(r["category"], r["names"].split("\x1f")) for r in rows])
+
+    lines = []
+    for r in rows:
+        parts = [r["name"]]
+        if r["brand"]:
+            parts.append(f"({r['brand']})")
+        qty = f"{r['quantity']:g}" if r["quantity"] else "?"
+        if r["unit"]:
+            qty += f" {r['unit']}"
+        parts.append(f"— qty: {qty}")
+        if r["location"]:
+            parts.append(f"[{r['location']}]")
+        lines.append(" ".join(parts))
+    return "\n".join(lines)
+
+
+def _compact_pantry_lines(groups: list[tuple[str, list[str]]]) -> str:
+    lines = []
+    budget = _PANTRY_SUMMARY_LIMIT
+    dropped = 0
+    for category, names in groups:
+        if dropped:
+            dropped += len(names)
+            continue
+        line = f"{category}: "
+        shown = []
+        for name in names:
+            piece = name if not shown else f", {name}"
+            if len(line) + len(piece) > budget:
+                break
+            line += piece
+            shown.append(name)
+        dropped = len(names) - len(shown)
+        if shown:
+            lines.append(line)
+            budget -= len(line) + 1
+    if dropped:
+        lines.append(f"(+{dropped} more)")
+    return "\n".join(lines)
 
 
 def _parse_recipe_json(text: str) -> Optional[Recipe]:
     """Extract JSON from Claude's response and parse into Recipe."""
     # Try to find JSON block in response
-    match = re.search(r"```(?:json)?\s*([\s\S]+?)\s*```", text)
+    match = _FENCE_RE.search(text)
     if match:
         json_str = match.group(1)
     else:
@@ -100,43 +334,108 @@ def _parse_recipe_json(text: str) -> Optional[Recipe]:
         json_str = text.strip()
 
     try:
-        data = json.loads(json_str)
+        data = _loads(json_str)
     except json.JSONDecodeError:
         return None
+    if not _valid(_validate_recipe, data):
+        return None
+    return _recipe_from_dict(data)
 
-    ingredients = [
-        RecipeIngredient(
-            id=None,
-            recipe_id=None,
-            name=ing.get("name", ""),
-            quantity=ing.get("quantity"),
-            unit=ing.get("unit"),
-        )
-        for ing in data.get("ingredients", [])
-    ]
 
-    rating = data.get("rating")
-    if rating is not None:
-        try:
-            rating = max(1, min(5, int(rating)))
-        except (ValueError, TypeError):
-            rating = None
+def _clamp_rating(value) -> Optional[int]:
+    if value is None:
+        return None
+    try:
+        return max(1, min(5, int(value)))
+    except (ValueError, TypeError):
+        return None
+
+
+def _as_int(value, default: Optional[int]) -> Optional[int]:
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return default
+
+
+def _as_float(value) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
 
+def _with_numbers(item, floats: tuple = (), ints: tuple = ()):
+    """Copy a response object with numeric-string fields (e.g. "3.49") converted.
+
+    Models often quote numbers; unparseable values become None so the schema
+    validator rejects them.  Non-objects are returned unchanged.
+    """
+    if not isinstance(item, dict):
+        return item
+    item = dict(item)
+    for key in floats:
+        if key in item:
+            item[key] = _as_float(item[key])
+    for key in ints:
+        if key in item:
+            item[key] = _as_int(item[key], None)
+    return item
+
+
+def _recipe_from_dict(data: dict) -> Recipe:
+    """Build a Recipe from one RECIPE_SCHEMA object, with schema defaults.
+
+    The single place the schema is mapped onto the dataclasses: servings,
+    rating and ingredient quantities are coerced to numbers (falling back to
+    the default, or None, when unparseable), and ingredient entries that
+    aren't objects with a name are skipped.
+    """
+    get = data.get
     return Recipe(
         id=None,
-        name=data.get("name", "Untitled Recipe"),
-        description=data.get("description"),
-        servings=data.get("servings", 4),
-        prep_time=data.get("prep_time"),
-        cook_time=data.get("cook_time"),
-        instructions=data.get("instructions"),
-        source_url=data.get("source_url"),
-        tags=data.get("tags"),
-        rating=rating,
-        ingredients=ingredients,
+        name=get("name", "Untitled Recipe"),
+        description=get("description"),
+        servings=_as_int(get("servings"), 4),
+        prep_time=get("prep_time"),
+        cook_time=get("cook_time"),
+        instructions=get("instructions"),
+        source_url=get("source_url"),
+        tags=get("tags"),
+        rating=_clamp_rating(get("rating")),
+        ingredients=[
+            RecipeIngredient(
+                id=None,
+                recipe_id=None,
+                name=ing["name"],
+                quantity=_as_float(ing.get("quantity")),
+                unit=ing.get("unit"),
+            )
+            for ing in get("ingredients") or ()
+            if _valid(_validate_ingredient, ing)
+        ],
     )
 
 
+def _cached_recipe(key: str, ask) -> Optional[Recipe]:
+    """Return the recipe cached under key, or call ask() for fresh response text.
+
+    Only responses that parse into a Recipe are cached.
+    """
+    cached = ai_cache.get(key)
+    if cached is not None:
+        recipe = _parse_recipe_json(cached)
+        if recipe:
+            return recipe
+    text = ask()
+    recipe = _parse_recipe_json(text)
+    if recipe:
+        ai_cache.put(key, text)
+    return recipe
+
+
 # JSON schema template included in every AI prompt so Claude returns structured data.
 RECIPE_SCHEMA = """
 {
@@ -156,92 +455,122 @@ RECIPE_SCHEMA = """
 """
 
 
+def _cached_system(text: str) -> list[dict]:
+    """Wrap a static system prompt as one block marked for Anthropic prompt caching.
+
+    Keep per-call data out of it so every call shares the cached prefix.
+    The API ignores the marker on prompts shorter than its minimum cacheable
+    length, so it is safe to set unconditionally.
+    """
+    return [{"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}]
+
+
+# Shared by every call that returns recipes; the user message carries only the input.
+_RECIPE_SYSTEM = _cached_system(f"""You are a recipe assistant that returns recipes as structured JSON.
+Every recipe must match this schema exactly:
+{RECIPE_SCHEMA}
+Return only the JSON (a single object, or an array of objects when asked for several recipes), wrapped in ```json``` code fences.""")
+
+
 def parse_recipe_text(text: str) -> Optional[Recipe]:
-    """Send raw recipe text to Claude and get back a structured Recipe."""
+    """Send raw recipe text to Claude and get back a structured Recipe.
+
+    Results are cached by the normalized text (see ai_cache).
+    """
+    return _cached_recipe(
+        ai_cache.make_key("text", ai_cache.normalize_text(text)),
+        lambda: _ask_parse_recipe_text(text),
+    )
+
+
+def _ask_parse_recipe_text(text: str) -> str:
     client = _get_client()
-    prompt = f"""Extract the recipe from the following text and return it as JSON matching this schema exactly:
-{RECIPE_SCHEMA}
+    prompt = f"""Extract the recipe from the following text.
 
 Recipe text:
-{text}
-
-Return only the JSON, wrapped in ```json``` code fences."""
+{text}"""
 
     message = client.messages.create(
         model="claude-opus-4-5-20251101",
         max_tokens=2048,
+        system=_RECIPE_SYSTEM,
         messages=[{"role": "user", "content": prompt}],
     )
-    return _parse_recipe_json(message.content[0].text)
+    return message.content[0].text
 
 
 def parse_recipe_url(url: str) -> Optional[Recipe]:
-    """Fetch a URL and have Claude extract the recipe."""
-    try:
-        response = httpx.get(url, follow_redirects=True, timeout=15)
-        response.raise_for_status()
-        html = response.text
-    except Exception as e:
-        raise ValueError(f"Failed to fetch URL: {e}")
+    """Fetch a URL and have Claude extract the recipe.
 
-    # Strip down HTML to reduce token usage — keep text content
-    # Remove script/style tags and their content
-    clean = re.sub(r"<(script|style)[^>]*>[\s\S]*?</\1>", "", html, flags=re.IGNORECASE)
-    # Remove all other HTML tags
-    clean = re.sub(r"<[^>]+>", " ", clean)
+    Results are cached by canonical URL, so a repeat import skips both the
+    page fetch and the API call.
+    """
+    recipe = _cached_recipe(
+        ai_cache.make_key("url", ai_cache.canonical_url(url)),
+        lambda: _ask_parse_recipe_url(url),
+    )
+    if recipe:
+        recipe.source_url = url
+    return recipe
+
+
+def _page_text(html: str, limit: int = 12000) -> str:
+    """Strip a web page down to its visible text to reduce token usage.
+
+    Scripts, styles and navigation/footer boilerplate are dropped before
+    truncating, so more of the limit goes to the recipe itself.
+    """
+    tree = LexborHTMLParser(html)
+    for node in tree.css(_BOILERPLATE_TAGS):
+        node.decompose()
+    root = tree.body or tree.root
+    text = root.text(separator=" ", strip=True) if root is not None else ""
     # Collapse whitespace
-    clean = re.sub(r"\s+", " ", clean).strip()
+    clean = _WS_RE.sub(" ", text).strip()
     # Truncate to avoid hitting token limits
-    if len(clean) > 12000:
-        clean = clean[:12000] + "..."
+    if len(clean) > limit:
+        clean = clean[:limit] + "..."
+    return clean
 
-    client = _get_client()
-    prompt = f"""Extract the recipe from the following web page content and return it as JSON matching this schema exactly:
-{RECIPE_SCHEMA}
 
+def _ask_parse_recipe_url(url: str) -> str:
+    try:
+        html = _fetch_page(url)
+    except Exception as e:
+        raise ValueError(f"Failed to fetch URL: {e}")
+
+    clean = _page_text(html)
+    client = _get_client()
+    prompt = f"""Extract the recipe from the following web page content.
 Also include "source_url": "{url}" in the JSON.
 
 Page content:
-{clean}
-
-Return only the JSON, wrapped in ```json``` code fences."""
+{clean}"""
 
     message = client.messages.create(
         model="claude-opus-4-5-20251101",
         max_tokens=2048,
+        system=_RECIPE_SYSTEM,
         messages=[{"role": "user", "content": prompt}],
     )
-    recipe = _parse_recipe_json(message.content[0].text)
-    if recipe:
-        recipe.source_url = url
-    return recipe
+    return message.content[0].text
 
 
 def fetch_og_image(url: str) -> Optional[bytes]:
     """Attempt to download the og:image from a URL. Returns image bytes or None."""
     try:
-        response = httpx.get(url, follow_redirects=True, timeout=15)
-        response.raise_for_status()
-        html = response.text
+        html = _fetch_page(url)
     except Exception:
         return None
 
     # Try both attribute orderings
-    match = re.search(
-        r'<meta[^>]+property=["\']og:image["\'][^>]+content=["\']([^"\']+)["\']',
-        html, re.IGNORECASE
-    )
-    if not match:
-        match = re.search(
-            r'<meta[^>]+content=["\']([^"\']+)["\'][^>]+property=["\']og:image["\']',
-            html, re.IGNORECASE
-        )
+    match = _OG_IMAGE_RE.search(html) or _OG_IMAGE_REVERSED_RE.search(html)
     if not match:
         return None
 
     img_url = match.group(1)
     try:
-        img_response = httpx.get(img_url, follow_redirects=True, timeout=15)
+        img_response = _HTTP.get(img_url)
         img_response.raise_for_status()
         return img_response.content
     except Exception:
@@ -250,24 +579,16 @@ def fetch_og_image(url: str) -> Optional[bytes]:
 
 def generate_recipe(preferences: str = "") -> Optional[Recipe]:
     """Generate a recipe using current pantry contents."""
-    pantry_summary = _get_pantry_summary()
     client = _get_client()
 
     extra = f"\n\nAdditional preferences or constraints: {preferences}" if preferences else ""
-    prompt = f"""I have the following items in my pantry/fridge/freezer:
-
-{pantry_summary}
-
-Please create a recipe I can make using primarily these ingredients. Return it as JSON matching this schema exactly:
-{RECIPE_SCHEMA}
-{extra}
-
-Return only the JSON, wrapped in ```json``` code fences."""
+    prompt = f"Please create a recipe I can make using primarily these ingredients.{extra}"
 
     message = client.messages.create(
         model="claude-opus-4-5-20251101",
         max_tokens=2048,
-        messages=[{"role": "user", "content": prompt}],
+        system=_RECIPE_SYSTEM,
+        messages=[{"role": "user", "content": [_pantry_block(), {"type": "text", "text": prompt}]}],
     )
     return _parse_recipe_json(message.content[0].text)
 
@@ -287,51 +608,57 @@ def _format_recipes_for_suggest(recipes) -> str:
     return "\n".join(lines)
 
 
-def suggest_week(existing_recipes: list, preferences: str = "") -> list[dict]:
-    """Suggest a full week of meals. Returns list of {date, slot, recipe_name, notes}."""
-    pantry_summary = _get_pantry_summary()
-    recipes_str = _format_recipes_for_suggest(existing_recipes)
-    client = _get_client()
-
-    extra = f"\n\nPreferences/constraints: {preferences}" if preferences else ""
-    prompt = f"""Help me plan a week of meals (Monday through Sunday, with Breakfast, Lunch, and Dinner each day).
-
-My pantry/fridge/freezer contains:
-{pantry_summary}
-
-My saved recipes include:
-{recipes_str}
+_SUGGEST_WEEK_SYSTEM = _cached_system("""Help the user plan a week of meals (Monday through Sunday, with Breakfast, Lunch, and Dinner each day).
 
 Prefer recipes with higher ratings (4-5 stars). Consider tags when planning — use 'breakfast' tagged recipes for breakfast slots, respect dietary tags like 'vegetarian', 'gluten-free', etc.
 
-You can suggest meals from my saved recipes, simple meals using pantry items, or new recipe ideas.
+You can suggest meals from the user's saved recipes, simple meals using pantry items, or new recipe ideas.
 Return a JSON array like this:
 ```json
 [
-  {{"day": "Monday", "slot": "Breakfast", "meal": "Oatmeal with fruit", "notes": "Use pantry oats"}},
-  {{"day": "Monday", "slot": "Lunch", "meal": "...", "notes": "..."}},
+  {"day": "Monday", "slot": "Breakfast", "meal": "Oatmeal with fruit", "notes": "Use pantry oats"},
+  {"day": "Monday", "slot": "Lunch", "meal": "...", "notes": "..."},
   ...
 ]
 ```
-{extra}
 
-Return only the JSON array, wrapped in ```json``` code fences."""
+Return only the JSON array, wrapped in ```json``` code fences.""")
+
+
+def suggest_week(existing_recipes: list, preferences: str = "") -> list[dict]:
+    """Suggest a full week of meals. Returns list of {date, slot, recipe_name, notes}."""
+    recipes_str = _format_recipes_for_suggest(existing_recipes)
+    client = _get_client()
+
+    extra = f"\n\nPreferences/constraints: {preferences}" if preferences else ""
+    prompt = f"""My saved recipes include:
+{recipes_str}{extra}"""
 
     message = client.messages.create(
         model="claude-opus-4-5-20251101",
         max_tokens=4096,
-        messages=[{"role": "user", "content": prompt}],
+        system=_SUGGEST_WEEK_SYSTEM,
+        messages=[{"role": "user", "content": [_pantry_block(), {"type": "text", "text": prompt}]}],
     )
     text = message.content[0].text
-    match = re.search(r"```(?:json)?\s*([\s\S]+?)\s*```", text)
+    match = _FENCE_RE.search(text)
     if match:
         try:
-            return json.loads(match.group(1))
+            data = _loads(match.group(1))
         except json.JSONDecodeError:
-            pass
+            return []
+        if isinstance(data, list):
+            return [s for s in data if _valid(_validate_suggestion, s)]
     return []
 
 
+_ESTIMATE_PRICES_SYSTEM = _cached_system("""Estimate current US grocery store prices for ingredients.
+Return a JSON object with EXACTLY the keys in the user's template and a numeric price value for each.
+
+Prices should be per the unit shown (e.g. per lb, per cup, per clove).
+Replace each <price...> with a realistic number. Return only the filled-in JSON in ```json``` code fences.""")
+
+
 def estimate_prices(items: list[tuple[str, float, str]]) -> dict[str, float]:
     """Estimate current US grocery unit prices for a list of ingredients.
 
@@ -341,37 +668,28 @@ def estimate_prices(items: list[tuple[str, float, str]]) -> dict[str, float]:
     client = _get_client()
 
     # Build a structured list with explicit keys the AI must use
-    item_lines = []
-    expected_keys = []
-    for name, qty, unit in items:
-        key = name.lower().strip()
-        expected_keys.append(key)
-        unit_str = f" per {unit}" if unit else " per unit"
-        item_lines.append(f'  "{key}": <price{unit_str}>')
-
-    items_template = ",\n".join(item_lines)
-
-    prompt = f"""Estimate current US grocery store prices for these ingredients.
-Return a JSON object with EXACTLY these keys and a numeric price value for each.
+    keys = [name.lower().strip() for name, _, _ in items]
+    items_template = ",\n".join(
+        f'  "{key}": <price per {unit or "unit"}>' for key, (_, _, unit) in zip(keys, items)
+    )
+    expected = set(keys)
 
-Fill in this template:
+    prompt = f"""Fill in this template:
 ```json
 {{
 {items_template}
 }}
-```
-
-Prices should be per the unit shown (e.g. per lb, per cup, per clove).
-Replace each <price...> with a realistic number. Return only the filled-in JSON in ```json``` code fences."""
+```"""
 
     message = client.messages.create(
         model="claude-opus-4-5-20251101",
         max_tokens=2048,
+        system=_ESTIMATE_PRICES_SYSTEM,
         messages=[{"role": "user", "content": prompt}],
     )
 
     text = message.content[0].text
-    match = re.search(r"```(?:json)?\s*([\s\S]+?)\s*```", text)
+    match = _FENCE_RE.search(text)
     if match:
         json_str = match.group(1)
     else:
@@ -379,22 +697,79 @@ Replace each <price...> with a realistic number. Return only the filled-in JSON
         json_str = text.strip()
 
     try:
-        data = json.loads(json_str)
+        data = _loads(json_str)
     except json.JSONDecodeError:
         return {}
+    if not isinstance(data, dict):
+        return {}
 
-    # Validate: only keep positive numeric values
+    # Validate: only keep positive numeric values for the keys we asked about
     result = {}
     for key, val in data.items():
-        try:
-            price = float(val)
-            if price > 0:
-                result[key.lower().strip()] = price
-        except (ValueError, TypeError):
-            continue
+        key = key.lower().strip()
+        if key in expected and _valid(_validate_price, val):
+            result[key] = float(val)
     return result
 
 
+_NORMALIZE_SYSTEM = _cached_system("""Convert recipe ingredients into their purchasable shopping form.
+
+For each ingredient:
+1. Strip preparation instructions (drained, minced, divided, chopped, room temperature, etc.)
+2. Convert to how the item is purchased (e.g. "30oz black beans drained" -> "canned black beans", qty 2, unit "15oz cans")
+3. Keep qualifiers that affect what you buy: canned, dry, fresh, frozen, whole, ground, etc.
+4. Use common grocery units: lbs, oz, each, bunch, cans, bags, bottles, etc.
+5. Normalize the name to a common grocery name (e.g. "garlic cloves" -> "garlic")
+
+Return a JSON array with one entry per ingredient (same order), matching this schema:
+```json
+[
+  {"index": 0, "shopping_name": "chicken breast", "shopping_qty": 2, "shopping_unit": "lbs"},
+  {"index": 1, "shopping_name": "garlic", "shopping_qty": 1, "shopping_unit": "head"}
+]
+```
+
+Return only the JSON array, wrapped in ```json``` code fences.""")
+
+
+def _normalization_key(ing: RecipeIngredient) -> str:
+    qty = f"{ing.quantity:g}" if ing.quantity else ""
+    return "\x1f".join((ing.key, qty, (ing.unit or "").lower().strip()))
+
+
+def _load_normalizations(keys: list[str]) -> dict[str, dict]:
+    """Return previously stored normalizations for keys, in one query."""
+    conn = get_connection()
+    try:
+        rows = conn.execute(
+            "SELECT * FROM ingredient_normalization WHERE key IN ({})".format(",".join("?" * len(keys))),
+            keys,
+        ).fetchall()
+    finally:
+        conn.close()
+    return {
+        row["key"]: {
+            "shopping_name": row["shopping_name"],
+            "shopping_qty": row["shopping_qty"],
+            "shopping_unit": row["shopping_unit"],
+        }
+        for row in rows
+    }
+
+
+def _store_normalizations(found: dict[str, dict]) -> None:
+    conn = get_connection()
+    try:
+        conn.executemany(
+            "INSERT OR REPLACE INTO ingredient_normalization "
+            "(key, shopping_name, shopping_qty, shopping_unit) VALUES (?, ?, ?, ?)",
+            [(k, v["shopping_name"], v["shopping_qty"], v["shopping_unit"]) for k, v in found.items()],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
 def normalize_ingredients(ingredients: list[RecipeIngredient]) -> list[dict]:
     """Normalize recipe ingredients into purchasable shopping form.
 
@@ -403,11 +778,32 @@ def normalize_ingredients(ingredients: list[RecipeIngredient]) -> list[dict]:
 
     The AI strips preparation instructions (drained, minced, divided, room temperature),
     converts recipe amounts to purchase units (30oz -> 2 cans), and preserves qualifiers
-    that affect what to buy (canned, dry, fresh, frozen).
+    that affect what to buy (canned, dry, fresh, frozen).  Answers are stored in the
+    ingredient_normalization table keyed on (name, qty, unit), so only ingredients not
+    seen before are sent to the API.
     """
     if not ingredients:
         return []
 
+    keys = [_normalization_key(ing) for ing in ingredients]
+    known = _load_normalizations(list(set(keys)))
+    missing: dict[str, RecipeIngredient] = {}
+    for key, ing in zip(keys, ingredients):
+        if key not in known:
+            missing.setdefault(key, ing)
+
+    if missing:
+        fresh = _normalize_with_ai(list(missing.values()))
+        found = {key: item for key, item in zip(missing, fresh) if item["shopping_name"]}
+        if found:
+            _store_normalizations(found)
+        known.update(found)
+
+    empty = {"shopping_name": None, "shopping_qty": None, "shopping_unit": None}
+    return [dict(known.get(key, empty)) for key in keys]
+
+
+def _normalize_with_ai(ingredients: list[RecipeIngredient]) -> list[dict]:
     client = _get_client()
 
     ing_lines = []
@@ -418,41 +814,23 @@ def normalize_ingredients(ingredients: list[RecipeIngredient]) -> list[dict]:
 
     ingredients_text = "\n".join(ing_lines)
 
-    prompt = f"""Convert these recipe ingredients into their purchasable shopping form.
-
-For each ingredient:
-1. Strip preparation instructions (drained, minced, divided, chopped, room temperature, etc.)
-2. Convert to how the item is purchased (e.g. "30oz black beans drained" -> "canned black beans", qty 2, unit "15oz cans")
-3. Keep qualifiers that affect what you buy: canned, dry, fresh, frozen, whole, ground, etc.
-4. Use common grocery units: lbs, oz, each, bunch, cans, bags, bottles, etc.
-5. Normalize the name to a common grocery name (e.g. "garlic cloves" -> "garlic")
-
-Recipe ingredients:
-{ingredients_text}
-
-Return a JSON array with one entry per ingredient (same order), matching this schema:
-```json
-[
-  {{"index": 0, "shopping_name": "chicken breast", "shopping_qty": 2, "shopping_unit": "lbs"}},
-  {{"index": 1, "shopping_name": "garlic", "shopping_qty": 1, "shopping_unit": "head"}}
-]
-```
-
-Return only the JSON array, wrapped in ```json``` code fences."""
+    prompt = f"""Recipe ingredients:
+{ingredients_text}"""
 
     message = client.messages.create(
         model="claude-opus-4-5-20251101",
         max_tokens=2048,
+        system=_NORMALIZE_SYSTEM,
         messages=[{"role": "user", "content": prompt}],
     )
 
     text = message.content[0].text
-    match = re.search(r"```(?:json)?\s*([\s\S]+?)\s*```", text)
+    match = _FENCE_RE.search(text)
     if not match:
         return []
 
     try:
-        data = json.loads(match.group(1))
+        data = _loads(match.group(1))
     except json.JSONDecodeError:
         return []
 
@@ -461,7 +839,9 @@ Return only the JSON array, wrapped in ```json``` code fences."""
 
     # Build result list aligned to input order
     result = []
-    data_by_index = {item.get("index", i): item for i, item in enumerate(data)}
+    data_by_index = {
+        item.get("index", i): item for i, item in enumerate(data) if _valid(_validate_shopping_item, item)
+    }
     for i in range(len(ingredients)):
         item = data_by_index.get(i, {})
         result.append({
@@ -473,35 +853,27 @@ Return only the JSON array, wrapped in ```json``` code fences."""
     return result
 
 
-def parse_receipt_image(image_paths: list[str]) -> list[dict]:
-    """Extract item names and prices from receipt photo(s).
+def _image_block(path: str) -> dict:
+    """Base64-encode one image file into an API image content block.
 
-    Takes a list of file paths to receipt images (JPG/PNG).
-    Returns list of dicts: [{"item_name": str, "total_price": float, "quantity": int, "unit_price": float}, ...]
+    The file is memory-mapped so the encoder reads the pages directly instead
+    of first copying the whole photo into a bytes object.
     """
-    if not image_paths:
-        return []
-
-    import base64
-    from pathlib import Path
-
-    client = _get_client()
-
-    content = []
-    for path in image_paths:
-        p = Path(path)
-        suffix = p.suffix.lower()
-        media_type = "image/jpeg" if suffix in (".jpg", ".jpeg") else "image/png"
-        with open(p, "rb") as f:
-            data = base64.standard_b64encode(f.read()).decode("utf-8")
-        content.append({
-            "type": "image",
-            "source": {"type": "base64", "media_type": media_type, "data": data},
-        })
-
-    content.append({
-        "type": "text",
-        "text": """Extract all grocery items and their prices from this receipt.
+    p = Path(path)
+    media_type = "image/jpeg" if p.suffix.lower() in (".jpg", ".jpeg") else "image/png"
+    with open(p, "rb") as f:
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                data = base64.b64encode(mm).decode("ascii")
+        else:
+            data = ""
+    return {
+        "type": "image",
+        "source": {"type": "base64", "media_type": media_type, "data": data},
+    }
+
+
+_RECEIPT_IMAGE_SYSTEM = _cached_system("""Extract all grocery items and their prices from the receipt image.
 
 For each item, provide:
 - item_name: the product name (simplified to a common grocery name, e.g. "BLK BEANS 15OZ" -> "canned black beans")
@@ -517,46 +889,77 @@ Return a JSON array:
 ```
 
 Ignore tax lines, subtotals, totals, and non-grocery items (bags, coupons, etc.).
-Return only the JSON array, wrapped in ```json``` code fences."""
-    })
+Return only the JSON array, wrapped in ```json``` code fences.""")
 
-    message = client.messages.create(
-        model="claude-opus-4-5-20251101",
-        max_tokens=4096,
-        messages=[{"role": "user", "content": content}],
-    )
+_RECEIPT_CONCURRENCY = 4
 
-    text = message.content[0].text
-    match = re.search(r"```(?:json)?\s*([\s\S]+?)\s*```", text)
+# A malformed response fails one item of a concurrent batch; anything else
+# (auth, rate limits, outages, unreadable files) fails the whole call.
+_PARSE_ERRORS = (ValueError, TypeError, KeyError, IndexError)
+
+
+def parse_receipt_image(image_paths: list[str]) -> list[dict]:
+    """Extract item names and prices from receipt photo(s).
+
+    Takes a list of file paths to receipt images (JPG/PNG).  Each image is
+    treated as its own receipt and sent as a separate concurrent request;
+    the items are returned in image order.  An unparseable reply contributes
+    no items; unreadable files and API errors are raised.
+    Returns list of dicts: [{"item_name": str, "total_price": float, "quantity": int, "unit_price": float}, ...]
+    """
+    if not image_paths:
+        return []
+
+    client = _get_async_client()
+    return asyncio.run(_parse_receipts(client, image_paths))
+
+
+async def _parse_receipts(client, image_paths: list[str]) -> list[dict]:
+    limit = asyncio.Semaphore(_RECEIPT_CONCURRENCY)
+
+    async def one(path: str) -> list[dict]:
+        async with limit:
+            image = await asyncio.to_thread(_image_block, path)
+            message = await client.messages.create(
+                model="claude-opus-4-5-20251101",
+                max_tokens=4096,
+                system=_RECEIPT_IMAGE_SYSTEM,
+                messages=[{"role": "user", "content": [image]}],
+            )
+        try:
+            return _receipt_items(message.content[0].text)
+        except _PARSE_ERRORS:
+            return []
+
+    async with client:
+        results = await asyncio.gather(*(one(p) for p in image_paths))
+    return [item for items in results for item in items]
+
+
+def _receipt_items(text: str) -> list[dict]:
+    """Validate the model's item array and compute unit prices."""
+    match = _FENCE_RE.search(text)
     if not match:
         return []
 
     try:
-        data = json.loads(match.group(1))
+        data = _loads(match.group(1))
     except json.JSONDecodeError:
         return []
 
     if not isinstance(data, list):
         return []
 
-    # Validate and compute unit prices
-    results = []
-    for item in data:
-        try:
-            name = item.get("item_name", "").strip()
-            price = float(item.get("price", 0))
-            qty = int(item.get("quantity", 1))
-            if name and price > 0 and qty > 0:
-                results.append({
-                    "item_name": name,
-                    "total_price": price,
-                    "quantity": qty,
-                    "unit_price": round(price / qty, 2),
-                })
-        except (ValueError, TypeError):
-            continue
-
-    return results
+    return [
+        {
+            "item_name": item["item_name"].strip(),
+            "total_price": float(item["price"]),
+            "quantity": item["quantity"],
+            "unit_price": round(item["price"] / item["quantity"], 2),
+        }
+        for item in (_with_numbers(raw, floats=("price",), ints=("quantity",)) for raw in data)
+        if _valid(_validate_receipt_item, item)
+    ]
 
 
 def parse_receipt(text: str) -> list[dict]:
@@ -587,32 +990,37 @@ Receipt text:
     raw = response.content[0].text.strip()
 
     # Strip markdown code fences if present
-    match = re.search(r"```(?:json)?\s*([\s\S]+?)\s*```", raw)
+    match = _FENCE_RE.search(raw)
     if match:
         raw = match.group(1)
 
     try:
-        items = json.loads(raw)
-        return [
-            {
-                "item_name": str(i.get("item_name", "")).strip(),
-                "unit_price": float(i.get("unit_price", 0)),
-                "unit": i.get("unit") or None,
-            }
-            for i in items
-            if i.get("item_name") and i.get("unit_price") is not None
-        ]
-    except (json.JSONDecodeError, TypeError, ValueError):
+        items = _loads(raw)
+    except json.JSONDecodeError:
         return []
+    if not isinstance(items, list):
+        return []
+    return [
+        {
+            "item_name": i["item_name"].strip(),
+            "unit_price": float(i["unit_price"]),
+            "unit": i.get("unit") or None,
+        }
+        for i in (_with_numbers(raw, floats=("unit_price",)) for raw in items)
+        if _valid(_validate_receipt_text_item, i)
+    ]
 
 
 def modify_recipe(recipe: Recipe, instruction: str) -> Optional[Recipe]:
-    """Modify an existing recipe per user instruction."""
+    """Modify an existing recipe per user instruction.
+
+    Results are cached by the normalized prompt (instruction plus recipe), so
+    editing the recipe yields a fresh modification.
+    """
     ingredients_str = "\n".join(
         f"- {ing.quantity or ''} {ing.unit or ''} {ing.name}".strip()
         for ing in recipe.ingredients
     )
-    client = _get_client()
 
     prompt = f"""Modify the following recipe according to this instruction: {instruction}
 
@@ -630,28 +1038,31 @@ Ingredients:
 Instructions:
 {recipe.instructions}
 
-Return the modified recipe as JSON matching this schema exactly:
-{RECIPE_SCHEMA}
+Return the modified recipe."""
 
-Return only the JSON, wrapped in ```json``` code fences."""
+    def ask() -> str:
+        message = _get_client().messages.create(
+            model="claude-opus-4-5-20251101",
+            max_tokens=2048,
+            system=_RECIPE_SYSTEM,
+            messages=[{"role": "user", "content": prompt}],
+        )
+        return message.content[0].text
 
-    message = client.messages.create(
-        model="claude-opus-4-5-20251101",
-        max_tokens=2048,
-        messages=[{"role": "user", "content": prompt}],
+    modified = _cached_recipe(
+        ai_cache.make_key("modify", ai_cache.normalize_text(prompt)), ask,
     )
-    modified = _parse_recipe_json(message.content[0].text)
     if modified:
         if recipe.source_url:
             modified.source_url = recipe.source_url
         # Carry forward estimated_price from original ingredients by matching name
         price_map = {
-            ing.name.lower().strip(): ing.estimated_price
+            ing.key: ing.estimated_price
             for ing in recipe.ingredients
             if ing.estimated_price is not None
         }
         for ing in modified.ingredients:
-            price = price_map.get(ing.name.lower().strip())
+            price = price_map.get(ing.key)
             if price is not None:
                 ing.estimated_price = price
     return modified
@@ -665,77 +1076,51 @@ PREDEFINED_TAGS = (
 )
 
 
-def bulk_generate_recipes(count: int = 5, preferences: str = "") -> list[Recipe]:
-    """Generate multiple recipes in a single API call. Returns list of Recipe objects."""
-    pantry_summary = _get_pantry_summary()
-    client = _get_client()
-
-    extra = f"\n\nAdditional preferences: {preferences}" if preferences else ""
-    prompt = f"""Generate exactly {count} different recipes. Use a variety of meal types (breakfast, lunch, dinner, snacks).
+# Each concurrent bulk request gets its own meal type so the batch stays varied.
+_BULK_MEAL_TYPES = ("dinner", "lunch", "breakfast", "dinner", "snack")
+_BULK_CONCURRENCY = 5
 
-My pantry/fridge/freezer contains:
-{pantry_summary}
 
-For tags, pick from this predefined list (comma-separated): {PREDEFINED_TAGS}
-You may also add custom tags if needed.
-
-Each recipe should include a rating from 1-5 (how good/recommended the recipe is).
+def bulk_generate_recipes(count: int = 5, preferences: str = "") -> list[Recipe]:
+    """Generate multiple recipes, one concurrent API call per recipe.
 
-Return a JSON array of {count} recipe objects, each matching this schema:
-{RECIPE_SCHEMA}
-{extra}
+    Every call shares the cached system and pantry prefix, so only the short
+    per-recipe tail and the output are billed at full rate. Unparseable
+    generations are skipped; API errors (bad key, rate limits, outages) are
+    raised. Runs its own event loop — call it from a worker thread, not from
+    inside a running loop.
+    """
+    if count <= 0:
+        return []
+    client = _get_async_client()
+    pantry = _pantry_block()
+    return asyncio.run(_bulk_generate(client, pantry, count, preferences))
 
-Return only the JSON array, wrapped in ```json``` code fences."""
 
-    message = client.messages.create(
-        model="claude-opus-4-5-20251101",
-        max_tokens=4096,
-        messages=[{"role": "user", "content": prompt}],
-    )
-    text = message.content[0].text
-    match = re.search(r"```(?:json)?\s*([\s\S]+?)\s*```", text)
-    if not match:
-        return []
+async def _bulk_generate(client, pantry: dict, count: int, preferences: str) -> list[Recipe]:
+    extra = f"\n\nAdditional preferences: {preferences}" if preferences else ""
+    limit = asyncio.Semaphore(_BULK_CONCURRENCY)
 
-    try:
-        data = json.loads(match.group(1))
-    except json.JSONDecodeError:
-        return []
+    async def one(i: int) -> Optional[Recipe]:
+        meal_type = _BULK_MEAL_TYPES[i % len(_BULK_MEAL_TYPES)]
+        prompt = f"""Create a {meal_type} recipe I can make using primarily these ingredients. (Recipe {i + 1} of {count} in a varied batch.)
 
-    if not isinstance(data, list):
-        data = [data]
+For tags, pick from this predefined list (comma-separated): {PREDEFINED_TAGS}
+You may also add custom tags if needed.
 
-    recipes = []
-    for item in data:
+Include a rating from 1-5 (how good/recommended the recipe is).{extra}"""
+        async with limit:
+            message = await client.messages.create(
+                model="claude-opus-4-5-20251101",
+                max_tokens=2048,
+                system=_RECIPE_SYSTEM,
+                messages=[{"role": "user", "content": [pantry, {"type": "text", "text": prompt}]}],
+            )
         try:
-            ingredients = [
-                RecipeIngredient(
-                    id=None, recipe_id=None,
-                    name=ing.get("name", ""),
-                    quantity=ing.get("quantity"),
-                    unit=ing.get("unit"),
-                )
-                for ing in item.get("ingredients", [])
-            ]
-            rating = item.get("rating")
-            if rating is not None:
-                try:
-                    rating = max(1, min(5, int(rating)))
-                except (ValueError, TypeError):
-                    rating = None
-            recipes.append(Recipe(
-                id=None,
-                name=item.get("name", "Untitled Recipe"),
-                description=item.get("description"),
-                servings=item.get("servings", 4),
-                prep_time=item.get("prep_time"),
-                cook_time=item.get("cook_time"),
-                instructions=item.get("instructions"),
-                source_url=item.get("source_url"),
-                tags=item.get("tags"),
-                rating=rating,
-                ingredients=ingredients,
-            ))
-        except Exception:
-            continue  # Skip entries that fail to parse
-    return recipes
+            return _parse_recipe_json(message.content[0].text)
+        except _PARSE_ERRORS:
+            return None
+
+    async with client:
+        results = await asyncio.gather(*(one(i) for i in range(count)))
+    return [r for r in results if r is not None]
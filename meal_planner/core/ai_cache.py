@@ -0,0 +1,80 @@
+"""Response cache for Claude calls, backed by the SQLite ai_cache table.
+
+Entries map a key (a hash of the normalized request) to the raw response
+text, so a repeated parse/modify request skips the API round-trip.  Entries
+older than DEFAULT_TTL are ignored, and purged whenever a new one is stored.
+"""
+
+import hashlib
+import re
+import time
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from meal_planner.db.database import get_connection
+
+DEFAULT_TTL = 7 * 24 * 60 * 60  # 7 days
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and collapse whitespace so trivially different inputs share a key."""
+    return _WHITESPACE_RE.sub(" ", text).strip().lower()
+
+
+def canonical_url(url: str) -> str:
+    """Canonicalize a URL for caching: lowercase scheme/host, drop the fragment,
+    tracking (utm_*) parameters and any trailing slash, and sort the query."""
+    parts = urlsplit(url.strip())
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_")
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
+
+
+def make_key(kind: str, *parts: str) -> str:
+    """Build a cache key for one kind of request (e.g. "text", "url", "modify")."""
+    digest = hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+    return f"{kind}:{digest}"
+
+
+def get(key: str, max_age: int = DEFAULT_TTL) -> Optional[str]:
+    """Return the cached response for key, or None if missing or expired."""
+    conn = get_connection()
+    try:
+        row = conn.execute(
+            "SELECT value FROM ai_cache WHERE key = ? AND created_at >= ?",
+            (key, int(time.time()) - max_age),
+        ).fetchone()
+        return row["value"] if row else None
+    finally:
+        conn.close()
+
+
+def put(key: str, value: str) -> None:
+    """Store (or replace) the cached response for key, dropping expired entries."""
+    now = int(time.time())
+    conn = get_connection()
+    try:
+        conn.execute("DELETE FROM ai_cache WHERE created_at < ?", (now - DEFAULT_TTL,))
+        conn.execute(
+            "INSERT INTO ai_cache (key, value, created_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value=excluded.value, created_at=excluded.created_at",
+            (key, value, now),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def clear() -> None:
+    """Delete every cached response."""
+    conn = get_connection()
+    try:
+        conn.execute("DELETE FROM ai_cache")
+        conn.commit()
+    finally:
+        conn.close()
@@ -4,18 +4,22 @@ Prices in this table take priority over recipe ingredient prices and AI estimate
 when calculating shopping list costs.
 """
 
+from dataclasses import fields
 from typing import Optional
 
 from meal_planner.db.database import get_connection
-from meal_planner.db.models import KnownPrice
+from meal_planner.db.models import KnownPrice, from_row, from_rows
+
+# KnownPrice columns in field order, so rows always take from_rows()'s positional path.
+_COLUMNS = ", ".join(f.name for f in fields(KnownPrice))
 
 
 def get_all() -> list[KnownPrice]:
     """Return all known prices sorted by item name."""
     conn = get_connection()
     try:
-        rows = conn.execute("SELECT * FROM known_prices ORDER BY item_name").fetchall()
-        return [KnownPrice(**dict(row)) for row in rows]
+        rows = conn.execute(f"SELECT {_COLUMNS} FROM known_prices ORDER BY item_name").fetchall()
+        return from_rows(KnownPrice, rows)
     finally:
         conn.close()
 
@@ -25,34 +29,27 @@ def get_by_name(item_name: str) -> Optional[KnownPrice]:
     conn = get_connection()
     try:
         row = conn.execute(
-            "SELECT * FROM known_prices WHERE LOWER(item_name) = LOWER(?)",
+            f"SELECT {_COLUMNS} FROM known_prices WHERE LOWER(item_name) = LOWER(?)",
             (item_name.strip(),),
         ).fetchone()
-        return KnownPrice(**dict(row)) if row else None
+        return from_row(KnownPrice, row)
     finally:
         conn.close()
 
 
+# Matches on the case-insensitive unique index, keeping the stored name's casing.
+_UPSERT_SQL = """INSERT INTO known_prices (item_name, unit_price, unit, store_id)
+   VALUES (?, ?, ?, ?)
+   ON CONFLICT (LOWER(item_name)) DO UPDATE SET
+       unit_price = excluded.unit_price, unit = excluded.unit,
+       store_id = excluded.store_id, last_updated = CURRENT_TIMESTAMP"""
+
+
 def upsert(item_name: str, unit_price: float, unit: str = None, store_id: int = None) -> None:
     """Insert or update a known price entry."""
     conn = get_connection()
     try:
-        existing = conn.execute(
-            "SELECT id FROM known_prices WHERE LOWER(item_name) = LOWER(?)",
-            (item_name.strip(),),
-        ).fetchone()
-        if existing:
-            conn.execute(
-                """UPDATE known_prices SET unit_price=?, unit=?, store_id=?,
-                   last_updated=CURRENT_TIMESTAMP WHERE id=?""",
-                (unit_price, unit, store_id, existing["id"]),
-            )
-        else:
-            conn.execute(
-                """INSERT INTO known_prices (item_name, unit_price, unit, store_id)
-                   VALUES (?, ?, ?, ?)""",
-                (item_name.strip(), unit_price, unit, store_id),
-            )
+        conn.execute(_UPSERT_SQL, (item_name.strip(), unit_price, unit, store_id))
         conn.commit()
     finally:
         conn.close()
@@ -63,28 +60,12 @@ def bulk_upsert(items: list[dict]) -> int:
     Returns count of items processed."""
     conn = get_connection()
     try:
-        count = 0
-        for item in items:
-            name = item["item_name"].strip()
-            existing = conn.execute(
-                "SELECT id FROM known_prices WHERE LOWER(item_name) = LOWER(?)",
-                (name,),
-            ).fetchone()
-            if existing:
-                conn.execute(
-                    """UPDATE known_prices SET unit_price=?, unit=?, store_id=?,
-                       last_updated=CURRENT_TIMESTAMP WHERE id=?""",
-                    (item["unit_price"], item.get("unit"), item.get("store_id"), existing["id"]),
-                )
-            else:
-                conn.execute(
-                    """INSERT INTO known_prices (item_name, unit_price, unit, store_id)
-                       VALUES (?, ?, ?, ?)""",
-                    (name, item["unit_price"], item.get("unit"), item.get("store_id")),
-                )
-            count += 1
+        conn.executemany(_UPSERT_SQL, [
+            (item["item_name"].strip(), item["unit_price"], item.get("unit"), item.get("store_id"))
+            for item in items
+        ])
         conn.commit()
-        return count
+        return len(items)
     finally:
         conn.close()
 
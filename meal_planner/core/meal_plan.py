@@ -5,12 +5,16 @@ in the meal_plan table.  Weeks start on Monday and contain four slots per day.
 """
 
 from datetime import date, timedelta
-from typing import Optional
+from functools import lru_cache
+from typing import NamedTuple, Optional
 
 from meal_planner.db.database import get_connection
 from meal_planner.db.models import MealPlanEntry
 
 MEAL_SLOTS = ["Breakfast", "Lunch", "Dinner", "Snack"]
+DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+_DAY_OFFSETS = tuple(timedelta(days=i) for i in range(7))
 
 
 def get_week_start(for_date: date = None) -> date:
@@ -20,43 +24,98 @@ def get_week_start(for_date: date = None) -> date:
     return for_date - timedelta(days=for_date.weekday())
 
 
-def get_week(start_date: date) -> dict[str, dict[str, MealPlanEntry]]:
-    """Returns meal plan for a week as {date_str: {slot: MealPlanEntry}}."""
+@lru_cache(maxsize=8)
+def week_start_iso(for_date: date) -> str:
+    """ISO string of get_week_start(for_date), memoized per date."""
+    return get_week_start(for_date).isoformat()
+
+
+def week_dates(start_date: date) -> list[date]:
+    """Return the seven dates of the week beginning at start_date."""
+    return [start_date + offset for offset in _DAY_OFFSETS]
+
+
+class SparseWeek(NamedTuple):
+    """A week's meals keyed by (date_str, slot); empty cells are simply absent."""
+
+    start: date
+    entries: dict[tuple[str, str], MealPlanEntry]
+
+    def get(self, date_str: str, slot: str) -> Optional[MealPlanEntry]:
+        """Return the entry for one cell, or None if the slot is empty."""
+        return self.entries.get((date_str, slot))
+
+    def to_grid(self) -> dict[str, dict[str, Optional[MealPlanEntry]]]:
+        """Materialize the full {date_str: {slot: entry-or-None}} grid."""
+        return {
+            d.isoformat(): {slot: self.get(d.isoformat(), slot) for slot in MEAL_SLOTS}
+            for d in week_dates(self.start)
+        }
+
+
+# Served in (date, meal_slot) order straight off ix_meal_plan_date_slot.
+_MEALS_IN_RANGE_SQL = """SELECT mp.*, r.name as recipe_name
+   FROM meal_plan mp
+   LEFT JOIN recipes r ON mp.recipe_id = r.id
+   WHERE mp.date >= ? AND mp.date <= ?
+   ORDER BY mp.date, mp.meal_slot"""
+
+
+def _row_to_entry(row) -> MealPlanEntry:
+    return MealPlanEntry(
+        id=row["id"],
+        date=row["date"],
+        meal_slot=row["meal_slot"],
+        recipe_id=row["recipe_id"],
+        servings=row["servings"],
+        notes=row["notes"],
+        recipe_name=row["recipe_name"],
+    )
+
+
+def _query_week(conn, start_date: date) -> SparseWeek:
+    end_date = start_date + _DAY_OFFSETS[-1]
+    rows = conn.execute(_MEALS_IN_RANGE_SQL, (start_date.isoformat(), end_date.isoformat()))
+    return SparseWeek(start_date, {(row["date"], row["meal_slot"]): _row_to_entry(row) for row in rows})
+
+
+def get_week(start_date: date) -> SparseWeek:
+    """Returns the meal plan for the week starting at start_date.
+
+    Look cells up with .get(date_str, slot); call .to_grid() for the nested
+    {date_str: {slot: MealPlanEntry}} form.
+    """
     conn = get_connection()
     try:
-        week_dates = [start_date + timedelta(days=i) for i in range(7)]
-        date_strs = [d.isoformat() for d in week_dates]
-
-        rows = conn.execute(
-            """SELECT mp.*, r.name as recipe_name
-               FROM meal_plan mp
-               LEFT JOIN recipes r ON mp.recipe_id = r.id
-               WHERE mp.date IN ({})
-               ORDER BY mp.date, mp.meal_slot""".format(",".join("?" * 7)),
-            date_strs,
-        ).fetchall()
-
-        # Build empty grid
-        result = {d: {slot: None for slot in MEAL_SLOTS} for d in date_strs}
-
-        for row in rows:
-            entry = MealPlanEntry(
-                id=row["id"],
-                date=row["date"],
-                meal_slot=row["meal_slot"],
-                recipe_id=row["recipe_id"],
-                servings=row["servings"],
-                notes=row["notes"],
-                recipe_name=row["recipe_name"],
-            )
-            if row["date"] in result and row["meal_slot"] in result[row["date"]]:
-                result[row["date"]][row["meal_slot"]] = entry
-
-        return result
+        return _query_week(conn, start_date)
     finally:
         conn.close()
 
 
+# One statement per slot: the unique (date, meal_slot) index lets an upsert
+# replace the old SELECT-then-UPDATE/INSERT round trips.
+_UPSERT_MEAL_SQL = """INSERT INTO meal_plan (date, meal_slot, recipe_id, servings, notes)
+   VALUES (?, ?, ?, ?, ?)
+   ON CONFLICT (date, meal_slot) DO UPDATE SET
+       recipe_id = excluded.recipe_id, servings = excluded.servings, notes = excluded.notes"""
+_DELETE_MEAL_SQL = "DELETE FROM meal_plan WHERE date = ? AND meal_slot = ?"
+
+
+def _write_meals(conn, entries: list[tuple[str, str, Optional[int], int, Optional[str]]]) -> None:
+    # Last write per slot wins, as if the entries were applied one by one.
+    latest = {(e[0], e[1]): e for e in entries}
+    upserts, deletes = [], []
+    for entry_date, slot, recipe_id, servings, notes in latest.values():
+        if recipe_id is not None or notes:
+            upserts.append((entry_date, slot, recipe_id, servings, notes))
+        else:
+            deletes.append((entry_date, slot))
+    if upserts:
+        conn.executemany(_UPSERT_MEAL_SQL, upserts)
+    if deletes:
+        conn.executemany(_DELETE_MEAL_SQL, deletes)
+
+
 def set_meal(entry_date: str, slot: str, recipe_id: Optional[int], servings: int = 1, notes: str = None) -> None:
     """Insert, update, or delete a meal plan entry.
 
@@ -64,31 +123,21 @@ def set_meal(entry_date: str, slot: str, recipe_id: Optional[int], servings: int
     ignored if it doesn't exist).  If recipe_id is None but notes is non-empty,
     the entry is kept as a manual meal (e.g. "Leftovers", "Eat out").
     """
+    set_meals([(entry_date, slot, recipe_id, servings, notes)])
+
+
+def set_meals(entries: list[tuple[str, str, Optional[int], int, Optional[str]]]) -> None:
+    """Apply several set_meal() calls in one transaction.
+
+    Each entry is (entry_date, slot, recipe_id, servings, notes).  Filled
+    slots are written with one executemany() upsert and cleared slots with
+    one executemany() delete.
+    """
+    if not entries:
+        return
     conn = get_connection()
     try:
-        existing = conn.execute(
-            "SELECT id FROM meal_plan WHERE date = ? AND meal_slot = ?",
-            (entry_date, slot),
-        ).fetchone()
-
-        has_content = recipe_id is not None or bool(notes)
-
-        if existing:
-            if has_content:
-                conn.execute(
-                    "UPDATE meal_plan SET recipe_id=?, servings=?, notes=? WHERE date=? AND meal_slot=?",
-                    (recipe_id, servings, notes, entry_date, slot),
-                )
-            else:
-                conn.execute(
-                    "DELETE FROM meal_plan WHERE date = ? AND meal_slot = ?",
-                    (entry_date, slot),
-                )
-        elif has_content:
-            conn.execute(
-                "INSERT INTO meal_plan (date, meal_slot, recipe_id, servings, notes) VALUES (?, ?, ?, ?, ?)",
-                (entry_date, slot, recipe_id, servings, notes),
-            )
+        _write_meals(conn, entries)
         conn.commit()
     finally:
         conn.close()
@@ -103,25 +152,6 @@ def get_meals_in_range(start: str, end: str) -> list[MealPlanEntry]:
     """Returns all meal plan entries between start and end dates (inclusive)."""
     conn = get_connection()
     try:
-        rows = conn.execute(
-            """SELECT mp.*, r.name as recipe_name
-               FROM meal_plan mp
-               LEFT JOIN recipes r ON mp.recipe_id = r.id
-               WHERE mp.date >= ? AND mp.date <= ?
-               ORDER BY mp.date, mp.meal_slot""",
-            (start, end),
-        ).fetchall()
-        return [
-            MealPlanEntry(
-                id=row["id"],
-                date=row["date"],
-                meal_slot=row["meal_slot"],
-                recipe_id=row["recipe_id"],
-                servings=row["servings"],
-                notes=row["notes"],
-                recipe_name=row["recipe_name"],
-            )
-            for row in rows
-        ]
+        return [_row_to_entry(row) for row in conn.execute(_MEALS_IN_RANGE_SQL, (start, end))]
     finally:
         conn.close()
@@ -5,123 +5,218 @@ Stores referenced in CSV rows are auto-created in the stores table.
 """
 
 import csv
+import io
+from bisect import bisect_left
+from dataclasses import dataclass, field, fields
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Iterator, Optional
 from datetime import date, timedelta
 
 from meal_planner.db.database import get_connection
-from meal_planner.db.models import PantryItem, Store
+from meal_planner.db.models import PantryItem, Store, from_row, from_rows
+from meal_planner.core import stores as stores_core
+
+
+def _store_ids(conn, names: list[str]) -> dict[str, int]:
+    """Map store names to IDs, creating any stores that don't exist yet."""
+    if not names:
+        return {}
+    conn.executemany("INSERT OR IGNORE INTO stores (name) VALUES (?)", [(n,) for n in names])
+    return {row["name"]: row["id"] for row in conn.execute("SELECT id, name FROM stores")}
+
+
+class _ImportIndex:
+    """In-memory barcode and name lookups over the pantry for one CSV import.
+
+    Mirrors the per-row queries the import used to run (barcode first, then
+    name with a matching or NULL brand, lowest ID first) and is updated as
+    rows are applied, so later rows see earlier ones.  Handles are pantry IDs;
+    rows still waiting to be inserted get handles above the current max ID.
+
+    Matching stays here rather than in a set-based INSERT ... ON CONFLICT:
+    barcodes aren't unique in the pantry, a row may match by name+brand
+    instead, and a CSV row may match one inserted earlier in the same file.
+    """
+
+    def __init__(self, rows):
+        self.current: dict[int, tuple] = {}
+        self.by_barcode: dict[str, list[int]] = {}
+        self.by_name: dict[str, list[int]] = {}
+        for row in rows:
+            self.set(row["id"], row["barcode"], row["name"], row["brand"])
+
+    @staticmethod
+    def _add(bucket: list[int], handle: int) -> None:
+        i = bisect_left(bucket, handle)
+        if i == len(bucket) or bucket[i] != handle:
+            bucket.insert(i, handle)
+
+    def set(self, handle: int, barcode: Optional[str], name: str, brand: Optional[str]) -> None:
+        self.current[handle] = (barcode, name, brand)
+        if barcode:
+            self._add(self.by_barcode.setdefault(barcode, []), handle)
+        self._add(self.by_name.setdefault(name, []), handle)
+
+    def find(self, barcode: Optional[str], name: str, brand: Optional[str]) -> Optional[int]:
+        if barcode:
+            for handle in self.by_barcode.get(barcode, ()):
+                if self.current[handle][0] == barcode:
+                    return handle
+        for handle in self.by_name.get(name, ()):
+            _, cur_name, cur_brand = self.current[handle]
+            if cur_name == name and (cur_brand is None or (brand is not None and cur_brand == brand)):
+                return handle
+        return None
 
 
-def _get_or_create_store(conn, store_name: str) -> Optional[int]:
-    """Return the store ID for store_name, creating the store if it doesn't exist."""
-    if not store_name or not store_name.strip():
-        return None
-    name = store_name.strip()
-    row = conn.execute("SELECT id FROM stores WHERE name = ?", (name,)).fetchone()
-    if row:
-        return row["id"]
-    cursor = conn.execute("INSERT INTO stores (name) VALUES (?)", (name,))
-    return cursor.lastrowid
+# PantryChecker export columns, in the order _csv_fields() unpacks them.
+_CSV_COLUMNS = (
+    "Name", "Barcode", "Brand", "Store", "Category", "Location", "Quantity",
+    "Unit", "Stocked", "Best By", "Product Notes", "Item Notes",
+)
+
+
+def _csv_rows(text) -> Iterator[list[str]]:
+    """Yield the stripped _CSV_COLUMNS cells of each data row, in that order.
+
+    Column positions are looked up once from the header; columns missing from
+    the file (or from a short row) read as "".
+    """
+    reader = csv.reader(text)
+    positions = {col: i for i, col in enumerate(next(reader, []))}
+    indices = [positions.get(col) for col in _CSV_COLUMNS]
+    for row in reader:
+        width = len(row)
+        yield [row[i].strip() if i is not None and i < width else "" for i in indices]
+
+
+def _csv_fields(cells: list[str]) -> tuple[dict, str]:
+    """Map one row's cells to pantry column values plus the store name."""
+    (name, barcode, brand, store, category, location, qty_str,
+     unit, stocked, best_by, product_notes, item_notes) = cells
+    try:
+        quantity = float(qty_str) if qty_str else 1.0
+    except ValueError:
+        quantity = 1.0
+    return {
+        "barcode": barcode or None,
+        "category": category or None,
+        "location": location or None,
+        "brand": brand or None,
+        "name": name,
+        "quantity": quantity,
+        "unit": unit or None,
+        "stocked_date": stocked or None,
+        "best_by": best_by or None,
+        "product_notes": product_notes or None,
+        "item_notes": item_notes or None,
+    }, store
+
+
+_IMPORT_UPDATE_SQL = """UPDATE pantry SET barcode=:barcode, category=:category,
+   location=:location, brand=:brand, name=:name,
+   quantity=:quantity, unit=:unit, stocked_date=:stocked_date,
+   best_by=:best_by, preferred_store_id=:preferred_store_id,
+   product_notes=:product_notes, item_notes=:item_notes
+   WHERE id=:id"""
+_IMPORT_INSERT_SQL = """INSERT INTO pantry (barcode, category, location, brand, name,
+   quantity, unit, stocked_date, best_by, preferred_store_id,
+   product_notes, item_notes)
+   VALUES (:barcode, :category, :location, :brand, :name,
+   :quantity, :unit, :stocked_date, :best_by,
+   :preferred_store_id, :product_notes, :item_notes)"""
 
 
 def import_csv(filepath: str) -> tuple[int, int]:
     """Import PantryChecker CSV. Returns (inserted, updated) counts."""
-    inserted = 0
-    updated = 0
-    path = Path(filepath)
-
-    with open(path, newline="", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        conn = get_connection()
-        try:
-            for row in reader:
-                name = row.get("Name", "").strip()
-                if not name:
-                    continue
-
-                store_id = _get_or_create_store(conn, row.get("Store", ""))
-
-                # Check if item exists by barcode or name+brand
-                barcode = row.get("Barcode", "").strip() or None
-                brand = row.get("Brand", "").strip() or None
-                existing = None
-                if barcode:
-                    existing = conn.execute(
-                        "SELECT id FROM pantry WHERE barcode = ?", (barcode,)
-                    ).fetchone()
-                if not existing:
-                    existing = conn.execute(
-                        "SELECT id FROM pantry WHERE name = ? AND (brand = ? OR brand IS NULL)",
-                        (name, brand),
-                    ).fetchone()
-
-                qty_str = row.get("Quantity", "1").strip()
-                try:
-                    quantity = float(qty_str) if qty_str else 1.0
-                except ValueError:
-                    quantity = 1.0
-
-                fields = {
-                    "barcode": barcode,
-                    "category": row.get("Category", "").strip() or None,
-                    "location": row.get("Location", "").strip() or None,
-                    "brand": brand,
-                    "name": name,
-                    "quantity": quantity,
-                    "unit": row.get("Unit", "").strip() or None,
-                    "stocked_date": row.get("Stocked", "").strip() or None,
-                    "best_by": row.get("Best By", "").strip() or None,
-                    "preferred_store_id": store_id,
-                    "product_notes": row.get("Product Notes", "").strip() or None,
-                    "item_notes": row.get("Item Notes", "").strip() or None,
-                }
-
-                if existing:
-                    conn.execute(
-                        """UPDATE pantry SET barcode=:barcode, category=:category,
-                           location=:location, brand=:brand, name=:name,
-                           quantity=:quantity, unit=:unit, stocked_date=:stocked_date,
-                           best_by=:best_by, preferred_store_id=:preferred_store_id,
-                           product_notes=:product_notes, item_notes=:item_notes
-                           WHERE id=:id""",
-                        {**fields, "id": existing["id"]},
-                    )
-                    updated += 1
-                else:
-                    conn.execute(
-                        """INSERT INTO pantry (barcode, category, location, brand, name,
-                           quantity, unit, stocked_date, best_by, preferred_store_id,
-                           product_notes, item_notes)
-                           VALUES (:barcode, :category, :location, :brand, :name,
-                           :quantity, :unit, :stocked_date, :best_by,
-                           :preferred_store_id, :product_notes, :item_notes)""",
-                        fields,
-                    )
-                    inserted += 1
-
-            conn.commit()
-        finally:
-            conn.close()
-
-    return inserted, updated
+    with open(Path(filepath), "rb") as f:
+        return import_csv_stream(f)
+
+
+def import_csv_stream(fileobj: BinaryIO) -> tuple[int, int]:
+    """Import PantryChecker CSV from a binary file object (e.g. an upload).
+
+    Reads the stream directly, so callers don't need to spool it to disk first.
+    Rows are matched against the pantry in memory and written with one
+    executemany() per statement inside a single transaction.
+    Returns (inserted, updated) counts.
+    """
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    try:
+        parsed = [_csv_fields(cells) for cells in _csv_rows(text) if cells[0]]
+    finally:
+        # Leave the caller's file object open
+        text.detach()
+
+    conn = get_connection()
+    try:
+        store_ids = _store_ids(conn, list(dict.fromkeys(store for _, store in parsed if store)))
+        index = _ImportIndex(conn.execute("SELECT id, barcode, name, brand FROM pantry ORDER BY id"))
+        next_handle = max(index.current, default=0) + 1
+
+        updates: dict[int, dict] = {}
+        inserts: dict[int, dict] = {}
+        for values, store in parsed:
+            values["preferred_store_id"] = store_ids.get(store)
+            handle = index.find(values["barcode"], values["name"], values["brand"])
+            if handle is None:
+                handle, next_handle = next_handle, next_handle + 1
+                inserts[handle] = values
+            elif handle in inserts:
+                inserts[handle] = values
+            else:
+                updates[handle] = {**values, "id": handle}
+            index.set(handle, values["barcode"], values["name"], values["brand"])
+
+        if updates:
+            conn.executemany(_IMPORT_UPDATE_SQL, list(updates.values()))
+        if inserts:
+            conn.executemany(_IMPORT_INSERT_SQL, list(inserts.values()))
+        conn.commit()
+    finally:
+        conn.close()
+        stores_core.invalidate_cache()
+
+    inserted = len(inserts)
+    return inserted, len(parsed) - inserted
+
+
+# Pantry columns in PantryItem field order (the table's own order differs),
+# so rows can be passed to PantryItem positionally.
+_COLUMNS = ", ".join(f.name for f in fields(PantryItem))
+
+
+def _iter_query(conn, location: Optional[str] = None, category: Optional[str] = None) -> Iterator[PantryItem]:
+    query = f"SELECT {_COLUMNS} FROM pantry WHERE 1=1"
+    params = []
+    if location:
+        query += " AND location = ?"
+        params.append(location)
+    if category:
+        query += " AND category = ?"
+        params.append(category)
+    query += " ORDER BY category, name"
+    for row in conn.execute(query, params):
+        yield PantryItem(*row)
+
+
+def _query_all(conn, location: Optional[str] = None, category: Optional[str] = None) -> list[PantryItem]:
+    return list(_iter_query(conn, location, category))
 
 
 def get_all(location: Optional[str] = None, category: Optional[str] = None) -> list[PantryItem]:
     """Return all pantry items, optionally filtered by location and/or category."""
+    return list(iter_all(location, category))
+
+
+def iter_all(location: Optional[str] = None, category: Optional[str] = None) -> Iterator[PantryItem]:
+    """Yield the items get_all() would return, one at a time straight off the cursor.
+
+    The connection stays checked out until the iterator is exhausted or closed.
+    """
     conn = get_connection()
     try:
-        query = "SELECT * FROM pantry WHERE 1=1"
-        params = []
-        if location:
-            query += " AND location = ?"
-            params.append(location)
-        if category:
-            query += " AND category = ?"
-            params.append(category)
-        query += " ORDER BY category, name"
-        rows = conn.execute(query, params).fetchall()
-        return [PantryItem(**dict(row)) for row in rows]
+        yield from _iter_query(conn, location, category)
     finally:
         conn.close()
 
@@ -130,34 +225,50 @@ def get(item_id: int) -> Optional[PantryItem]:
     """Return a single pantry item by ID, or None if not found."""
     conn = get_connection()
     try:
-        row = conn.execute("SELECT * FROM pantry WHERE id = ?", (item_id,)).fetchone()
-        return PantryItem(**dict(row)) if row else None
+        row = conn.execute(f"SELECT {_COLUMNS} FROM pantry WHERE id = ?", (item_id,)).fetchone()
+        return from_row(PantryItem, row)
     finally:
         conn.close()
 
 
+_INSERT_SQL = """INSERT INTO pantry (barcode, category, location, brand, name,
+   quantity, unit, stocked_date, best_by, preferred_store_id,
+   product_notes, item_notes, estimated_price, is_staple)
+   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+
+def _insert_params(item: PantryItem) -> tuple:
+    return (
+        item.barcode, item.category, item.location, item.brand,
+        item.name, item.quantity, item.unit, item.stocked_date,
+        item.best_by, item.preferred_store_id, item.product_notes,
+        item.item_notes, item.estimated_price, int(item.is_staple),
+    )
+
+
 def add(item: PantryItem) -> int:
     """Insert a new pantry item and return its ID."""
     conn = get_connection()
     try:
-        cursor = conn.execute(
-            """INSERT INTO pantry (barcode, category, location, brand, name,
-               quantity, unit, stocked_date, best_by, preferred_store_id,
-               product_notes, item_notes, estimated_price, is_staple)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-            (
-                item.barcode, item.category, item.location, item.brand,
-                item.name, item.quantity, item.unit, item.stocked_date,
-                item.best_by, item.preferred_store_id, item.product_notes,
-                item.item_notes, item.estimated_price, int(item.is_staple),
-            ),
-        )
+        cursor = conn.execute(_INSERT_SQL, _insert_params(item))
         conn.commit()
         return cursor.lastrowid
     finally:
         conn.close()
 
 
+def add_many(items: list[PantryItem]) -> None:
+    """Insert several pantry items in one transaction."""
+    if not items:
+        return
+    conn = get_connection()
+    try:
+        conn.executemany(_INSERT_SQL, [_insert_params(item) for item in items])
+        conn.commit()
+    finally:
+        conn.close()
+
+
 def update(item: PantryItem) -> None:
     """Update an existing pantry item by its ID."""
     conn = get_connection()
@@ -181,6 +292,36 @@ def update(item: PantryItem) -> None:
         conn.close()
 
 
+_UPDATABLE_COLUMNS = frozenset({
+    "barcode", "category", "location", "brand", "name", "quantity", "unit",
+    "stocked_date", "best_by", "preferred_store_id", "product_notes",
+    "item_notes", "estimated_price", "is_staple",
+})
+
+
+def update_partial(item_id: int, changes: dict) -> None:
+    """Update only the given columns of a pantry item.
+
+    Keys of changes must be PantryItem field names; an empty dict is a no-op.
+    """
+    if not changes:
+        return
+    unknown = set(changes) - _UPDATABLE_COLUMNS
+    if unknown:
+        raise ValueError(f"Unknown pantry columns: {sorted(unknown)}")
+    columns = list(changes)
+    values = [int(v) if col == "is_staple" else v for col, v in changes.items()]
+    conn = get_connection()
+    try:
+        conn.execute(
+            f"UPDATE pantry SET {', '.join(f'{col}=?' for col in columns)} WHERE id=?",
+            (*values, item_id),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
 def delete(item_id: int) -> None:
     """Delete a pantry item by ID."""
     conn = get_connection()
@@ -205,29 +346,64 @@ def delete_many(item_ids: list[int]) -> int:
         conn.close()
 
 
+_EXPIRING_WHERE = "best_by IS NOT NULL AND best_by <= ? AND best_by >= ?"
+
+
+def _expiring_window(days: int, today: Optional[date] = None) -> tuple[str, str]:
+    today = today or date.today()
+    return (today + timedelta(days=days)).isoformat(), today.isoformat()
+
+
+def _query_expiring_soon(conn, days: int) -> list[PantryItem]:
+    rows = conn.execute(
+        f"SELECT {_COLUMNS} FROM pantry WHERE {_EXPIRING_WHERE} ORDER BY best_by",
+        _expiring_window(days),
+    ).fetchall()
+    return from_rows(PantryItem, rows)
+
+
+def _query_expiring_ids(conn, days: int, today: Optional[date] = None) -> set[int]:
+    rows = conn.execute(
+        f"SELECT id FROM pantry WHERE {_EXPIRING_WHERE}",
+        _expiring_window(days, today),
+    ).fetchall()
+    return {r[0] for r in rows}
+
+
 def get_expiring_soon(days: int = 7) -> list[PantryItem]:
     """Return pantry items whose best_by date falls within the next N days."""
     conn = get_connection()
     try:
-        cutoff = (date.today() + timedelta(days=days)).isoformat()
-        today = date.today().isoformat()
-        rows = conn.execute(
-            "SELECT * FROM pantry WHERE best_by IS NOT NULL AND best_by <= ? AND best_by >= ? ORDER BY best_by",
-            (cutoff, today),
-        ).fetchall()
-        return [PantryItem(**dict(row)) for row in rows]
+        return _query_expiring_soon(conn, days)
     finally:
         conn.close()
 
 
+def get_expiring_ids(days: int = 7) -> set[int]:
+    """Return the IDs of pantry items expiring within the next N days.
+
+    Cheaper than get_expiring_soon() when only membership is needed.
+    """
+    conn = get_connection()
+    try:
+        return _query_expiring_ids(conn, days)
+    finally:
+        conn.close()
+
+
+def _query_distinct(conn, column: str) -> list[str]:
+    # Plain tuples are enough for one column; skip building sqlite3.Row objects
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    cursor.execute(f"SELECT DISTINCT {column} FROM pantry WHERE {column} IS NOT NULL ORDER BY {column}")
+    return [value for value, in cursor]
+
+
 def get_locations() -> list[str]:
     """Return distinct location values currently in the pantry."""
     conn = get_connection()
     try:
-        rows = conn.execute(
-            "SELECT DISTINCT location FROM pantry WHERE location IS NOT NULL ORDER BY location"
-        ).fetchall()
-        return [r[0] for r in rows]
+        return _query_distinct(conn, "location")
     finally:
         conn.close()
 
@@ -236,19 +412,46 @@ def get_categories() -> list[str]:
     """Return distinct category values currently in the pantry."""
     conn = get_connection()
     try:
-        rows = conn.execute(
-            "SELECT DISTINCT category FROM pantry WHERE category IS NOT NULL ORDER BY category"
-        ).fetchall()
-        return [r[0] for r in rows]
+        return _query_distinct(conn, "category")
     finally:
         conn.close()
 
 
-def get_all_stores() -> list[Store]:
-    """Return all stores sorted alphabetically by name."""
+@dataclass
+class PantryPageBundle:
+    """Everything a pantry page or rows partial needs, loaded in one go."""
+    items: list[PantryItem]
+    stores: list[Store]
+    expiring_ids: set[int]
+    locations: list[str] = field(default_factory=list)
+    categories: list[str] = field(default_factory=list)
+
+
+def get_page_bundle(location: Optional[str] = None, category: Optional[str] = None,
+                    with_filters: bool = True, today: Optional[date] = None) -> PantryPageBundle:
+    """Load items, stores, expiring IDs and (optionally) filter values on one connection.
+
+    The reads run inside a single transaction so they see a consistent snapshot.
+    today anchors the expiring-soon window (defaults to date.today()).
+    """
+    stores = stores_core.get_all()
     conn = get_connection()
     try:
-        rows = conn.execute("SELECT * FROM stores ORDER BY name").fetchall()
-        return [Store(**dict(row)) for row in rows]
+        conn.execute("BEGIN")
+        bundle = PantryPageBundle(
+            items=_query_all(conn, location, category),
+            stores=stores,
+            expiring_ids=_query_expiring_ids(conn, 7, today),
+        )
+        if with_filters:
+            bundle.locations = _query_distinct(conn, "location")
+            bundle.categories = _query_distinct(conn, "category")
+        conn.commit()
+        return bundle
     finally:
         conn.close()
+
+
+def get_all_stores() -> list[Store]:
+    """Return all stores sorted alphabetically by name (cached, see core/stores.py)."""
+    return stores_core.get_all()
@@ -2,36 +2,66 @@
 
 Each recipe has an embedded list of RecipeIngredient items.  On update, all
 existing ingredients are deleted and replaced with the new set.
+
+get_all() is cached per database file.  Every write to the recipes or
+recipe_ingredients tables must go through invalidate_cache(), which also
+advances cache_version() for HTTP validators.
 """
 
+import sqlite3
+import time
 from typing import Optional
 
-from meal_planner.db.database import get_connection
+from meal_planner.db.database import get_connection, get_db_path
 from meal_planner.db.models import Recipe, RecipeIngredient
 
+_all_cache: dict[str, list[Recipe]] = {}
+# Seeded from the clock so versions from a previous process are never reused.
+_version = time.time_ns()
 
-def _row_to_recipe(row, conn) -> Recipe:
-    """Convert a database row into a Recipe, loading its ingredients."""
-    recipe = Recipe(
-        id=row["id"],
-        name=row["name"],
-        description=row["description"],
-        servings=row["servings"],
-        prep_time=row["prep_time"],
-        cook_time=row["cook_time"],
-        instructions=row["instructions"],
-        source_url=row["source_url"],
-        tags=row["tags"],
-        rating=row["rating"],
-        photo_path=row["photo_path"],
-        created_at=row["created_at"],
-    )
+
+def invalidate_cache() -> None:
+    """Drop cached recipe lists. Call after any write to recipes or their ingredients."""
+    global _version
+    _all_cache.clear()
+    _version += 1
+
+
+def cache_version() -> int:
+    """Return a token that changes whenever the cached recipe data is invalidated."""
+    return _version
+
+
+def _rows_to_recipes(rows, conn) -> list[Recipe]:
+    """Convert recipe rows into Recipes, loading all their ingredients in one query."""
+    recipes = [
+        Recipe(
+            id=row["id"],
+            name=row["name"],
+            description=row["description"],
+            servings=row["servings"],
+            prep_time=row["prep_time"],
+            cook_time=row["cook_time"],
+            instructions=row["instructions"],
+            source_url=row["source_url"],
+            tags=row["tags"],
+            rating=row["rating"],
+            photo_path=row["photo_path"],
+            created_at=row["created_at"],
+        )
+        for row in rows
+    ]
+    if not recipes:
+        return recipes
+    by_id = {recipe.id: recipe for recipe in recipes}
     ing_rows = conn.execute(
-        "SELECT * FROM recipe_ingredients WHERE recipe_id = ? ORDER BY id",
-        (recipe.id,),
-    ).fetchall()
-    recipe.ingredients = [
-        RecipeIngredient(
+        "SELECT * FROM recipe_ingredients WHERE recipe_id IN ({}) ORDER BY id".format(
+            ",".join("?" * len(by_id))
+        ),
+        list(by_id),
+    )
+    for r in ing_rows:
+        by_id[r["recipe_id"]].ingredients.append(RecipeIngredient(
             id=r["id"],
             recipe_id=r["recipe_id"],
             name=r["name"],
@@ -41,20 +71,31 @@ def _row_to_recipe(row, conn) -> Recipe:
             shopping_name=r["shopping_name"],
             shopping_qty=r["shopping_qty"],
             shopping_unit=r["shopping_unit"],
-        )
-        for r in ing_rows
-    ]
-    return recipe
+        ))
+    return recipes
+
+
+def _row_to_recipe(row, conn) -> Recipe:
+    """Convert a database row into a Recipe, loading its ingredients."""
+    return _rows_to_recipes([row], conn)[0]
 
 
 def get_all() -> list[Recipe]:
-    """Return all recipes sorted alphabetically by name."""
-    conn = get_connection()
-    try:
-        rows = conn.execute("SELECT * FROM recipes ORDER BY name").fetchall()
-        return [_row_to_recipe(r, conn) for r in rows]
-    finally:
-        conn.close()
+    """Return all recipes sorted alphabetically by name.
+
+    The returned Recipe objects are shared with the cache — treat them as read-only.
+    """
+    key = str(get_db_path())
+    cached = _all_cache.get(key)
+    if cached is None:
+        conn = get_connection()
+        try:
+            rows = conn.execute("SELECT * FROM recipes ORDER BY name").fetchall()
+            cached = _rows_to_recipes(rows, conn)
+        finally:
+            conn.close()
+        _all_cache[key] = cached
+    return list(cached)
 
 
 def get(recipe_id: int) -> Optional[Recipe]:
@@ -67,77 +108,146 @@ def get(recipe_id: int) -> Optional[Recipe]:
         conn.close()
 
 
+# Trigrams need at least three characters to match anything.
+_FTS_MIN_QUERY = 3
+
+
 def search(query: str) -> list[Recipe]:
-    """Return recipes whose name, description, or tags match the query (case-insensitive)."""
+    """Return recipes whose name, description, or tags match the query (case-insensitive).
+
+    Uses the recipes_fts trigram index as a substring match; short queries,
+    or a DB without the index, fall back to LIKE.
+    """
     conn = get_connection()
     try:
-        pattern = f"%{query}%"
+        rows = None
+        if len(query) >= _FTS_MIN_QUERY:
+            phrase = '"{}"'.format(query.replace('"', '""'))
+            try:
+                rows = conn.execute(
+                    """SELECT r.* FROM recipes r JOIN recipes_fts f ON f.rowid = r.id
+                       WHERE recipes_fts MATCH ? ORDER BY r.name""",
+                    (phrase,),
+                ).fetchall()
+            except sqlite3.OperationalError:
+                rows = None
+        if rows is None:
+            pattern = f"%{query}%"
+            rows = conn.execute(
+                "SELECT * FROM recipes WHERE name LIKE ? OR description LIKE ? OR tags LIKE ? ORDER BY name",
+                (pattern, pattern, pattern),
+            ).fetchall()
+        return _rows_to_recipes(rows, conn)
+    finally:
+        conn.close()
+
+
+def get_ids_by_names(names: list[str]) -> dict[str, int]:
+    """Map lowercased recipe names to IDs for the given names (case-insensitive).
+
+    Names with no matching recipe are simply absent from the result.
+    """
+    lowered = sorted({n.lower() for n in names if n})
+    if not lowered:
+        return {}
+    conn = get_connection()
+    try:
+        placeholders = ",".join("?" for _ in lowered)
         rows = conn.execute(
-            "SELECT * FROM recipes WHERE name LIKE ? OR description LIKE ? OR tags LIKE ? ORDER BY name",
-            (pattern, pattern, pattern),
+            f"SELECT id, name FROM recipes WHERE LOWER(name) IN ({placeholders}) ORDER BY name",
+            lowered,
         ).fetchall()
-        return [_row_to_recipe(r, conn) for r in rows]
+        return {row["name"].lower(): row["id"] for row in rows}
     finally:
         conn.close()
 
 
+def _insert_recipe(conn, recipe: Recipe) -> int:
+    cursor = conn.execute(
+        """INSERT INTO recipes (name, description, servings, prep_time, cook_time,
+           instructions, source_url, tags, rating, photo_path)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        (
+            recipe.name, recipe.description, recipe.servings,
+            recipe.prep_time, recipe.cook_time, recipe.instructions,
+            recipe.source_url, recipe.tags, recipe.rating, recipe.photo_path,
+        ),
+    )
+    return cursor.lastrowid
+
+
+def _ingredient_rows(recipe_id: int, ingredients: list[RecipeIngredient]) -> list[tuple]:
+    return [
+        (recipe_id, ing.name, ing.quantity, ing.unit, ing.estimated_price,
+         ing.shopping_name, ing.shopping_qty, ing.shopping_unit)
+        for ing in ingredients
+    ]
+
+
+def _insert_ingredients(conn, rows: list[tuple]) -> None:
+    conn.executemany(
+        """INSERT INTO recipe_ingredients
+           (recipe_id, name, quantity, unit, estimated_price,
+            shopping_name, shopping_qty, shopping_unit)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+        rows,
+    )
+
+
 def add(recipe: Recipe) -> int:
     """Insert a new recipe and its ingredients. Return the new recipe ID."""
+    return add_many([recipe])[0]
+
+
+def add_many(recipes: list[Recipe]) -> list[int]:
+    """Insert several recipes and their ingredients in one transaction.
+
+    Returns the new recipe IDs in the same order as the input.
+    """
     conn = get_connection()
     try:
-        cursor = conn.execute(
-            """INSERT INTO recipes (name, description, servings, prep_time, cook_time,
-               instructions, source_url, tags, rating, photo_path)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-            (
-                recipe.name, recipe.description, recipe.servings,
-                recipe.prep_time, recipe.cook_time, recipe.instructions,
-                recipe.source_url, recipe.tags, recipe.rating, recipe.photo_path,
-            ),
-        )
-        recipe_id = cursor.lastrowid
-        for ing in recipe.ingredients:
-            conn.execute(
-                """INSERT INTO recipe_ingredients
-                   (recipe_id, name, quantity, unit, estimated_price,
-                    shopping_name, shopping_qty, shopping_unit)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-                (recipe_id, ing.name, ing.quantity, ing.unit, ing.estimated_price,
-                 ing.shopping_name, ing.shopping_qty, ing.shopping_unit),
-            )
+        recipe_ids = []
+        ingredient_rows = []
+        for recipe in recipes:
+            recipe_id = _insert_recipe(conn, recipe)
+            recipe_ids.append(recipe_id)
+            ingredient_rows.extend(_ingredient_rows(recipe_id, recipe.ingredients))
+        _insert_ingredients(conn, ingredient_rows)
         conn.commit()
-        return recipe_id
+        return recipe_ids
     finally:
         conn.close()
+        invalidate_cache()
 
 
-def update(recipe: Recipe) -> None:
-    """Update a recipe's fields and replace all its ingredients."""
+def update(recipe: Recipe) -> Optional[Recipe]:
+    """Update a recipe's fields and replace all its ingredients.
+
+    Returns the recipe as stored (with fresh ingredient IDs), or None if no
+    recipe has that ID.
+    """
     conn = get_connection()
     try:
-        conn.execute(
+        row = conn.execute(
             """UPDATE recipes SET name=?, description=?, servings=?, prep_time=?,
                cook_time=?, instructions=?, source_url=?, tags=?, rating=?, photo_path=?
-               WHERE id=?""",
+               WHERE id=? RETURNING *""",
             (
                 recipe.name, recipe.description, recipe.servings,
                 recipe.prep_time, recipe.cook_time, recipe.instructions,
                 recipe.source_url, recipe.tags, recipe.rating, recipe.photo_path, recipe.id,
             ),
-        )
+        ).fetchone()
+        if row is None:
+            return None
         conn.execute("DELETE FROM recipe_ingredients WHERE recipe_id = ?", (recipe.id,))
-        for ing in recipe.ingredients:
-            conn.execute(
-                """INSERT INTO recipe_ingredients
-                   (recipe_id, name, quantity, unit, estimated_price,
-                    shopping_name, shopping_qty, shopping_unit)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-                (recipe.id, ing.name, ing.quantity, ing.unit, ing.estimated_price,
-                 ing.shopping_name, ing.shopping_qty, ing.shopping_unit),
-            )
+        _insert_ingredients(conn, _ingredient_rows(recipe.id, recipe.ingredients))
+        updated = _row_to_recipe(row, conn)
         conn.commit()
+        return updated
     finally:
         conn.close()
+        invalidate_cache()
 
 
 def delete(recipe_id: int) -> None:
@@ -148,6 +258,7 @@ def delete(recipe_id: int) -> None:
         conn.commit()
     finally:
         conn.close()
+        invalidate_cache()
 
 
 def get_unnormalized_recipes() -> list[Recipe]:
@@ -155,16 +266,10 @@ def get_unnormalized_recipes() -> list[Recipe]:
     conn = get_connection()
     try:
         rows = conn.execute(
-            """SELECT DISTINCT r.id FROM recipes r
-               JOIN recipe_ingredients ri ON ri.recipe_id = r.id
-               WHERE ri.shopping_name IS NULL"""
+            """SELECT * FROM recipes WHERE id IN
+               (SELECT recipe_id FROM recipe_ingredients WHERE shopping_name IS NULL)
+               ORDER BY id"""
         ).fetchall()
-        recipe_ids = [row["id"] for row in rows]
+        return _rows_to_recipes(rows, conn)
     finally:
         conn.close()
-    recipes = []
-    for rid in recipe_ids:
-        recipe = get(rid)
-        if recipe:
-            recipes.append(recipe)
-    return recipes
@@ -4,17 +4,53 @@ The generate() function is the main entry point.  It sums ingredient quantities
 across all planned meals in a date range, optionally subtracts what's already
 on hand in the pantry, and returns results grouped by preferred store.
 Each item now includes an estimated cost when price data is available.
+
+generate() and get_ingredient_sources() results are memoized per DB file and
+write counter, so previewing and then exporting the same range only computes
+the list once.  The pantry, staple, and price lookups behind generate() are
+memoized the same way, so other ranges and pantry toggles reuse them.
 """
 
 import json
+import zlib
 from collections import defaultdict
-from typing import Optional
+from typing import Iterator, NamedTuple, Optional
 
-from meal_planner.db.database import get_connection
+from meal_planner.db.database import get_change_count, get_connection, get_db_path
 from meal_planner.core.meal_plan import get_meals_in_range
 from meal_planner.config import get_setting, set_setting
 
 _CACHE_KEY = "saved_shopping_list"
+# Saved lists are stored as this prefix + zlib-compressed compact JSON; values
+# without it are plain JSON text written by older versions.
+_CACHE_MAGIC = b"\x01"
+
+_GENERATE_CACHE_SIZE = 64
+_generate_cache: dict[tuple, dict[str, list[tuple[str, float, str, Optional[float]]]]] = {}
+_sources_cache: dict[tuple, dict[str, list[tuple[int, str, str, str, float, str]]]] = {}
+_lookups_cache: dict[tuple, "_Lookups"] = {}
+
+
+def invalidate_cache() -> None:
+    """Drop memoized generate()/get_ingredient_sources() results and lookups. Call after swapping out the DB file."""
+    _generate_cache.clear()
+    _sources_cache.clear()
+    _lookups_cache.clear()
+
+
+def _memoized(cache: dict, compute, *args):
+    """Return compute(*args), reused while the DB file and write counter are unchanged."""
+    version = get_change_count()
+    if version is None:
+        return compute(*args)
+    key = (str(get_db_path()), version, *args)
+    cached = cache.get(key)
+    if cached is None:
+        cached = compute(*args)
+        if len(cache) >= _GENERATE_CACHE_SIZE:
+            cache.pop(next(iter(cache), None), None)
+        cache[key] = cached
+    return cached
 
 
 def generate(start_date: str, end_date: str, use_pantry: bool = True) -> dict[str, list[tuple[str, float, str, Optional[float]]]]:
@@ -23,70 +59,120 @@ def generate(start_date: str, end_date: str, use_pantry: bool = True) -> dict[st
     Returns {store_name: [(ingredient_name, quantity_needed, unit, estimated_cost), ...]}
     estimated_cost is unit_price * buy_qty if a price is known, else None.
     """
-    entries = get_meals_in_range(start_date, end_date)
-    if not entries:
-        return {}
+    cached = _memoized(_generate_cache, _generate, start_date, end_date, use_pantry)
+    return {store: list(items) for store, items in cached.items()}
 
-    # Aggregate required ingredients across all planned meals
-    # key: (ingredient_name_lower, unit) -> total needed
-    required: dict[tuple[str, str], float] = defaultdict(float)
-    # Track per-ingredient prices from recipe_ingredients (recipe price takes priority)
-    ingredient_prices: dict[tuple[str, str], float] = {}
 
-    for entry in entries:
-        if not entry.recipe_id:
-            continue
-        conn = get_connection()
-        try:
-            ings = conn.execute(
-                """SELECT name, quantity, unit, estimated_price,
-                          shopping_name, shopping_qty, shopping_unit
-                   FROM recipe_ingredients WHERE recipe_id = ?""",
-                (entry.recipe_id,),
-            ).fetchall()
-            for ing in ings:
-                # Use normalized shopping fields when available, fall back to raw
-                s_name = (ing["shopping_name"] or ing["name"]).lower().strip()
-                s_unit = (ing["shopping_unit"] or ing["unit"] or "").lower().strip()
-                s_qty = ing["shopping_qty"] if ing["shopping_qty"] is not None else (ing["quantity"] or 0)
-
-                key = (s_name, s_unit)
-                qty = s_qty * entry.servings
-                required[key] += qty
-                if ing["estimated_price"] is not None and key not in ingredient_prices:
-                    ingredient_prices[key] = ing["estimated_price"]
-        finally:
-            conn.close()
-
-    if not required:
+def _ingredients_by_recipe(conn, entries) -> dict[int, list]:
+    """Fetch recipe_ingredients rows for every recipe in entries with one query."""
+    recipe_ids = list({e.recipe_id for e in entries if e.recipe_id})
+    if not recipe_ids:
         return {}
-
-    # Build pantry lookup and determine quantities to buy
+    rows = conn.execute(
+        """SELECT recipe_id, name, quantity, unit, estimated_price,
+                  shopping_name, shopping_qty, shopping_unit
+           FROM recipe_ingredients WHERE recipe_id IN ({})
+           ORDER BY id""".format(",".join("?" * len(recipe_ids))),
+        recipe_ids,
+    )
+    by_recipe: dict[int, list] = defaultdict(list)
+    for row in rows:
+        by_recipe[row["recipe_id"]].append(row)
+    return by_recipe
+
+
+# Needed quantity per (shopping name, unit) over a date range, summed in SQL.
+# Shopping fields win over the raw recipe fields when present; the recipe's
+# estimated price (lowest, if several recipes carry one) rides along.
+_REQUIRED_SQL = """SELECT LOWER(TRIM(COALESCE(NULLIF(ri.shopping_name, ''), ri.name))) AS name,
+          LOWER(TRIM(COALESCE(NULLIF(ri.shopping_unit, ''), ri.unit, ''))) AS unit,
+          SUM(COALESCE(ri.shopping_qty, ri.quantity, 0) * mp.servings) AS needed,
+          MIN(ri.estimated_price) AS price
+   FROM meal_plan mp
+   JOIN recipe_ingredients ri ON ri.recipe_id = mp.recipe_id
+   WHERE mp.date >= ? AND mp.date <= ?
+   GROUP BY 1, 2"""
+
+
+class _Lookups(NamedTuple):
+    """Pantry, staple, and price data generate() consults, loaded together."""
+
+    pantry_qty: dict[str, float]
+    pantry_prices: dict[str, float]
+    preferred_store: dict[str, Optional[str]]
+    staple_names: set[str]
+    known_prices: dict[str, float]
+    staples_to_buy: list[tuple[str, Optional[str]]]
+
+
+def _load_lookups() -> _Lookups:
     conn = get_connection()
     try:
         pantry_rows = conn.execute(
-            "SELECT name, quantity, estimated_price FROM pantry"
+            """SELECT p.name, p.quantity, p.estimated_price, s.name AS store_name
+               FROM pantry p LEFT JOIN stores s ON p.preferred_store_id = s.id
+               ORDER BY p.id"""
         ).fetchall()
-        pantry_qty = {row["name"].lower().strip(): (row["quantity"] or 0) for row in pantry_rows}
         # Staples where user says "I have it" (need_to_buy=0) are excluded from shopping list
         staple_rows = conn.execute(
             "SELECT name FROM staples WHERE need_to_buy = 0"
         ).fetchall()
-        staple_names = {row["name"].lower().strip() for row in staple_rows}
-        # Pantry prices as fallback (keyed by name_lower only)
-        pantry_prices: dict[str, float] = {}
-        for row in pantry_rows:
-            if row["estimated_price"] is not None:
-                pantry_prices[row["name"].lower().strip()] = row["estimated_price"]
-
-        # Load known prices (highest priority)
         known_price_rows = conn.execute(
             "SELECT item_name, unit_price FROM known_prices"
         ).fetchall()
-        known_prices = {
-            row["item_name"].lower().strip(): row["unit_price"]
-            for row in known_price_rows
-        }
+        # Staples that need to be bought, with their preferred store
+        staple_need_rows = conn.execute(
+            """SELECT s.name, st.name as store_name
+               FROM staples s
+               LEFT JOIN stores st ON s.preferred_store_id = st.id
+               WHERE s.need_to_buy = 1"""
+        ).fetchall()
+    finally:
+        conn.close()
+
+    pantry_qty = {row["name"].lower().strip(): (row["quantity"] or 0) for row in pantry_rows}
+    # Pantry prices as fallback (keyed by name_lower only)
+    pantry_prices: dict[str, float] = {}
+    # Preferred store per pantry name (first matching pantry row wins)
+    preferred_store: dict[str, Optional[str]] = {}
+    for row in pantry_rows:
+        name = row["name"].lower().strip()
+        if row["estimated_price"] is not None:
+            pantry_prices[name] = row["estimated_price"]
+        preferred_store.setdefault(name, row["store_name"])
+    return _Lookups(
+        pantry_qty=pantry_qty,
+        pantry_prices=pantry_prices,
+        preferred_store=preferred_store,
+        staple_names={row["name"].lower().strip() for row in staple_rows},
+        # Known prices take priority over recipe and pantry prices
+        known_prices={row["item_name"].lower().strip(): row["unit_price"] for row in known_price_rows},
+        staples_to_buy=[(row["name"], row["store_name"]) for row in staple_need_rows],
+    )
+
+
+def _generate(start_date: str, end_date: str, use_pantry: bool) -> dict[str, list[tuple[str, float, str, Optional[float]]]]:
+    # Aggregate required ingredients across all planned meals
+    # key: (ingredient_name_lower, unit) -> total needed
+    required: dict[tuple[str, str], float] = defaultdict(float)
+    # Track per-ingredient prices from recipe_ingredients (recipe price takes priority)
+    ingredient_prices: dict[tuple[str, str], float] = {}
+
+    conn = get_connection()
+    try:
+        for row in conn.execute(_REQUIRED_SQL, (start_date, end_date)):
+            # SQLite only folds ASCII case; finish with Python's for other letters
+            key = (row["name"].lower(), row["unit"].lower())
+            required[key] += row["needed"] or 0
+            if row["price"] is not None:
+                ingredient_prices.setdefault(key, row["price"])
+
+        if not required:
+            return {}
+
+        # Pantry, staple, and price lookups only change when those tables do
+        (pantry_qty, pantry_prices, preferred_store, staple_names, known_prices,
+         staples_to_buy) = _memoized(_lookups_cache, _load_lookups)
 
         store_items: dict[str, list[tuple[str, float, str, Optional[float]]]] = defaultdict(list)
 
@@ -103,15 +189,7 @@ def generate(start_date: str, end_date: str, use_pantry: bool = True) -> dict[st
             else:
                 buy_qty = needed
 
-            # Look up preferred store for this ingredient
-            store_row = conn.execute(
-                """SELECT s.name as store_name FROM pantry p
-                   LEFT JOIN stores s ON p.preferred_store_id = s.id
-                   WHERE LOWER(p.name) = ?
-                   LIMIT 1""",
-                (ing_name,),
-            ).fetchone()
-            store_name = store_row["store_name"] if store_row and store_row["store_name"] else "No Store Assigned"
+            store_name = preferred_store.get(ing_name) or "No Store Assigned"
 
             # Price resolution: known price > recipe ingredient price > pantry price > None
             unit_price = known_prices.get(ing_name)
@@ -124,31 +202,18 @@ def generate(start_date: str, end_date: str, use_pantry: bool = True) -> dict[st
             display_name = ing_name.title()
             store_items[store_name].append((display_name, round(buy_qty, 2), unit, item_cost))
 
-        # Sort items within each store
-        for store in store_items:
-            store_items[store].sort(key=lambda x: x[0])
-
         # Add staples that need to be bought
-        staple_need_rows = conn.execute(
-            """SELECT s.name, s.category, st.name as store_name
-               FROM staples s
-               LEFT JOIN stores st ON s.preferred_store_id = st.id
-               WHERE s.need_to_buy = 1"""
-        ).fetchall()
-        for row in staple_need_rows:
-            store = row["store_name"] or "Staples"
-            # Check if this staple is already in the list from a recipe
-            staple_lower = row["name"].lower().strip()
-            already_listed = any(
-                item[0].lower().strip() == staple_lower
-                for items in store_items.values()
-                for item in items
-            )
-            if not already_listed:
+        # Names already on the list, so a staple isn't added twice
+        listed = {item[0].lower().strip() for items in store_items.values() for item in items}
+        for staple_name, staple_store in staples_to_buy:
+            store = staple_store or "Staples"
+            staple_lower = staple_name.lower().strip()
+            if staple_lower not in listed:
                 staple_price = known_prices.get(staple_lower)
-                store_items[store].append((row["name"], 0, "", staple_price))
+                store_items[store].append((staple_name, 0, "", staple_price))
+                listed.add(staple_lower)
 
-        # Re-sort after adding staples
+        # Sort items within each store, staples included (one stable pass)
         for store in store_items:
             store_items[store].sort(key=lambda x: x[0])
 
@@ -161,24 +226,24 @@ def get_ingredient_sources(start_date: str, end_date: str) -> dict[str, list[tup
     """Map each ingredient to the recipes that require it.
 
     Returns {ingredient_name_lower: [(recipe_id, recipe_name, date, meal_slot, qty, unit), ...]}
+    Memoized like generate().
     """
+    cached = _memoized(_sources_cache, _get_ingredient_sources, start_date, end_date)
+    return {name: list(uses) for name, uses in cached.items()}
+
+
+def _get_ingredient_sources(start_date: str, end_date: str) -> dict[str, list[tuple[int, str, str, str, float, str]]]:
     entries = get_meals_in_range(start_date, end_date)
     if not entries:
         return {}
 
     sources: dict[str, list[tuple[int, str, str, str, float, str]]] = defaultdict(list)
 
-    for entry in entries:
-        if not entry.recipe_id:
-            continue
-        conn = get_connection()
-        try:
-            ings = conn.execute(
-                """SELECT name, quantity, unit, shopping_name, shopping_qty, shopping_unit
-                   FROM recipe_ingredients WHERE recipe_id = ?""",
-                (entry.recipe_id,),
-            ).fetchall()
-            for ing in ings:
+    conn = get_connection()
+    try:
+        ingredients = _ingredients_by_recipe(conn, entries)
+        for entry in entries:
+            for ing in ingredients.get(entry.recipe_id, ()):
                 key = (ing["shopping_name"] or ing["name"]).lower().strip()
                 qty = (ing["shopping_qty"] if ing["shopping_qty"] is not None else (ing["quantity"] or 0)) * entry.servings
                 unit = (ing["shopping_unit"] or ing["unit"] or "").lower().strip()
@@ -190,23 +255,26 @@ def get_ingredient_sources(start_date: str, end_date: str) -> dict[str, list[tup
                     qty,
                     unit,
                 ))
-        finally:
-            conn.close()
+    finally:
+        conn.close()
 
     return dict(sources)
 
 
-def format_shopping_list(shopping_list: dict[str, list[tuple[str, float, str, Optional[float]]]]) -> str:
-    """Format the shopping list as plain text for export/clipboard, including prices and totals."""
+def iter_shopping_lines(shopping_list: dict[str, list[tuple[str, float, str, Optional[float]]]]) -> Iterator[str]:
+    """Yield the plain-text shopping list one newline-terminated line at a time.
+
+    Used to stream the export; format_shopping_list() joins the same lines.
+    """
     if not shopping_list:
-        return "No items needed."
+        yield "No items needed.\n"
+        return
 
-    lines = []
     grand_total = 0.0
     grand_total_has_items = False
 
     for store, items in sorted(shopping_list.items()):
-        lines.append(f"=== {store} ===")
+        yield f"=== {store} ===\n"
         store_subtotal = 0.0
         store_has_priced = False
 
@@ -219,22 +287,26 @@ def format_shopping_list(shopping_list: dict[str, list[tuple[str, float, str, Op
                 parts.append(f"  ${cost:.2f}")
                 store_subtotal += cost
                 store_has_priced = True
-            lines.append("".join(parts))
+            parts.append("\n")
+            yield "".join(parts)
 
         if store_has_priced:
-            lines.append(f"  Store subtotal: ${store_subtotal:.2f}")
+            yield f"  Store subtotal: ${store_subtotal:.2f}\n"
             grand_total += store_subtotal
             grand_total_has_items = True
-        lines.append("")
+        yield "\n"
 
     if grand_total_has_items:
-        lines.append(f"Estimated total: ${grand_total:.2f}")
+        yield f"Estimated total: ${grand_total:.2f}\n"
 
-    return "\n".join(lines).strip()
+
+def format_shopping_list(shopping_list: dict[str, list[tuple[str, float, str, Optional[float]]]]) -> str:
+    """Format the shopping list as plain text for export/clipboard, including prices and totals."""
+    return "".join(iter_shopping_lines(shopping_list)).strip()
 
 
 def save_cached_list(shopping_data, ingredient_sources, start_date, end_date, use_pantry):
-    """Persist the current shopping list state to the settings table as JSON."""
+    """Persist the current shopping list state to the settings table as compressed JSON."""
     payload = {
         "shopping_data": shopping_data,
         "ingredient_sources": ingredient_sources,
@@ -242,7 +314,8 @@ def save_cached_list(shopping_data, ingredient_sources, start_date, end_date, us
         "end_date": end_date,
         "use_pantry": use_pantry,
     }
-    set_setting(_CACHE_KEY, json.dumps(payload))
+    text = json.dumps(payload, separators=(",", ":"))
+    set_setting(_CACHE_KEY, _CACHE_MAGIC + zlib.compress(text.encode(), 1))
 
 
 def load_cached_list() -> Optional[dict]:
@@ -255,6 +328,8 @@ def load_cached_list() -> Optional[dict]:
     if not raw:
         return None
     try:
+        if isinstance(raw, bytes) and raw.startswith(_CACHE_MAGIC):
+            raw = zlib.decompress(raw[len(_CACHE_MAGIC):])
         data = json.loads(raw)
         # Convert list-of-lists back to list-of-tuples for consistency
         for store in data.get("shopping_data", {}):
@@ -270,7 +345,7 @@ def load_cached_list() -> Optional[dict]:
                 valid_sources[key] = converted
         data["ingredient_sources"] = valid_sources
         return data
-    except (json.JSONDecodeError, KeyError, TypeError):
+    except (json.JSONDecodeError, UnicodeDecodeError, zlib.error, KeyError, TypeError):
         return None
 
 
@@ -4,18 +4,22 @@ Staples are independent of pantry inventory. Each staple has a need_to_buy
 toggle; items marked as needed appear on shopping lists.
 """
 
+from dataclasses import fields
 from typing import Optional
 
 from meal_planner.db.database import get_connection
-from meal_planner.db.models import Staple
+from meal_planner.db.models import Staple, from_row, from_rows
+
+# Staple columns in field order, so rows always take from_rows()'s positional path.
+_COLUMNS = ", ".join(f.name for f in fields(Staple))
 
 
 def get_all() -> list[Staple]:
     """Return all staples sorted by name."""
     conn = get_connection()
     try:
-        rows = conn.execute("SELECT * FROM staples ORDER BY name").fetchall()
-        return [Staple(**dict(row)) for row in rows]
+        rows = conn.execute(f"SELECT {_COLUMNS} FROM staples ORDER BY name").fetchall()
+        return from_rows(Staple, rows)
     finally:
         conn.close()
 
@@ -24,8 +28,8 @@ def get(staple_id: int) -> Optional[Staple]:
     """Return a single staple by ID."""
     conn = get_connection()
     try:
-        row = conn.execute("SELECT * FROM staples WHERE id = ?", (staple_id,)).fetchone()
-        return Staple(**dict(row)) if row else None
+        row = conn.execute(f"SELECT {_COLUMNS} FROM staples WHERE id = ?", (staple_id,)).fetchone()
+        return from_row(Staple, row)
     finally:
         conn.close()
 
@@ -35,9 +39,9 @@ def get_by_name(name: str) -> Optional[Staple]:
     conn = get_connection()
     try:
         row = conn.execute(
-            "SELECT * FROM staples WHERE LOWER(name) = LOWER(?)", (name.strip(),)
+            f"SELECT {_COLUMNS} FROM staples WHERE LOWER(name) = LOWER(?)", (name.strip(),)
         ).fetchone()
-        return Staple(**dict(row)) if row else None
+        return from_row(Staple, row)
     finally:
         conn.close()
 
@@ -101,8 +105,8 @@ def get_needed() -> list[Staple]:
     conn = get_connection()
     try:
         rows = conn.execute(
-            "SELECT * FROM staples WHERE need_to_buy = 1 ORDER BY name"
+            f"SELECT {_COLUMNS} FROM staples WHERE need_to_buy = 1 ORDER BY name"
         ).fetchall()
-        return [Staple(**dict(row)) for row in rows]
+        return from_rows(Staple, rows)
     finally:
         conn.close()
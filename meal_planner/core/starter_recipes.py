@@ -402,17 +402,8 @@ def seed_starter_recipes() -> None:
 
     from meal_planner.core import recipes as recipes_core
 
-    for data in STARTER_RECIPES:
-        ingredients = [
-            RecipeIngredient(
-                id=None, recipe_id=None,
-                name=ing["name"],
-                quantity=ing.get("quantity"),
-                unit=ing.get("unit"),
-            )
-            for ing in data["ingredients"]
-        ]
-        recipe = Recipe(
+    recipes_core.add_many([
+        Recipe(
             id=None,
             name=data["name"],
             description=data.get("description"),
@@ -422,6 +413,15 @@ def seed_starter_recipes() -> None:
             instructions=data.get("instructions"),
             tags=data.get("tags"),
             rating=data.get("rating"),
-            ingredients=ingredients,
+            ingredients=[
+                RecipeIngredient(
+                    id=None, recipe_id=None,
+                    name=ing["name"],
+                    quantity=ing.get("quantity"),
+                    unit=ing.get("unit"),
+                )
+                for ing in data["ingredients"]
+            ],
         )
-        recipes_core.add(recipe)
+        for data in STARTER_RECIPES
+    ])
@@ -1,31 +1,67 @@
 """Store management — CRUD operations for the stores table.
 
 Stores have a name, optional location, and optional notes.
-Deleting a store nullifies any pantry items that reference it.
+Deleting a store nullifies any pantry items, staples, and known prices that
+reference it.
+
+The store list changes rarely but is rendered on nearly every pantry response,
+so get_all() is cached per database file.  Every write to the stores table
+must go through invalidate_cache().
 """
 
+from dataclasses import fields
 from typing import Optional
 
-from meal_planner.db.database import get_connection
-from meal_planner.db.models import Store
+from meal_planner.db.database import get_connection, get_db_path, write_transaction
+from meal_planner.db.models import Store, from_row
+
+_all_cache: dict[str, list[Store]] = {}
+
+# Store columns in field order, so rows can be passed to Store positionally
+# whatever order older databases' ALTER TABLE migrations left the table in.
+_COLUMNS = ", ".join(f.name for f in fields(Store))
+
+# (table, column) pairs with a foreign key to stores.id
+_STORE_REFERENCES = (
+    ("pantry", "preferred_store_id"),
+    ("staples", "preferred_store_id"),
+    ("known_prices", "store_id"),
+)
+# Built once so delete() reuses the same statement texts (and compiled statements)
+_CLEAR_REFERENCE_SQL = tuple(
+    f"UPDATE {table} SET {column} = NULL WHERE {column} = ?" for table, column in _STORE_REFERENCES
+)
+
+
+def invalidate_cache() -> None:
+    """Drop cached store lists. Call after any write to the stores table."""
+    _all_cache.clear()
 
 
 def get_all() -> list[Store]:
-    """Return all stores sorted alphabetically by name."""
-    conn = get_connection()
-    try:
-        rows = conn.execute("SELECT * FROM stores ORDER BY name").fetchall()
-        return [Store(**dict(row)) for row in rows]
-    finally:
-        conn.close()
+    """Return all stores sorted alphabetically by name.
+
+    The returned Store objects are shared with the cache — treat them as read-only.
+    """
+    key = str(get_db_path())
+    cached = _all_cache.get(key)
+    if cached is None:
+        conn = get_connection()
+        try:
+            rows = conn.execute(f"SELECT {_COLUMNS} FROM stores ORDER BY name")
+            cached = [Store(*row) for row in rows]
+        finally:
+            conn.close()
+        _all_cache[key] = cached
+    return list(cached)
 
 
 def get(store_id: int) -> Optional[Store]:
     """Return a single store by ID, or None if not found."""
     conn = get_connection()
     try:
-        row = conn.execute("SELECT * FROM stores WHERE id = ?", (store_id,)).fetchone()
-        return Store(**dict(row)) if row else None
+        row = conn.execute(f"SELECT {_COLUMNS} FROM stores WHERE id = ?", (store_id,)).fetchone()
+        return from_row(Store, row)
     finally:
         conn.close()
 
@@ -42,6 +78,22 @@ def add(store: Store) -> int:
         return cursor.lastrowid
     finally:
         conn.close()
+        invalidate_cache()
+
+
+def create(name: str, location: Optional[str] = None, notes: Optional[str] = None) -> Store:
+    """Insert a new store and return it as stored (with its new ID)."""
+    conn = get_connection()
+    try:
+        row = conn.execute(
+            f"INSERT INTO stores (name, location, notes) VALUES (?, ?, ?) RETURNING {_COLUMNS}",
+            (name, location, notes),
+        ).fetchone()
+        conn.commit()
+        return from_row(Store, row)
+    finally:
+        conn.close()
+        invalidate_cache()
 
 
 def update(store: Store) -> None:
@@ -55,17 +107,32 @@ def update(store: Store) -> None:
         conn.commit()
     finally:
         conn.close()
+        invalidate_cache()
 
 
-def delete(store_id: int) -> None:
-    """Delete a store by ID. Nullifies pantry items that reference it first."""
+def update_fields(store_id: int, name: str, location: Optional[str], notes: Optional[str]) -> Optional[Store]:
+    """Update a store's fields in place and return the updated row, or None if no store has that ID."""
     conn = get_connection()
     try:
-        conn.execute(
-            "UPDATE pantry SET preferred_store_id = NULL WHERE preferred_store_id = ?",
-            (store_id,),
-        )
-        conn.execute("DELETE FROM stores WHERE id = ?", (store_id,))
+        row = conn.execute(
+            f"UPDATE stores SET name=?, location=?, notes=? WHERE id=? RETURNING {_COLUMNS}",
+            (name, location, notes, store_id),
+        ).fetchone()
         conn.commit()
+        return from_row(Store, row)
+    finally:
+        conn.close()
+        invalidate_cache()
+
+
+def delete(store_id: int) -> None:
+    """Delete a store by ID. Nullifies pantry items, staples, and known prices that reference it first."""
+    conn = get_connection()
+    try:
+        with write_transaction(conn):
+            for sql in _CLEAR_REFERENCE_SQL:
+                conn.execute(sql, (store_id,))
+            conn.execute("DELETE FROM stores WHERE id = ?", (store_id,))
     finally:
         conn.close()
+        invalidate_cache()
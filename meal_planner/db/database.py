@@ -2,16 +2,32 @@
 
 Provides a single-file database at ~/.meal_planner/meal_planner.db.
 Every public function that needs a connection should call get_connection(),
-use it, and close it in a finally block.
+use it, and close it in a finally block.  Each thread keeps one open
+connection per DB path, so close() just hands it back (rolling back anything
+left uncommitted).  Inside a shared_connection() block those calls all reuse
+one connection and close() becomes a no-op.  Cached connections are really
+closed only when replaced (reset_connections()) or at interpreter exit.
 """
 
+import atexit
 import os
 import sqlite3
+import threading
 from contextlib import contextmanager
 from contextvars import ContextVar
+from functools import lru_cache
 from pathlib import Path
 
 _db_path_override: ContextVar["Path | None"] = ContextVar("_db_path_override", default=None)
+_shared_conn: ContextVar["sqlite3.Connection | None"] = ContextVar("_shared_conn", default=None)
+
+# Per-thread cache of open connections: {db path: (generation, connection)}.
+_thread_conns = threading.local()
+_generation = 0
+# Every cached connection still open, across all threads, so they can be
+# closed cleanly at interpreter exit.
+_pooled: set[sqlite3.Connection] = set()
+_pooled_lock = threading.Lock()
 
 
 @contextmanager
@@ -37,13 +53,20 @@ def get_db_path() -> Path:
 
     Priority order:
     1. ContextVar override (used by demo routes per-request)
-    2. DB_PATH environment variable (used by Docker / local dev)
+    2. DB_PATH environment variable (used by Docker / local dev); a value
+       starting with "file:" is opened as an SQLite URI (the tests use an
+       in-memory shared-cache database this way)
     3. Default ~/.meal_planner/meal_planner.db (desktop fallback)
     """
     override = _db_path_override.get()
     if override is not None:
         return override
-    env_url = os.environ.get("DB_PATH")
+    return _configured_db_path(os.environ.get("DB_PATH") or None)
+
+
+@lru_cache(maxsize=4)
+def _configured_db_path(env_url: "str | None") -> Path:
+    # Resolved (and its directory created) once per DB_PATH value, not per call
     if env_url:
         p = Path(env_url)
         p.parent.mkdir(parents=True, exist_ok=True)
@@ -53,24 +76,205 @@ def get_db_path() -> Path:
     return db_dir / "meal_planner.db"
 
 
-def get_connection(db_path: Path = None) -> sqlite3.Connection:
-    """Return a new SQLite connection with Row factory and foreign keys enabled.
+class _BorrowedConnection:
+    """Proxy for the connection owned by shared_connection().
+
+    close() is a no-op so core functions can keep their usual
+    open/use/close pattern; everything else goes to the real connection.
+    """
+
+    __slots__ = ("_conn",)
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def close(self) -> None:
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
 
-    Callers are responsible for closing the connection when done.
+class _PooledConnection(_BorrowedConnection):
+    """Proxy for this thread's cached connection; close() releases it for reuse."""
+
+    __slots__ = ()
+
+    def close(self) -> None:
+        if self._conn.in_transaction:
+            self._conn.rollback()
+
+
+def reset_connections() -> None:
+    """Make every thread reopen its cached connections on next use.
+
+    Call after the DB file is swapped out underneath the app (e.g. the admin
+    migration upload), so no thread keeps reading the replaced file.
     """
-    if db_path is None:
-        db_path = get_db_path()
-    conn = sqlite3.connect(str(db_path))
+    global _generation
+    _generation += 1
+
+
+# Applied to every new connection.  WAL lets readers run alongside a writer
+# and, with synchronous=NORMAL, commits skip the per-transaction fsync of the
+# rollback journal (a crash can lose the last commits but not corrupt the DB).
+_CONNECTION_PRAGMAS = (
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -20000",
+    "PRAGMA mmap_size = 268435456",
+)
+
+
+# Pooled connections live for the whole process, so a statement cache larger
+# than sqlite3's default of 128 keeps every distinct query text the app issues
+# compiled after first use.
+_STATEMENT_CACHE_SIZE = 256
+
+
+def _tune(conn: sqlite3.Connection) -> None:
+    for pragma in _CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+
+
+def _open_connection(db_path: Path, check_same_thread: bool = True) -> sqlite3.Connection:
+    path = str(db_path)
+    conn = sqlite3.connect(path, check_same_thread=check_same_thread,
+                           cached_statements=_STATEMENT_CACHE_SIZE, uri=path.startswith("file:"))
     conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON")
+    _tune(conn)
     return conn
 
 
+@contextmanager
+def write_transaction(conn):
+    """Context manager running the block's writes as one BEGIN IMMEDIATE transaction.
+
+    The write lock is taken up front, so the block can't fail halfway with
+    SQLITE_BUSY.  Commits on success and rolls back on any exception.  If
+    conn is already inside a transaction the block just joins it.
+
+    Example:
+        with write_transaction(conn):
+            conn.execute("UPDATE pantry SET preferred_store_id = NULL WHERE preferred_store_id = ?", (sid,))
+            conn.execute("DELETE FROM stores WHERE id = ?", (sid,))
+    """
+    if conn.in_transaction:
+        yield
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+@contextmanager
+def shared_connection():
+    """Context manager making every get_connection() call in the block reuse one connection.
+
+    The connection targets the DB path active when the block is entered (so
+    enter it inside override_db_path() when both are used).  Nested blocks
+    reuse the outer connection.  Must not span threads.
+
+    Example:
+        with override_db_path(DEMO_DB_PATH), shared_connection():
+            bundle = pantry_core.get_page_bundle()
+            stores = stores_core.get_all()
+    """
+    if _shared_conn.get() is not None:
+        yield
+        return
+    conn = get_connection()
+    token = _shared_conn.set(conn)
+    try:
+        yield
+    finally:
+        _shared_conn.reset(token)
+        conn.close()
+
+
+def get_connection(db_path: Path = None) -> sqlite3.Connection:
+    """Return a SQLite connection with Row factory and foreign keys enabled.
+
+    Callers are responsible for closing the connection when done.  With no
+    explicit db_path this is the calling thread's cached connection to the
+    active DB (see get_db_path()), and close() only rolls back uncommitted
+    work.  Inside a shared_connection() block the shared connection is
+    returned instead.  An explicit db_path always opens a fresh connection.
+    """
+    if db_path is not None:
+        return _open_connection(db_path)
+    shared = _shared_conn.get()
+    if shared is not None:
+        return _BorrowedConnection(shared)
+    db_path = get_db_path()
+    conns = _thread_conns.__dict__
+    key = str(db_path)
+    cached = conns.get(key)
+    if cached is None or cached[0] != _generation:
+        if cached is not None:
+            _discard_pooled(cached[1])
+        # Only this thread uses it; the flag just lets _close_pooled() run at exit.
+        conn = _open_connection(db_path, check_same_thread=False)
+        with _pooled_lock:
+            _pooled.add(conn)
+        cached = conns[key] = (_generation, conn)
+    return _PooledConnection(cached[1])
+
+
+def _discard_pooled(conn: sqlite3.Connection) -> None:
+    with _pooled_lock:
+        _pooled.discard(conn)
+    conn.close()
+
+
+@atexit.register
+def _close_pooled() -> None:
+    """Close every cached connection at shutdown so WAL is checkpointed."""
+    with _pooled_lock:
+        conns = list(_pooled)
+        _pooled.clear()
+    for conn in conns:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+
+# (table, column, type) columns added after the first release; init_db()
+# adds whichever ones an existing database is missing.
+_COLUMN_MIGRATIONS = (
+    ("recipes", "rating", "INTEGER"),
+    ("stores", "location", "TEXT"),
+    ("stores", "notes", "TEXT"),
+    ("pantry", "estimated_price", "REAL"),
+    ("recipe_ingredients", "estimated_price", "REAL"),
+    ("pantry", "is_staple", "INTEGER DEFAULT 0"),
+    ("recipe_ingredients", "shopping_name", "TEXT"),
+    ("recipe_ingredients", "shopping_qty", "REAL"),
+    ("recipe_ingredients", "shopping_unit", "TEXT"),
+    ("recipes", "photo_path", "TEXT"),
+)
+
+# Tables whose writes are counted in change_counter.
+_COUNTED_TABLES = (
+    "stores", "pantry", "recipes", "recipe_ingredients", "meal_plan",
+    "staples", "known_prices",
+)
+
+
 def init_db(db_path: Path = None) -> None:
     """Create all tables if they don't already exist.
 
     Called once at application startup from main.py.
-    Tables: stores, pantry, recipes, recipe_ingredients, meal_plan, settings.
+    Tables: stores, pantry, recipes, recipe_ingredients, meal_plan, settings,
+    staples, known_prices, ai_cache, ingredient_normalization, change_counter,
+    recipes_fts (when FTS5 is available).
     """
     conn = get_connection(db_path)
     cursor = conn.cursor()
@@ -137,6 +341,19 @@ def init_db(db_path: Path = None) -> None:
             value TEXT
         );
 
+        CREATE TABLE IF NOT EXISTS ai_cache (
+            key        TEXT PRIMARY KEY,
+            value      TEXT NOT NULL,
+            created_at INTEGER NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS ingredient_normalization (
+            key           TEXT PRIMARY KEY,
+            shopping_name TEXT NOT NULL,
+            shopping_qty  REAL,
+            shopping_unit TEXT
+        );
+
         CREATE TABLE IF NOT EXISTS staples (
             id                 INTEGER PRIMARY KEY AUTOINCREMENT,
             name               TEXT NOT NULL UNIQUE,
@@ -153,51 +370,139 @@ def init_db(db_path: Path = None) -> None:
             store_id     INTEGER REFERENCES stores(id),
             last_updated TEXT DEFAULT CURRENT_TIMESTAMP
         );
+
+        CREATE INDEX IF NOT EXISTS ix_recipe_ingredients_recipe ON recipe_ingredients(recipe_id);
+        CREATE INDEX IF NOT EXISTS ix_pantry_barcode ON pantry(barcode);
+        CREATE INDEX IF NOT EXISTS ix_pantry_name_brand ON pantry(name, brand);
+        -- Case-insensitive name lookups (staples.get_by_name, recipes.get_ids_by_names)
+        CREATE INDEX IF NOT EXISTS ix_staples_lower_name ON staples(LOWER(name));
+        CREATE INDEX IF NOT EXISTS ix_recipes_lower_name ON recipes(LOWER(name));
+        -- Foreign keys to stores.id, cleared by stores.delete()
+        CREATE INDEX IF NOT EXISTS ix_pantry_preferred_store ON pantry(preferred_store_id);
+        CREATE INDEX IF NOT EXISTS ix_staples_preferred_store ON staples(preferred_store_id);
+        CREATE INDEX IF NOT EXISTS ix_known_prices_store ON known_prices(store_id);
+
+        CREATE TABLE IF NOT EXISTS change_counter (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            n  INTEGER NOT NULL
+        );
+        INSERT OR IGNORE INTO change_counter (id, n) VALUES (1, 0);
     """)
 
     conn.commit()
 
-    # Migrations for existing databases
-    try:
-        conn.execute("ALTER TABLE recipes ADD COLUMN rating INTEGER")
+    # Migrations for existing databases: add any columns older schemas lack
+    # (one PRAGMA per table, then every ALTER in one script and transaction)
+    existing: dict[str, set[str]] = {}
+    for table, _, _ in _COLUMN_MIGRATIONS:
+        if table not in existing:
+            existing[table] = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+    alters = [f"ALTER TABLE {table} ADD COLUMN {col} {col_type};"
+              for table, col, col_type in _COLUMN_MIGRATIONS if col not in existing[table]]
+    if alters:
+        try:
+            conn.executescript("\n".join(["BEGIN IMMEDIATE;", *alters, "COMMIT;"]))
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+
+    # Migrate pantry is_staple items to standalone staples table: the first
+    # pantry row of each name, unless a staple by that name already exists.
+    # (is_staple is guaranteed by the column migrations above.)
+    with write_transaction(conn):
+        conn.execute(
+            """INSERT INTO staples (name, category, preferred_store_id, need_to_buy)
+               SELECT name, category, preferred_store_id, 0 FROM pantry
+               WHERE id IN (SELECT MIN(id) FROM pantry WHERE is_staple = 1 GROUP BY LOWER(name))
+                 AND LOWER(name) NOT IN (SELECT LOWER(name) FROM staples)
+               ORDER BY id"""
+        )
+
+    # known_prices names are unique case-insensitively so upserts can use
+    # ON CONFLICT. Older DBs may hold case-variant duplicates; keep the newest.
+    if not conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'ix_known_prices_lower_name'"
+    ).fetchone():
+        conn.execute(
+            """DELETE FROM known_prices WHERE id NOT IN
+               (SELECT MAX(id) FROM known_prices GROUP BY LOWER(item_name))"""
+        )
+        conn.execute("CREATE UNIQUE INDEX ix_known_prices_lower_name ON known_prices(LOWER(item_name))")
         conn.commit()
-    except sqlite3.OperationalError:
-        pass  # Column already exists
-
-    for col, table, col_type in [
-        ("location", "stores", "TEXT"),
-        ("notes", "stores", "TEXT"),
-        ("estimated_price", "pantry", "REAL"),
-        ("estimated_price", "recipe_ingredients", "REAL"),
-        ("is_staple", "pantry", "INTEGER DEFAULT 0"),
-        ("shopping_name", "recipe_ingredients", "TEXT"),
-        ("shopping_qty", "recipe_ingredients", "REAL"),
-        ("shopping_unit", "recipe_ingredients", "TEXT"),
-        ("photo_path", "recipes", "TEXT"),
-    ]:
+
+    # One meal per (date, slot), enforced so meal writes can upsert.
+    # Older DBs could hold duplicates; keep the newest of each.
+    if not conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'ix_meal_plan_date_slot'"
+    ).fetchone():
+        conn.execute(
+            """DELETE FROM meal_plan WHERE id NOT IN
+               (SELECT MAX(id) FROM meal_plan GROUP BY date, meal_slot)"""
+        )
+        conn.execute("CREATE UNIQUE INDEX ix_meal_plan_date_slot ON meal_plan(date, meal_slot)")
+        conn.commit()
+
+    # Trigram full-text index over recipe name/description/tags for search(),
+    # kept in sync by triggers.  Skipped if this SQLite lacks FTS5.
+    if not conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'recipes_fts'"
+    ).fetchone():
         try:
-            conn.execute(f"ALTER TABLE {table} ADD COLUMN {col} {col_type}")
-            conn.commit()
+            conn.executescript("""
+                CREATE VIRTUAL TABLE recipes_fts USING fts5(
+                    name, description, tags,
+                    content='recipes', content_rowid='id', tokenize='trigram'
+                );
+                INSERT INTO recipes_fts(recipes_fts) VALUES ('rebuild');
+            """)
         except sqlite3.OperationalError:
-            pass  # Column already exists
+            pass  # no FTS5 (or no trigram tokenizer); search() falls back to LIKE
+    if conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'recipes_fts'"
+    ).fetchone():
+        conn.executescript("""
+            CREATE TRIGGER IF NOT EXISTS recipes_fts_ai AFTER INSERT ON recipes BEGIN
+                INSERT INTO recipes_fts(rowid, name, description, tags)
+                VALUES (new.id, new.name, new.description, new.tags);
+            END;
+            CREATE TRIGGER IF NOT EXISTS recipes_fts_ad AFTER DELETE ON recipes BEGIN
+                INSERT INTO recipes_fts(recipes_fts, rowid, name, description, tags)
+                VALUES ('delete', old.id, old.name, old.description, old.tags);
+            END;
+            CREATE TRIGGER IF NOT EXISTS recipes_fts_au AFTER UPDATE ON recipes BEGIN
+                INSERT INTO recipes_fts(recipes_fts, rowid, name, description, tags)
+                VALUES ('delete', old.id, old.name, old.description, old.tags);
+                INSERT INTO recipes_fts(rowid, name, description, tags)
+                VALUES (new.id, new.name, new.description, new.tags);
+            END;
+        """)
+    conn.commit()
 
-    # Migrate pantry is_staple items to standalone staples table
-    try:
-        rows = conn.execute(
-            "SELECT name, category, preferred_store_id FROM pantry WHERE is_staple = 1"
-        ).fetchall()
-        for row in rows:
-            name = row["name"]
-            existing = conn.execute(
-                "SELECT id FROM staples WHERE LOWER(name) = LOWER(?)", (name,)
-            ).fetchone()
-            if not existing:
+    # Any write to the user data tables bumps change_counter (see get_change_count).
+    # One transaction for all of them, rather than an autocommit per trigger.
+    with write_transaction(conn):
+        for table in _COUNTED_TABLES:
+            for op in ("INSERT", "UPDATE", "DELETE"):
                 conn.execute(
-                    "INSERT INTO staples (name, category, preferred_store_id, need_to_buy) VALUES (?, ?, ?, 0)",
-                    (name, row["category"], row["preferred_store_id"]),
+                    f"""CREATE TRIGGER IF NOT EXISTS count_{table}_{op.lower()}
+                        AFTER {op} ON {table}
+                        BEGIN UPDATE change_counter SET n = n + 1 WHERE id = 1; END"""
                 )
-        conn.commit()
-    except sqlite3.OperationalError:
-        pass  # is_staple column may not exist yet on fresh installs
 
     conn.close()
+
+
+def get_change_count() -> "int | None":
+    """Return the active DB's write counter, or None if the DB predates it.
+
+    The counter goes up on every committed write to the user data tables, from
+    any connection or process, so it can key caches of derived data.
+    """
+    conn = get_connection()
+    try:
+        row = conn.execute("SELECT n FROM change_counter WHERE id = 1").fetchone()
+    except sqlite3.OperationalError:
+        return None
+    finally:
+        conn.close()
+    return row[0] if row else None
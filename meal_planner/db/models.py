@@ -1,14 +1,18 @@
 """Dataclass models for all database entities.
 
 Each class maps 1:1 to a database table. Fields use Optional types for
-nullable columns. These are plain data containers with no business logic.
+nullable columns. These are plain data containers with no business logic;
+from_row()/from_rows() build them from query results.
 """
 
-from dataclasses import dataclass, field
-from typing import Optional
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
+from typing import Optional, TypeVar
 
+T = TypeVar("T")
 
-@dataclass
+
+@dataclass(slots=True)
 class Store:
     """A store/shop where ingredients can be purchased."""
     id: Optional[int]
@@ -17,7 +21,7 @@ class Store:
     notes: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class PantryItem:
     """A pantry inventory item, imported from PantryChecker CSV or added manually.
 
@@ -42,7 +46,7 @@ class PantryItem:
     is_staple: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class RecipeIngredient:
     """A single ingredient line within a recipe (e.g. '2 lbs chicken breast')."""
 
@@ -55,9 +59,22 @@ class RecipeIngredient:
     shopping_name: Optional[str] = None
     shopping_qty: Optional[float] = None
     shopping_unit: Optional[str] = None
+    _key: Optional[tuple[str, str]] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def key(self) -> str:
+        """Lowercased, stripped name for matching ingredients by name.
+
+        Computed once per name and kept on the instance; reassigning name
+        recomputes it.
+        """
+        cached = self._key
+        if cached is None or cached[0] is not self.name:
+            cached = self._key = (self.name, self.name.lower().strip())
+        return cached[1]
 
 
-@dataclass
+@dataclass(slots=True)
 class Recipe:
     """A recipe with metadata and an embedded list of RecipeIngredient items.
 
@@ -80,7 +97,7 @@ class Recipe:
     ingredients: list = field(default_factory=list)  # list[RecipeIngredient]
 
 
-@dataclass
+@dataclass(slots=True)
 class MealPlanEntry:
     """A single cell in the meal plan grid: one date + one meal slot.
 
@@ -97,7 +114,7 @@ class MealPlanEntry:
     recipe_name: Optional[str] = None  # Joined from recipes table for display
 
 
-@dataclass
+@dataclass(slots=True)
 class Staple:
     """A staple item the user normally keeps on hand (salt, pepper, oil, etc.).
 
@@ -114,7 +131,7 @@ class Staple:
         self.need_to_buy = bool(self.need_to_buy)
 
 
-@dataclass
+@dataclass(slots=True)
 class KnownPrice:
     """A known grocery price extracted from a receipt or entered manually.
 
@@ -126,3 +143,29 @@ class KnownPrice:
     unit: Optional[str] = None
     store_id: Optional[int] = None
     last_updated: Optional[str] = None
+
+
+@lru_cache(maxsize=None)
+def _is_positional(cls: type, columns: tuple[str, ...]) -> bool:
+    """True if columns are exactly cls's leading fields, in order."""
+    names = tuple(f.name for f in fields(cls) if f.init)
+    return names[:len(columns)] == columns
+
+
+def from_rows(cls: type[T], rows: list) -> list[T]:
+    """Build cls instances from sqlite3.Row results.
+
+    When the query's columns line up with the dataclass fields (the usual
+    SELECT * on a table created in field order) rows are passed positionally;
+    otherwise, e.g. after ALTER TABLE appended a column, by column name.
+    """
+    if not rows:
+        return []
+    if _is_positional(cls, tuple(rows[0].keys())):
+        return [cls(*row) for row in rows]
+    return [cls(**dict(row)) for row in rows]
+
+
+def from_row(cls: type[T], row) -> Optional[T]:
+    """Build one cls instance from a sqlite3.Row, or None if row is None."""
+    return from_rows(cls, [row])[0] if row is not None else None
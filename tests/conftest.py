@@ -1,21 +1,41 @@
 import os
+import sqlite3
 import pytest
 
 
 @pytest.fixture(scope="session", autouse=True)
 def set_test_env(tmp_path_factory):
-    db_file = tmp_path_factory.mktemp("data") / "test.db"
+    # The main test DB lives in memory, shared by every connection in the
+    # process; the anchor connection keeps it alive between pooled ones.
+    db_uri = "file:meal_planner_test?mode=memory&cache=shared"
+    anchor = sqlite3.connect(db_uri, uri=True)
     demo_file = tmp_path_factory.mktemp("demo") / "demo.db"
-    os.environ["DB_PATH"] = str(db_file)
+    os.environ["DB_PATH"] = db_uri
     os.environ["APP_PASSWORD"] = "testpass"
     os.environ["SECRET_KEY"] = "test-secret-key-for-testing"
     os.environ["DEMO_DB_URL"] = str(demo_file)
+    yield
+    anchor.close()
 
 
 @pytest.fixture(scope="session")
-def client(set_test_env):
-    from fastapi.testclient import TestClient
+def app(set_test_env):
+    """The ASGI app, imported once the test environment is in place."""
     from app.main import app
+    return app
+
+
+@pytest.fixture(scope="session")
+def client(app):
+    from fastapi.testclient import TestClient
+    with TestClient(app, raise_server_exceptions=True) as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def demo_client(app):
+    """A second, never-logged-in client shared by the demo tests."""
+    from fastapi.testclient import TestClient
     with TestClient(app, raise_server_exceptions=True) as c:
         yield c
 
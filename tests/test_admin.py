@@ -0,0 +1,47 @@
+def test_migrate_upgrades_a_legacy_database(authed_client, tmp_path, monkeypatch):
+    import sqlite3
+    from meal_planner.config import invalidate_cache as invalidate_settings
+    from meal_planner.core import ai_assistant, meal_plan, recipes as recipes_core, shopping_list
+    from meal_planner.core import stores as stores_core
+    from meal_planner.db.database import init_db, reset_connections
+
+    live = tmp_path / "live.db"
+    legacy = tmp_path / "legacy.db"
+    conn = sqlite3.connect(legacy)
+    conn.executescript("""
+        CREATE TABLE stores (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE);
+        CREATE TABLE recipes (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, description TEXT,
+                              servings INTEGER, prep_time TEXT, cook_time TEXT, instructions TEXT,
+                              source_url TEXT, tags TEXT, created_at TEXT);
+        CREATE TABLE meal_plan (id INTEGER PRIMARY KEY AUTOINCREMENT, date TEXT NOT NULL,
+                                meal_slot TEXT NOT NULL, recipe_id INTEGER, servings INTEGER, notes TEXT);
+        CREATE TABLE settings (key TEXT PRIMARY KEY, value TEXT);
+        INSERT INTO recipes (name) VALUES ('Old Stew');
+    """)
+    conn.commit()
+    conn.close()
+
+    def invalidate_all():
+        reset_connections()
+        for invalidate in (invalidate_settings, stores_core.invalidate_cache, recipes_core.invalidate_cache,
+                           shopping_list.invalidate_cache, ai_assistant.invalidate_cache):
+            invalidate()
+
+    monkeypatch.setenv("DB_PATH", str(live))
+    invalidate_all()
+    try:
+        init_db(live)
+        resp = authed_client.post(
+            "/admin/migrate", files={"db_file": ("old.db", legacy.read_bytes())}, follow_redirects=False,
+        )
+        assert resp.status_code == 303
+        meal_plan.set_meal("2026-01-05", "dinner", 1)
+        meal_plan.set_meal("2026-01-05", "dinner", 1, servings=2)
+        conn = sqlite3.connect(live)
+        try:
+            assert conn.execute("SELECT recipe_id, servings FROM meal_plan").fetchall() == [(1, 2)]
+        finally:
+            conn.close()
+    finally:
+        monkeypatch.undo()
+        invalidate_all()
@@ -1,3 +1,6 @@
+import os
+
+
 def test_login_page_returns_200(client):
     resp = client.get("/login")
     assert resp.status_code == 200
@@ -17,9 +20,8 @@ def test_login_correct_password_redirects_and_sets_cookie(client):
     assert "mp_session" in resp.cookies
 
 
-def test_protected_route_redirects_unauthenticated():
+def test_protected_route_redirects_unauthenticated(app):
     from fastapi.testclient import TestClient
-    from app.main import app
     with TestClient(app, raise_server_exceptions=True, cookies={}) as fresh:
         fresh.cookies.clear()
         resp = fresh.get("/pantry", follow_redirects=False)
@@ -27,10 +29,9 @@ def test_protected_route_redirects_unauthenticated():
     assert "/login" in resp.headers["location"]
 
 
-def test_logout_clears_session():
+def test_logout_clears_session(app):
     # Use an isolated client so logout doesn't pollute the session-scoped authed_client
     from fastapi.testclient import TestClient
-    from app.main import app
     with TestClient(app, raise_server_exceptions=True) as c:
         c.post("/login", data={"password": "testpass"}, follow_redirects=False)
         resp = c.post("/logout", follow_redirects=False)
@@ -39,3 +40,33 @@ def test_logout_clears_session():
     set_cookie = resp.headers.get("set-cookie", "")
     assert "mp_session" in set_cookie
     assert "max-age=0" in set_cookie.lower()
+
+
+def test_session_signer_is_reused_until_key_changes(monkeypatch):
+    from app.dependencies import _get_signer
+    assert _get_signer() is _get_signer()
+    first = _get_signer()
+    monkeypatch.setenv("SECRET_KEY", "another-secret")
+    assert _get_signer() is not first
+
+
+def test_request_today_uses_middleware_stamp():
+    from datetime import date
+    from starlette.requests import Request
+    from app.dependencies import request_today
+    request = Request({"type": "http", "headers": []})
+    request.state.today = date(2026, 1, 5)
+    assert request_today(request) == date(2026, 1, 5)
+    unstamped = Request({"type": "http", "headers": []})
+    assert request_today(unstamped) == date.today()
+
+
+def test_session_token_matches_serializer_format():
+    from itsdangerous import URLSafeTimedSerializer
+    from app.dependencies import create_session_token, verify_session_token
+    serializer = URLSafeTimedSerializer(os.environ["SECRET_KEY"])
+    token = create_session_token()
+    assert serializer.loads(token) == "ok"
+    assert verify_session_token(serializer.dumps("ok"))
+    assert not verify_session_token(serializer.dumps("nope"))
+    assert not verify_session_token("garbage")
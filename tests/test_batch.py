@@ -0,0 +1,29 @@
+def test_batch_runs_writes_before_later_reads(authed_client):
+    resp = authed_client.post("/batch", json={"requests": [
+        {"id": "add", "method": "POST", "url": "/stores/add",
+         "body": {"name": "Batch Market", "location": "", "notes": ""}},
+        {"id": "page", "method": "GET", "url": "/stores"},
+        {"id": "missing", "method": "GET", "url": "/no-such-page"},
+    ]})
+    assert resp.status_code == 200
+    responses = resp.json()["responses"]
+    assert [r["id"] for r in responses] == ["add", "page", "missing"]
+    assert responses[0]["status"] == 200
+    assert responses[1]["status"] == 200 and "Batch Market" in responses[1]["body"]
+    assert responses[2]["status"] == 404
+
+
+def test_batch_rejects_bad_entries(authed_client):
+    assert authed_client.post("/batch", json={"requests": "nope"}).status_code == 422
+    nested = {"requests": [{"method": "POST", "url": "/batch", "body": None}]}
+    assert authed_client.post("/batch", json=nested).status_code == 422
+    absolute = {"requests": [{"method": "GET", "url": "http://example.com/"}]}
+    assert authed_client.post("/batch", json=absolute).status_code == 422
+
+
+def test_batch_sub_requests_still_need_auth(app, client):
+    from fastapi.testclient import TestClient
+    anon = TestClient(app)
+    resp = anon.post("/batch", json={"requests": [{"method": "GET", "url": "/stores"}]},
+                     follow_redirects=False)
+    assert resp.status_code == 302
@@ -0,0 +1,204 @@
+import threading
+
+
+def test_connection_is_reused_per_thread_and_path(tmp_path):
+    from meal_planner.db.database import get_connection, override_db_path
+    with override_db_path(tmp_path / "a.db"):
+        first = get_connection()
+        first.close()
+        assert get_connection()._conn is first._conn
+        other = []
+        worker = threading.Thread(target=lambda: other.append(get_connection()._conn))
+        worker.start()
+        worker.join()
+        assert other[0] is not first._conn
+    with override_db_path(tmp_path / "b.db"):
+        assert get_connection()._conn is not first._conn
+
+
+def test_close_rolls_back_uncommitted_work(tmp_path):
+    from meal_planner.db.database import get_connection, override_db_path
+    with override_db_path(tmp_path / "rollback.db"):
+        conn = get_connection()
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.commit()
+        conn.execute("INSERT INTO t VALUES (1)")
+        conn.close()
+        conn = get_connection()
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+
+def test_reset_connections_reopens(tmp_path):
+    from meal_planner.db.database import get_connection, override_db_path, reset_connections
+    with override_db_path(tmp_path / "reset.db"):
+        before = get_connection()._conn
+        reset_connections()
+        assert get_connection()._conn is not before
+
+
+def test_settings_are_cached_and_kept_current(tmp_path, monkeypatch):
+    from meal_planner import config
+    from meal_planner.db.database import init_db, override_db_path
+    with override_db_path(tmp_path / "settings.db"):
+        init_db()
+        assert config.get_setting("theme", "light") == "light"
+        config.set_setting("theme", "dark")
+        monkeypatch.setattr(config, "get_connection", None)  # reads must not hit the DB
+        assert config.get_setting("theme") == "dark"
+        assert config.get_setting("theme", "light") == "dark"
+
+
+def test_connections_use_wal_and_lookup_indexes_exist(tmp_path):
+    from meal_planner.db.database import get_connection, init_db, override_db_path
+    with override_db_path(tmp_path / "tuned.db"):
+        init_db()
+        conn = get_connection()
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+        plan = " ".join(row["detail"] for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM recipe_ingredients WHERE recipe_id IN (1, 2)"
+        ))
+        assert "ix_recipe_ingredients_recipe" in plan
+        indexes = {row["name"] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {"ix_pantry_barcode", "ix_pantry_name_brand"} <= indexes
+
+
+def test_cached_connections_are_closed_at_exit(tmp_path):
+    import sqlite3
+    import pytest
+    from meal_planner.db import database
+    from meal_planner.db.database import get_connection, override_db_path
+    with override_db_path(tmp_path / "exit.db"):
+        conn = get_connection()._conn
+        assert conn in database._pooled
+        database._close_pooled()
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+        database.reset_connections()
+        assert get_connection().execute("SELECT 1").fetchone()[0] == 1
+
+
+def test_from_rows_builds_models_positionally_or_by_name(tmp_path):
+    from meal_planner.db.database import get_connection, init_db, override_db_path
+    from meal_planner.db.models import PantryItem, Store, from_row, from_rows
+    from meal_planner.core import pantry as pantry_core
+    with override_db_path(tmp_path / "rows.db"):
+        init_db()
+        conn = get_connection()
+        conn.execute("INSERT INTO stores (name, notes) VALUES ('Row Mart', 'n')")
+        conn.commit()
+        rows = conn.execute("SELECT * FROM stores").fetchall()
+        assert from_rows(Store, rows) == [Store(id=1, name="Row Mart", location=None, notes="n")]
+        renamed = conn.execute("SELECT notes, name, id FROM stores").fetchone()
+        assert from_row(Store, renamed) == Store(id=1, name="Row Mart", notes="n")
+        assert from_row(Store, None) is None
+        item_id = pantry_core.add(PantryItem(id=None, name="Row Rice", brand="Acme", is_staple=True))
+        assert pantry_core.get(item_id) == PantryItem(id=item_id, name="Row Rice", brand="Acme", is_staple=True)
+
+
+def test_case_insensitive_name_lookups_use_expression_indexes(tmp_path):
+    from meal_planner.db.database import get_connection, init_db, override_db_path
+    with override_db_path(tmp_path / "names.db"):
+        init_db()
+        conn = get_connection()
+        try:
+            staple_plan = " ".join(row["detail"] for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM staples WHERE LOWER(name) = LOWER(?)", ("salt",)
+            ))
+            recipe_plan = " ".join(row["detail"] for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT id, name FROM recipes WHERE LOWER(name) IN (?, ?) ORDER BY name",
+                ("chili", "soup"),
+            ))
+        finally:
+            conn.close()
+    assert "ix_staples_lower_name" in staple_plan
+    assert "ix_recipes_lower_name" in recipe_plan
+
+
+def test_init_db_adds_missing_columns_to_legacy_tables(tmp_path):
+    import sqlite3
+    from meal_planner.db.database import _COLUMN_MIGRATIONS, init_db
+    db = tmp_path / "legacy_columns.db"
+    conn = sqlite3.connect(db)
+    conn.executescript("""
+        CREATE TABLE stores (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE);
+        CREATE TABLE recipes (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, description TEXT,
+                              servings INTEGER, prep_time TEXT, cook_time TEXT, instructions TEXT,
+                              source_url TEXT, tags TEXT, created_at TEXT);
+        INSERT INTO stores (name) VALUES ('Old Mart');
+    """)
+    conn.commit()
+    conn.close()
+    init_db(db)
+    init_db(db)  # a second run finds nothing to add
+    conn = sqlite3.connect(db)
+    try:
+        for table, col, _ in _COLUMN_MIGRATIONS:
+            assert col in {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        assert conn.execute("SELECT name, location FROM stores").fetchall() == [("Old Mart", None)]
+    finally:
+        conn.close()
+
+
+def test_init_db_moves_pantry_staples_once_per_name(tmp_path):
+    import sqlite3
+    from meal_planner.db.database import init_db
+    db = tmp_path / "staples.db"
+    init_db(db)
+    conn = sqlite3.connect(db)
+    conn.executemany(
+        "INSERT INTO pantry (name, category, is_staple) VALUES (?, ?, ?)",
+        [("Salt", "Spices", 1), ("salt", "Other", 1), ("Flour", "Baking", 1), ("Rice", None, 0), ("Oil", None, 1)],
+    )
+    conn.execute("INSERT INTO staples (name) VALUES ('OIL')")
+    conn.commit()
+    conn.close()
+    init_db(db)
+    init_db(db)
+    conn = sqlite3.connect(db)
+    try:
+        rows = conn.execute("SELECT name, category, need_to_buy FROM staples ORDER BY id").fetchall()
+    finally:
+        conn.close()
+    assert rows == [("OIL", None, 0), ("Salt", "Spices", 0), ("Flour", "Baking", 0)]
+
+
+def test_model_instances_have_no_dict():
+    import dataclasses
+    from meal_planner.db import models
+    classes = [obj for obj in vars(models).values()
+               if isinstance(obj, type) and dataclasses.is_dataclass(obj) and obj.__module__ == models.__name__]
+    assert len(classes) == 7
+    for cls in classes:
+        assert "__slots__" in vars(cls), cls.__name__
+        assert not hasattr(cls.__new__(cls), "__dict__"), cls.__name__
+
+
+def test_column_migrations_are_all_or_nothing(tmp_path, monkeypatch):
+    import sqlite3
+    import pytest
+    from meal_planner.db import database
+    db = tmp_path / "atomic.db"
+    database.init_db(db)
+    monkeypatch.setattr(database, "_COLUMN_MIGRATIONS", database._COLUMN_MIGRATIONS + (
+        ("stores", "phone", "TEXT"),
+        ("no_such_table", "broken", "TEXT"),
+    ))
+    with pytest.raises(sqlite3.OperationalError):
+        database.init_db(db)
+    conn = sqlite3.connect(db)
+    try:
+        assert "phone" not in {row[1] for row in conn.execute("PRAGMA table_info(stores)")}
+    finally:
+        conn.close()
+
+
+def test_db_path_is_resolved_once_per_env_value(tmp_path, monkeypatch):
+    from meal_planner.db.database import get_db_path
+    target = tmp_path / "nested" / "app.db"
+    monkeypatch.setenv("DB_PATH", str(target))
+    assert get_db_path() == target and target.parent.is_dir()
+    target.parent.rmdir()
+    assert get_db_path() is get_db_path()
+    assert not target.parent.exists()  # no mkdir on repeat calls
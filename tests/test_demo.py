@@ -1,74 +1,57 @@
-from fastapi.testclient import TestClient
-
-
-def _fresh_client():
-    from app.main import app
-    return TestClient(app, raise_server_exceptions=True)
-
-
-def test_demo_pantry_accessible_without_auth():
-    with _fresh_client() as c:
-        resp = c.get("/demo/pantry", follow_redirects=False)
+def test_demo_pantry_accessible_without_auth(demo_client):
+    resp = demo_client.get("/demo/pantry", follow_redirects=False)
     assert resp.status_code == 200
 
 
-def test_demo_recipes_accessible_without_auth():
-    with _fresh_client() as c:
-        resp = c.get("/demo/recipes", follow_redirects=False)
+def test_demo_recipes_accessible_without_auth(demo_client):
+    resp = demo_client.get("/demo/recipes", follow_redirects=False)
     assert resp.status_code == 200
 
 
-def test_demo_meal_plan_accessible_without_auth():
-    with _fresh_client() as c:
-        resp = c.get("/demo/meal-plan", follow_redirects=False)
+def test_demo_meal_plan_accessible_without_auth(demo_client):
+    resp = demo_client.get("/demo/meal-plan", follow_redirects=False)
     assert resp.status_code == 200
 
 
-def test_demo_shopping_accessible_without_auth():
-    with _fresh_client() as c:
-        resp = c.get("/demo/shopping", follow_redirects=False)
+def test_demo_shopping_accessible_without_auth(demo_client):
+    resp = demo_client.get("/demo/shopping", follow_redirects=False)
     assert resp.status_code == 200
 
 
-def test_demo_stores_accessible_without_auth():
-    with _fresh_client() as c:
-        resp = c.get("/demo/stores", follow_redirects=False)
+def test_demo_stores_accessible_without_auth(demo_client):
+    resp = demo_client.get("/demo/stores", follow_redirects=False)
     assert resp.status_code == 200
 
 
-def test_demo_shows_banner():
-    with _fresh_client() as c:
-        resp = c.get("/demo/pantry")
+def test_demo_shows_banner(demo_client):
+    resp = demo_client.get("/demo/pantry")
     assert "demo mode" in resp.text.lower()
 
 
-def test_demo_no_write_buttons():
-    with _fresh_client() as c:
-        resp = c.get("/demo/pantry")
+def test_demo_no_write_buttons(demo_client):
+    resp = demo_client.get("/demo/pantry")
     # Write buttons should not appear in demo mode
     assert "Add Item" not in resp.text
     assert "Import CSV" not in resp.text
 
 
-def test_demo_shopping_generate():
-    with _fresh_client() as c:
-        resp = c.post("/demo/shopping/generate", data={
-            "start_date": "2026-02-23",
-            "end_date": "2026-03-01",
-        })
+def test_demo_shopping_generate(demo_client):
+    resp = demo_client.post("/demo/shopping/generate", data={
+        "start_date": "2026-02-23",
+        "end_date": "2026-03-01",
+    })
     assert resp.status_code == 200
 
 
-def test_demo_recipe_detail():
-    with _fresh_client() as c:
-        # Get recipe list first to find an ID
-        list_resp = c.get("/demo/recipes")
-        assert list_resp.status_code == 200
-        # The seeded demo DB should have recipes; just verify the page loads
-        assert "recipes" in list_resp.text.lower() or "spaghetti" in list_resp.text.lower()
+def test_demo_recipe_detail(demo_client):
+    # Get recipe list first to find an ID
+    list_resp = demo_client.get("/demo/recipes")
+    assert list_resp.status_code == 200
+    # The seeded demo DB should have recipes; just verify the page loads
+    assert "recipes" in list_resp.text.lower() or "spaghetti" in list_resp.text.lower()
 
 
-def test_demo_does_not_affect_main_db(authed_client):
+def test_demo_does_not_affect_main_db(authed_client, demo_client):
     # Add something to the main DB
     r = authed_client.post("/recipes/add", data={
         "name": "Main DB Recipe",
@@ -78,8 +61,80 @@ def test_demo_does_not_affect_main_db(authed_client):
     assert r.status_code == 303
 
     # Demo DB should not show the main DB recipe (they're separate DBs)
-    with _fresh_client() as c:
-        demo_r = c.get("/demo/recipes")
+    demo_r = demo_client.get("/demo/recipes")
     assert demo_r.status_code == 200
     # The main DB recipe should not show up in demo
     # (demo has seeded recipes like "Spaghetti Bolognese")
+
+
+def test_demo_pages_are_memoized(monkeypatch, demo_client):
+    from app.routers import demo
+    first = demo_client.get("/demo/stores")
+    assert first.status_code == 200
+
+    def _fail():
+        raise AssertionError("demo stores should be served from cache")
+    monkeypatch.setattr(demo.stores_core, "get_all", _fail)
+    second = demo_client.get("/demo/stores")
+    assert second.status_code == 200
+    assert second.text == first.text
+
+
+def test_shared_connection_reuses_one_connection(tmp_path):
+    from meal_planner.db.database import get_connection, init_db, override_db_path, shared_connection
+    from meal_planner.core import stores as stores_core
+    from meal_planner.db.models import Store
+    with override_db_path(tmp_path / "shared.db"), shared_connection():
+        init_db()
+        first = get_connection()
+        first.close()  # no-op for the borrowed connection
+        second = get_connection()
+        assert first._conn is second._conn
+        stores_core.add(Store(id=None, name="Shared Store"))
+        assert [s.name for s in stores_core.get_all()] == ["Shared Store"]
+    with override_db_path(tmp_path / "shared.db"):
+        assert [s.name for s in stores_core.get_all()] == ["Shared Store"]
+
+
+def test_demo_db_path_is_reused_until_env_changes(monkeypatch):
+    from app.routers.demo import _demo_db_path
+    assert _demo_db_path() is _demo_db_path()
+    monkeypatch.setenv("DEMO_DB_URL", "elsewhere.db")
+    assert str(_demo_db_path()) == "elsewhere.db"
+
+
+def test_seed_skips_loading_data_when_already_seeded(tmp_path, monkeypatch):
+    from meal_planner.db.database import init_db, override_db_path
+    from meal_planner.core import meal_plan as mp_core, recipes as recipes_core
+    from demo import seed
+    with override_db_path(tmp_path / "seed.db"):
+        init_db()
+        seed.seed_if_empty()
+        names = [r.name for r in recipes_core.get_all()]
+        assert "Spaghetti Bolognese" in names and len(names) == 6
+        week = mp_core.get_week(mp_core.get_week_start())
+        assert len(week.entries) == 21
+
+        def _fail():
+            raise AssertionError("seed data should not be loaded for a seeded DB")
+        monkeypatch.setattr(seed, "load_seed_data", _fail)
+        seed.seed_if_empty()
+
+
+def test_memoize_html_evicts_safely_under_concurrent_fills():
+    from concurrent.futures import ThreadPoolExecutor
+    from types import SimpleNamespace
+    from fastapi.responses import HTMLResponse
+    from app.caching import memoize_html
+
+    @memoize_html(60, max_entries=4)
+    def page(request):
+        return HTMLResponse(request.url.query)
+
+    def fetch(i):
+        url = SimpleNamespace(path="/demo/x", query=f"q={i}")
+        return page(request=SimpleNamespace(url=url, state=SimpleNamespace())).body
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        bodies = list(pool.map(fetch, range(200)))
+    assert bodies == [f"q={i}".encode() for i in range(200)]
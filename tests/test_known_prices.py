@@ -79,10 +79,151 @@ def test_prices_import_save_skips_unchecked(authed_client):
     assert prices_core.get_by_name("Cheese") is None
 
 
-def test_demo_stores_shows_price_book():
-    from fastapi.testclient import TestClient
-    from app.main import app
-    with TestClient(app, raise_server_exceptions=True) as c:
-        resp = c.get("/demo/stores")
+def test_demo_stores_shows_price_book(demo_client):
+    resp = demo_client.get("/demo/stores")
     assert resp.status_code == 200
     assert "price book" in resp.text.lower() or "prices" in resp.text.lower()
+
+
+def test_bulk_upsert_matches_names_case_insensitively(authed_client):
+    prices_core.upsert("Case Butter", 3.0, "lb")
+    assert prices_core.bulk_upsert([
+        {"item_name": " case butter ", "unit_price": 3.5, "unit": "lb"},
+        {"item_name": "Case Jam", "unit_price": 2.25},
+    ]) == 2
+    names = [p.item_name for p in prices_core.get_all() if p.item_name.lower().startswith("case ")]
+    assert names == ["Case Butter", "Case Jam"]
+    assert prices_core.get_by_name("CASE BUTTER").unit_price == 3.5
+
+
+def test_init_db_dedupes_known_prices_before_indexing(tmp_path):
+    import sqlite3
+    from meal_planner.db.database import init_db
+    db = tmp_path / "legacy.db"
+    conn = sqlite3.connect(db)
+    conn.execute("""CREATE TABLE known_prices (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    item_name TEXT NOT NULL UNIQUE, unit_price REAL NOT NULL, unit TEXT,
+                    store_id INTEGER, last_updated TEXT)""")
+    conn.executemany("INSERT INTO known_prices (item_name, unit_price) VALUES (?, ?)",
+                     [("Milk", 1.0), ("milk", 2.0)])
+    conn.commit()
+    conn.close()
+    init_db(db)
+    conn = sqlite3.connect(db)
+    assert conn.execute("SELECT item_name, unit_price FROM known_prices").fetchall() == [("milk", 2.0)]
+    conn.close()
+
+
+def test_get_by_name_uses_lower_name_index(authed_client):
+    from meal_planner.db.database import get_connection
+    conn = get_connection()
+    try:
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM known_prices WHERE LOWER(item_name) = LOWER(?)",
+            ("milk",),
+        ).fetchall()
+    finally:
+        conn.close()
+    assert any("ix_known_prices_lower_name" in row["detail"] for row in plan)
+
+
+def test_receipt_image_block_encodes_file(tmp_path):
+    import base64
+    from meal_planner.core.ai_assistant import _image_block
+    photo = tmp_path / "receipt.JPG"
+    photo.write_bytes(b"\xff\xd8receipt-bytes\xff\xd9")
+    block = _image_block(str(photo))
+    assert block["source"]["media_type"] == "image/jpeg"
+    assert base64.b64decode(block["source"]["data"]) == photo.read_bytes()
+    empty = tmp_path / "empty.png"
+    empty.write_bytes(b"")
+    assert _image_block(str(empty))["source"] == {"type": "base64", "media_type": "image/png", "data": ""}
+
+
+def test_parse_receipt_image_sends_one_request_per_receipt(tmp_path, monkeypatch):
+    from types import SimpleNamespace
+    from meal_planner.core import ai_assistant
+    calls = []
+
+    class FakeAsyncClient:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def create(self, **kwargs):
+            calls.append(kwargs)
+            (image,) = kwargs["messages"][0]["content"]
+            name = image["source"]["media_type"].split("/")[1]
+            text = '```json\n[{"item_name": "%s", "price": 3.0, "quantity": 2}]\n```' % name
+            return SimpleNamespace(content=[SimpleNamespace(text=text)])
+
+    fake = FakeAsyncClient()
+    fake.messages = fake
+    monkeypatch.setattr(ai_assistant, "_get_async_client", lambda: fake)
+    paths = []
+    for name in ("a.jpg", "b.png"):
+        (tmp_path / name).write_bytes(b"img")
+        paths.append(str(tmp_path / name))
+    items = ai_assistant.parse_receipt_image(paths)
+    assert len(calls) == 2
+    assert all(c["system"][0]["cache_control"] == {"type": "ephemeral"} for c in calls)
+    assert [i["item_name"] for i in items] == ["jpeg", "png"]
+    assert items[0]["unit_price"] == 1.5
+
+
+def test_receipt_items_drop_malformed_lines():
+    from meal_planner.core.ai_assistant import _receipt_items
+    text = '''```json
+[
+  {"item_name": " whole milk ", "price": 4.99},
+  {"item_name": "", "price": 1.0},
+  {"item_name": "eggs", "price": -2, "quantity": 1},
+  {"item_name": "bread", "price": 3.0, "quantity": 0},
+  {"item_name": "butter", "price": "6.98", "quantity": "2"},
+  {"item_name": "jam", "price": "n/a"},
+  "TAX 0.52"
+]
+```'''
+    assert _receipt_items(text) == [
+        {"item_name": "whole milk", "total_price": 4.99, "quantity": 1, "unit_price": 4.99},
+        {"item_name": "butter", "total_price": 6.98, "quantity": 2, "unit_price": 3.49},
+    ]
+
+
+def _fake_receipt_client(monkeypatch, text):
+    from types import SimpleNamespace
+    from meal_planner.core import ai_assistant
+
+    class FakeAsyncClient:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def create(self, **kwargs):
+            return SimpleNamespace(content=[SimpleNamespace(text=text)])
+
+    fake = FakeAsyncClient()
+    fake.messages = fake
+    monkeypatch.setattr(ai_assistant, "_get_async_client", lambda: fake)
+
+
+def test_parse_receipt_image_returns_no_items_for_unparseable_reply(tmp_path, monkeypatch):
+    from meal_planner.core import ai_assistant
+    _fake_receipt_client(monkeypatch, "no receipt here")
+    photo = tmp_path / "ok.jpg"
+    photo.write_bytes(b"img")
+    assert ai_assistant.parse_receipt_image([str(photo)]) == []
+
+
+def test_parse_receipt_image_raises_for_a_missing_photo(tmp_path, monkeypatch):
+    import pytest
+    from meal_planner.core import ai_assistant
+    _fake_receipt_client(monkeypatch, "no receipt here")
+    photo = tmp_path / "ok.jpg"
+    photo.write_bytes(b"img")
+    with pytest.raises(FileNotFoundError):
+        ai_assistant.parse_receipt_image([str(photo), str(tmp_path / "missing.jpg")])
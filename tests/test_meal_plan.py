@@ -32,7 +32,8 @@ def test_meal_set_and_clear(authed_client):
         "notes": "Leftovers",
         "week": "2026-03-09",
     })
-    assert set_resp.status_code == 200
+    assert set_resp.status_code == 204
+    assert set_resp.headers["hx-trigger"] == "meal-grid-changed"
 
     # Grid should show the entry
     grid_resp = authed_client.get("/meal-plan/grid?week=2026-03-09")
@@ -45,7 +46,8 @@ def test_meal_set_and_clear(authed_client):
         "slot": "Lunch",
         "week": "2026-03-09",
     })
-    assert clear_resp.status_code == 200
+    assert clear_resp.status_code == 204
+    assert "Leftovers" not in authed_client.get("/meal-plan/grid?week=2026-03-09").text
 
 
 def test_meal_set_with_recipe(authed_client):
@@ -66,5 +68,85 @@ def test_meal_set_with_recipe(authed_client):
         "notes": "",
         "week": "2026-03-09",
     })
-    assert set_resp.status_code == 200
-    assert "Meal Plan Test Recipe" in set_resp.text
+    assert set_resp.status_code == 204
+    grid_resp = authed_client.get("/meal-plan/grid?week=2026-03-09")
+    assert "Meal Plan Test Recipe" in grid_resp.text
+
+
+def test_meal_ai_apply_matches_saved_recipes_by_name(authed_client):
+    add_resp = authed_client.post("/recipes/add", data={
+        "name": "Apply Match Chili",
+        "servings": "4",
+        "ingredient_name_0": "Beans",
+    }, follow_redirects=False)
+    recipe_id = int(add_resp.headers["location"].split("/")[-1])
+
+    resp = authed_client.post("/meal-plan/ai/apply", data={
+        "week": "2026-04-06",
+        "sug_day_0": "Monday", "sug_slot_0": "Dinner", "sug_meal_0": "apply match chili",
+        "sug_day_1": "Tuesday", "sug_slot_1": "Lunch", "sug_meal_1": "Eat out",
+    })
+    assert resp.status_code == 200
+
+    from meal_planner.core import meal_plan as mp_core
+    from datetime import date
+    grid = mp_core.get_week(date(2026, 4, 6))
+    assert grid.get("2026-04-06", "Dinner").recipe_id == recipe_id
+    assert grid.get("2026-04-07", "Lunch").recipe_id is None
+    assert grid.get("2026-04-07", "Lunch").notes == "Eat out"
+    assert grid.to_grid()["2026-04-07"]["Lunch"] == grid.get("2026-04-07", "Lunch")
+    assert grid.to_grid()["2026-04-08"] == dict.fromkeys(mp_core.MEAL_SLOTS)
+
+
+def test_meal_plan_grid_etag_returns_304(authed_client):
+    first = authed_client.get("/meal-plan/grid?week=2026-05-04")
+    assert first.status_code == 200
+    resp = authed_client.get("/meal-plan/grid?week=2026-05-04",
+                             headers={"If-None-Match": first.headers["etag"]})
+    assert resp.status_code == 304
+
+
+def test_meal_ai_apply_tolerates_index_gaps(authed_client):
+    resp = authed_client.post("/meal-plan/ai/apply", data={
+        "week": "2026-04-20",
+        "sug_day_0": "Monday", "sug_slot_0": "Breakfast", "sug_meal_0": "Toast",
+        "sug_day_2": "Wednesday", "sug_slot_2": "Dinner", "sug_meal_2": "Pizza night",
+    })
+    assert resp.status_code == 200
+    assert "Toast" in resp.text
+    assert "Pizza night" in resp.text
+
+
+def test_week_start_iso_matches_get_week_start():
+    from datetime import date
+    from meal_planner.core import meal_plan as mp_core
+    assert mp_core.week_start_iso(date(2026, 3, 12)) == "2026-03-09"
+    assert mp_core.week_start_iso(date(2026, 3, 9)) == "2026-03-09"
+
+
+def test_set_meals_upserts_and_clears_in_order(authed_client):
+    from meal_planner.core import meal_plan as mp_core
+    mp_core.set_meals([
+        ("2027-03-01", "Lunch", None, 1, "Leftovers"),
+        ("2027-03-01", "Dinner", None, 1, "Eat out"),
+        ("2027-03-01", "Lunch", None, 2, "Soup"),
+        ("2027-03-01", "Dinner", None, 1, None),
+    ])
+    meals = mp_core.get_meals_in_range("2027-03-01", "2027-03-01")
+    assert [(m.meal_slot, m.notes, m.servings) for m in meals] == [("Lunch", "Soup", 2)]
+    mp_core.clear_meal("2027-03-01", "Lunch")
+    assert mp_core.get_meals_in_range("2027-03-01", "2027-03-01") == []
+
+
+def test_week_query_is_an_ordered_index_range_scan(authed_client):
+    from meal_planner.core.meal_plan import _MEALS_IN_RANGE_SQL
+    from meal_planner.db.database import get_connection
+    conn = get_connection()
+    try:
+        plan = [row["detail"] for row in conn.execute(
+            "EXPLAIN QUERY PLAN " + _MEALS_IN_RANGE_SQL, ("2026-03-02", "2026-03-08"),
+        )]
+    finally:
+        conn.close()
+    assert any("ix_meal_plan_date_slot" in d for d in plan)
+    assert not any("TEMP B-TREE" in d for d in plan)
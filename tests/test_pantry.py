@@ -1,3 +1,6 @@
+import pytest
+
+
 def test_pantry_page_returns_200(authed_client):
     resp = authed_client.get("/pantry")
     assert resp.status_code == 200
@@ -22,8 +25,9 @@ def test_pantry_add_saves_item(authed_client):
         "best_by": "", "preferred_store_id": "", "barcode": "",
         "product_notes": "", "item_notes": "", "estimated_price": "",
     })
-    assert resp.status_code == 200
-    assert "Test Apple" in resp.text
+    assert resp.status_code == 204
+    assert resp.headers["hx-trigger"] == "pantry-rows-changed"
+    assert "Test Apple" in authed_client.get("/pantry/rows").text
 
 
 def test_pantry_delete_returns_empty(authed_client):
@@ -39,3 +43,172 @@ def test_pantry_delete_returns_empty(authed_client):
 def test_pantry_filter_rows(authed_client):
     resp = authed_client.get("/pantry/rows?location=Fridge")
     assert resp.status_code == 200
+
+
+def test_pantry_refresh_after_add_keeps_the_active_filter(authed_client):
+    import re
+    page = authed_client.get("/pantry").text
+    include = re.search(r'hx-trigger="pantry-rows-changed[^"]*"\s+hx-include="([^"]+)"', page).group(1)
+    ids = [sel.lstrip("#") for sel in include.split(",")]
+    assert ids == ["pantry-filter-location", "pantry-filter-category"]
+    # The add dialog's own location/category fields are not picked up
+    dialog = authed_client.get("/pantry/add").text
+    assert not any(f'id="{i}"' in dialog for i in ids)
+
+    resp = authed_client.post("/pantry/add", data={"name": "Frozen Peas", "location": "Freezer", "category": "Veg"})
+    assert resp.headers["hx-trigger"] == "pantry-rows-changed"
+    # The refresh sends only the filter controls' values (here: Fridge, all categories)
+    rows = authed_client.get("/pantry/rows", params={"location": "Fridge", "category": ""}).text
+    assert "Frozen Peas" not in rows
+
+
+def test_pantry_page_bundle_matches_individual_queries(authed_client):
+    from meal_planner.core import pantry as pantry_core
+    authed_client.post("/pantry/add", data={
+        "name": "Bundle Milk", "location": "Fridge", "category": "Dairy", "quantity": "1",
+    })
+    bundle = pantry_core.get_page_bundle(location="Fridge")
+    assert [i.id for i in bundle.items] == [i.id for i in pantry_core.get_all(location="Fridge")]
+    assert bundle.locations == pantry_core.get_locations()
+    assert bundle.categories == pantry_core.get_categories()
+    assert bundle.expiring_ids == pantry_core.get_expiring_ids(7)
+    rows_only = pantry_core.get_page_bundle(with_filters=False)
+    assert rows_only.locations == [] and rows_only.categories == []
+
+
+def test_pantry_expiring_ids_match_expiring_items(authed_client):
+    from datetime import date, timedelta
+    from meal_planner.core import pantry as pantry_core
+    from meal_planner.db.models import PantryItem
+    soon = pantry_core.add(PantryItem(id=None, name="Soon Spinach",
+                                      best_by=(date.today() + timedelta(days=2)).isoformat()))
+    later = pantry_core.add(PantryItem(id=None, name="Later Rice",
+                                       best_by=(date.today() + timedelta(days=60)).isoformat()))
+    ids = pantry_core.get_expiring_ids(7)
+    assert soon in ids and later not in ids
+    assert ids == {i.id for i in pantry_core.get_expiring_soon(7)}
+
+
+def test_pantry_rows_etag_returns_304_until_data_changes(authed_client):
+    first = authed_client.get("/pantry/rows")
+    etag = first.headers["etag"]
+    again = authed_client.get("/pantry/rows", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.text == ""
+    authed_client.post("/pantry/add", data={"name": "ETag Pear", "quantity": "1"})
+    changed = authed_client.get("/pantry/rows", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert "ETag Pear" in changed.text
+
+
+def test_pantry_import_csv_upload(authed_client):
+    from meal_planner.core import pantry as pantry_core
+    csv_text = (
+        "﻿Name,Brand,Category,Location,Quantity,Unit,Store,Barcode\n"
+        "Imported Lentils,Acme,Dry Goods,Pantry,2,bags,Import Mart,\n"
+        ",Nameless,,,,,,\n"
+    )
+    resp = authed_client.post("/pantry/import", files={
+        "file": ("pantry.csv", csv_text.encode("utf-8"), "text/csv"),
+    })
+    assert resp.status_code == 200
+    assert "Imported: 1 new items, 0 updated." in resp.text
+    item = next(i for i in pantry_core.get_all() if i.name == "Imported Lentils")
+    assert item.quantity == 2
+    assert any(s.name == "Import Mart" for s in pantry_core.get_all_stores())
+
+
+def test_pantry_import_matches_barcode_then_name_and_brand(authed_client):
+    import io
+    from meal_planner.core import pantry as pantry_core
+    from meal_planner.db.models import PantryItem
+    by_barcode = pantry_core.add(PantryItem(id=None, name="Old Oats", barcode="IMP-001"))
+    unbranded = pantry_core.add(PantryItem(id=None, name="Imp Rice", quantity=1))
+    csv_text = (
+        "Name,Brand,Quantity,Barcode,Store\n"
+        "Rolled Oats,Quaker,3,IMP-001,Imp Store A\n"
+        "Imp Rice,Lundberg,4,,Imp Store B\n"
+        "Imp Beans,,1,,\n"
+        "Imp Beans,,5,,Imp Store A\n"
+    )
+    inserted, updated = pantry_core.import_csv_stream(io.BytesIO(csv_text.encode()))
+    assert (inserted, updated) == (1, 3)
+    oats, rice = pantry_core.get(by_barcode), pantry_core.get(unbranded)
+    assert (oats.name, oats.brand, oats.quantity) == ("Rolled Oats", "Quaker", 3)
+    assert (rice.brand, rice.quantity) == ("Lundberg", 4)
+    beans = [i for i in pantry_core.get_all() if i.name == "Imp Beans"]
+    assert len(beans) == 1 and beans[0].quantity == 5
+    stores = {s.id: s.name for s in pantry_core.get_all_stores()}
+    assert stores[beans[0].preferred_store_id] == "Imp Store A"
+    assert stores[rice.preferred_store_id] == "Imp Store B"
+
+
+def test_pantry_csv_rows_tolerate_reordered_missing_and_short_columns():
+    import io
+    from meal_planner.core.pantry import _csv_fields, _csv_rows
+    text = io.StringIO("Quantity,Name,Store\n 3 , Short Rye ,Bakery\n\n,Only Name\n")
+    rows = list(_csv_rows(text))
+    assert [r[0] for r in rows] == ["Short Rye", "", "Only Name"]
+    fields, store = _csv_fields(rows[0])
+    assert (fields["name"], fields["quantity"], fields["brand"], store) == ("Short Rye", 3.0, None, "Bakery")
+    fields, store = _csv_fields(rows[2])
+    assert (fields["quantity"], store) == (1.0, "")
+
+
+def test_pantry_edit_updates_only_changed_fields(authed_client):
+    from meal_planner.core import pantry as pantry_core
+    from meal_planner.db.models import PantryItem
+    item_id = pantry_core.add(PantryItem(
+        id=None, name="Edit Me", category="Snacks", quantity=2.0, stocked_date="2026-01-01",
+    ))
+    resp = authed_client.post(f"/pantry/{item_id}/edit", data={
+        "name": "Edited", "category": "Snacks", "quantity": "2",
+    })
+    assert resp.status_code == 204
+    item = pantry_core.get(item_id)
+    assert item.name == "Edited"
+    assert item.category == "Snacks"
+    assert item.stocked_date == "2026-01-01"
+    with pytest.raises(ValueError):
+        pantry_core.update_partial(item_id, {"id": 5})
+
+
+def test_pantry_add_rejects_missing_name_and_bad_numbers(authed_client):
+    assert authed_client.post("/pantry/add", data={"quantity": "1"}).status_code == 422
+    resp = authed_client.post("/pantry/add", data={"name": "Bad Qty", "quantity": "lots"})
+    assert resp.status_code == 422
+
+
+def test_ai_pantry_summary_is_reused_until_pantry_changes(authed_client, monkeypatch):
+    from meal_planner.core import ai_assistant, pantry as pantry_core
+    from meal_planner.db.models import PantryItem
+    first = ai_assistant._get_pantry_summary()
+    monkeypatch.setattr(ai_assistant, "_build_pantry_summary", lambda: pytest.fail("should be memoized"))
+    assert ai_assistant._get_pantry_summary() == first
+    monkeypatch.undo()
+    pantry_core.add(PantryItem(id=None, name="Summary Saffron", quantity=1, unit="jar"))
+    assert "Summary Saffron" in ai_assistant._get_pantry_summary()
+
+
+def test_ai_pantry_summary_groups_names_by_category(authed_client, monkeypatch):
+    from meal_planner.core import ai_assistant, pantry as pantry_core
+    from meal_planner.db.models import PantryItem
+    pantry_core.add(PantryItem(id=None, name="Zz Sumac", brand="Acme", quantity=2, unit="jar", category="Zz Spices"))
+    pantry_core.add(PantryItem(id=None, name="Zz Allspice", category="Zz Spices"))
+    summary = ai_assistant._build_pantry_summary()
+    assert "Zz Spices: Zz Allspice, Zz Sumac" in summary.splitlines()
+    assert "Acme" not in summary and "Acme" in ai_assistant._build_pantry_summary(detailed=True)
+
+    monkeypatch.setattr(ai_assistant, "_PANTRY_SUMMARY_LIMIT", 30)
+    capped = ai_assistant._compact_pantry_lines([("Dairy", ["milk", "butter", "cheddar"]), ("Produce", ["kale"])])
+    assert capped == "Dairy: milk, butter, cheddar\n(+1 more)"
+
+
+def test_iter_all_yields_get_all_items_lazily(authed_client):
+    from meal_planner.core import pantry as pantry_core
+    from meal_planner.db.models import PantryItem
+    pantry_core.add(PantryItem(id=None, name="Iter Oats", quantity=1, category="Iter Grains", location="Iter Shelf"))
+    items = pantry_core.iter_all(category="Iter Grains")
+    assert not isinstance(items, list)
+    assert list(items) == pantry_core.get_all(category="Iter Grains")
+    assert [i.name for i in pantry_core.get_all(location="Iter Shelf")] == ["Iter Oats"]
@@ -147,10 +147,12 @@ def test_recipe_ai_modify_form(authed_client):
     assert "instruction" in resp.text.lower() or "modify" in resp.text.lower()
 
 
-def test_add_recipe_with_photo(authed_client, tmp_path):
+def test_add_recipe_with_photo(authed_client, tmp_path, monkeypatch):
     """Adding a recipe with a photo file saves the photo_path on the recipe."""
     import io
     from PIL import Image
+    from app.routers import recipes as recipes_router
+    monkeypatch.setattr(recipes_router, "_UPLOADS_DIR", tmp_path)
     img = Image.new("RGB", (100, 100), color=(200, 100, 50))
     buf = io.BytesIO()
     img.save(buf, format="JPEG")
@@ -167,10 +169,8 @@ def test_add_recipe_with_photo(authed_client, tmp_path):
     recipes = recipes_core.get_all()
     recipe = next((r for r in recipes if r.name == "Photo Recipe"), None)
     assert recipe is not None
-    # If upload dir doesn't exist in test env, photo_path may be None — that's acceptable
-    # but if it is set, it must be a plausible path
-    if recipe.photo_path:
-        assert "Photo_Recipe" in recipe.photo_path or str(recipe.id) in recipe.photo_path
+    assert recipe.photo_path == f"/static/uploads/recipes/{recipe.id}.jpg"
+    assert (tmp_path / f"{recipe.id}.jpg").exists()
 
 
 def test_recipe_photo_path(tmp_path):
@@ -230,3 +230,321 @@ def test_recipe_list_search_empty_hides_seed_button(authed_client):
     assert resp.status_code == 200
     assert "Load starter recipes" not in resp.text
     assert "No recipes found" in resp.text
+
+
+def test_recipe_from_form_orders_ingredients_and_skips_gaps():
+    from starlette.datastructures import FormData
+    from app.routers.recipes import _recipe_from_form
+    form = FormData([
+        ("name", "Form Soup"), ("servings", "2"),
+        ("ingredient_name_10", "Salt"), ("ingredient_qty_10", ""),
+        ("ingredient_name_2", "Flour"), ("ingredient_qty_2", "2"), ("ingredient_unit_2", "cup"),
+        ("ingredient_name_5", "  "), ("not_ingredient_name_3", "Nope"),
+    ])
+    recipe = _recipe_from_form(form, recipe_id=7)
+    assert (recipe.id, recipe.name, recipe.servings) == (7, "Form Soup", 2)
+    assert [(i.name, i.quantity, i.unit) for i in recipe.ingredients] == [
+        ("Flour", 2.0, "cup"), ("Salt", None, None),
+    ]
+
+
+def test_parse_recipe_text_reuses_cached_response(authed_client, monkeypatch):
+    from types import SimpleNamespace
+    from meal_planner.core import ai_assistant, ai_cache
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        text = '```json\n{"name": "Cached Stew", "ingredients": [{"name": "beef"}]}\n```'
+        return SimpleNamespace(content=[SimpleNamespace(text=text)])
+
+    fake = SimpleNamespace(messages=SimpleNamespace(create=create))
+    monkeypatch.setattr(ai_assistant, "_get_client", lambda: fake)
+    ai_cache.clear()
+    first = ai_assistant.parse_recipe_text("Cached Stew:  beef, water")
+    second = ai_assistant.parse_recipe_text("cached stew: beef,   water ")
+    assert first.name == second.name == "Cached Stew"
+    assert len(calls) == 1
+    # The schema lives in the cacheable system prefix, not the per-call message
+    assert calls[0]["system"][0]["cache_control"] == {"type": "ephemeral"}
+    assert ai_assistant.RECIPE_SCHEMA in calls[0]["system"][0]["text"]
+    assert ai_assistant.RECIPE_SCHEMA not in calls[0]["messages"][0]["content"]
+
+
+def test_ai_cache_put_purges_expired_entries(authed_client):
+    import time
+    from meal_planner.core import ai_cache
+    from meal_planner.db.database import get_connection
+    ai_cache.clear()
+    conn = get_connection()
+    try:
+        conn.execute(
+            "INSERT INTO ai_cache (key, value, created_at) VALUES (?, ?, ?)",
+            ("text:stale", "old", int(time.time()) - ai_cache.DEFAULT_TTL - 60),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    ai_cache.put("text:fresh", "new")
+    conn = get_connection()
+    try:
+        keys = [r["key"] for r in conn.execute("SELECT key FROM ai_cache")]
+    finally:
+        conn.close()
+    assert keys == ["text:fresh"]
+
+
+def test_canonical_url_drops_tracking_and_fragment():
+    from meal_planner.core.ai_cache import canonical_url
+    assert canonical_url("HTTPS://Example.com/soup/?utm_source=x&b=2&a=1#step") == \
+        "https://example.com/soup?a=1&b=2"
+
+
+def test_recipe_list_cache_and_etag_follow_writes(authed_client):
+    from meal_planner.core import recipes as recipes_core
+    assert recipes_core.get_all() == recipes_core.get_all()
+    first = authed_client.get("/recipes/list")
+    etag = first.headers["etag"]
+    assert authed_client.get("/recipes/list", headers={"If-None-Match": etag}).status_code == 304
+    authed_client.post("/recipes/add", data={"name": "Cache Buster Pie"}, follow_redirects=False)
+    assert "Cache Buster Pie" in [r.name for r in recipes_core.get_all()]
+    resp = authed_client.get("/recipes/list", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert "Cache Buster Pie" in resp.text
+
+
+def test_add_many_returns_ids_in_order(authed_client):
+    from meal_planner.core import recipes as recipes_core
+    from meal_planner.db.models import Recipe, RecipeIngredient
+    ids = recipes_core.add_many([
+        Recipe(id=None, name="Bulk One", ingredients=[
+            RecipeIngredient(id=None, recipe_id=None, name="flour", quantity=2, unit="cups"),
+        ]),
+        Recipe(id=None, name="Bulk Two", ingredients=[
+            RecipeIngredient(id=None, recipe_id=None, name="sugar", quantity=1, unit="cup"),
+            RecipeIngredient(id=None, recipe_id=None, name="eggs", quantity=3, unit="whole"),
+        ]),
+    ])
+    first, second = (recipes_core.get(i) for i in ids)
+    assert first.name == "Bulk One" and [i.name for i in first.ingredients] == ["flour"]
+    assert second.name == "Bulk Two" and [i.name for i in second.ingredients] == ["sugar", "eggs"]
+
+
+def test_update_returns_stored_recipe(authed_client):
+    from meal_planner.core import recipes as recipes_core
+    from meal_planner.db.models import Recipe, RecipeIngredient
+    recipe_id = recipes_core.add(Recipe(id=None, name="Returning Stew"))
+    updated = recipes_core.update(Recipe(id=recipe_id, name="Returning Stew v2", ingredients=[
+        RecipeIngredient(id=None, recipe_id=None, name="carrot", quantity=2, unit="whole"),
+    ]))
+    assert updated.name == "Returning Stew v2"
+    assert [(i.name, i.recipe_id) for i in updated.ingredients] == [("carrot", recipe_id)]
+    assert updated.ingredients[0].id is not None
+    assert recipes_core.update(Recipe(id=999999, name="Ghost")) is None
+
+
+def test_static_partials_are_rendered_once(authed_client):
+    from app.routers import recipes as recipes_router
+    recipes_router._render_ingredient_row.cache_clear()
+    first = authed_client.get("/recipes/ingredient-row?index=7")
+    second = authed_client.get("/recipes/ingredient-row?index=7")
+    assert first.text == second.text and 'name="ingredient_name_7"' in first.text
+    info = recipes_router._render_ingredient_row.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+
+def test_recipe_detail_revalidates_until_edited(authed_client):
+    from meal_planner.core import recipes as recipes_core
+    from meal_planner.db.models import Recipe
+    recipe_id = recipes_core.add(Recipe(id=None, name="Cached Detail"))
+    etag = authed_client.get(f"/recipes/{recipe_id}").headers["etag"]
+    assert authed_client.get(f"/recipes/{recipe_id}", headers={"If-None-Match": etag}).status_code == 304
+    recipes_core.update(Recipe(id=recipe_id, name="Cached Detail v2"))
+    fresh = authed_client.get(f"/recipes/{recipe_id}", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200 and "Cached Detail v2" in fresh.text
+
+
+def test_bulk_generate_runs_one_request_per_recipe(authed_client, monkeypatch):
+    from types import SimpleNamespace
+    from meal_planner.core import ai_assistant
+    prompts = []
+
+    class FakeAsyncClient:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def create(self, **kwargs):
+            prompt = kwargs["messages"][0]["content"][-1]["text"]
+            prompts.append(prompt)
+            if "Recipe 2 of" in prompt:
+                text = "Sorry, I can't help with that."
+            else:
+                text = '```json\n{"name": "Bulk %d", "ingredients": []}\n```' % len(prompts)
+            return SimpleNamespace(content=[SimpleNamespace(text=text)])
+
+    fake = FakeAsyncClient()
+    fake.messages = fake
+    monkeypatch.setattr(ai_assistant, "_get_async_client", lambda: fake)
+    recipes = ai_assistant.bulk_generate_recipes(3)
+    assert len(prompts) == 3 and len(set(prompts)) == 3
+    assert len(recipes) == 2
+
+
+def test_bulk_generate_raises_api_errors(authed_client, monkeypatch):
+    import anthropic
+    import httpx
+    import pytest
+    from meal_planner.core import ai_assistant
+
+    class FakeAsyncClient:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def create(self, **kwargs):
+            request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+            raise anthropic.AuthenticationError(
+                "invalid x-api-key", response=httpx.Response(401, request=request), body=None)
+
+    fake = FakeAsyncClient()
+    fake.messages = fake
+    monkeypatch.setattr(ai_assistant, "_get_async_client", lambda: fake)
+    with pytest.raises(anthropic.AuthenticationError):
+        ai_assistant.bulk_generate_recipes(2)
+
+
+def test_page_text_strips_markup():
+    from meal_planner.core.ai_assistant import _page_text
+    html = ("<html><head><style>p{}</style><SCRIPT>var x;</SCRIPT></head><body>"
+            "<nav>Home | About</nav><h1>Soup</h1>\n<p>Boil  water</p><footer>(c) 2026</footer></body></html>")
+    assert _page_text(html) == "Soup Boil water"
+    assert _page_text("<p>" + "a" * 50 + "</p>", limit=10) == "a" * 10 + "..."
+
+
+def test_recipe_page_is_fetched_once_for_parse_and_og_image(monkeypatch):
+    import httpx
+    from meal_planner.core import ai_assistant
+    requests = []
+
+    def handler(request):
+        requests.append(str(request.url))
+        if request.url.path == "/img.jpg":
+            return httpx.Response(200, content=b"jpeg-bytes")
+        return httpx.Response(200, text='<meta property="og:image" content="https://cook.test/img.jpg"><p>Stew</p>')
+
+    monkeypatch.setattr(ai_assistant, "_HTTP", httpx.Client(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(ai_assistant, "_page_cache", {})
+    assert ai_assistant._fetch_page("https://cook.test/stew") == ai_assistant._fetch_page("https://cook.test/stew")
+    assert ai_assistant.fetch_og_image("https://cook.test/stew") == b"jpeg-bytes"
+    assert requests == ["https://cook.test/stew", "https://cook.test/img.jpg"]
+
+
+def test_recipe_page_cache_expires(monkeypatch):
+    import httpx
+    from meal_planner.core import ai_assistant
+    pages = iter(["<p>Old stew</p>", "<p>New stew</p>"])
+    handler = lambda request: httpx.Response(200, text=next(pages))
+    monkeypatch.setattr(ai_assistant, "_HTTP", httpx.Client(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(ai_assistant, "_page_cache", {})
+    clock = [1000.0]
+    monkeypatch.setattr(ai_assistant.time, "monotonic", lambda: clock[0])
+    assert ai_assistant._fetch_page("https://cook.test/stew") == "<p>Old stew</p>"
+    clock[0] += ai_assistant._PAGE_TTL + 1
+    assert ai_assistant._fetch_page("https://cook.test/stew") == "<p>New stew</p>"
+
+
+def test_parse_recipe_json_applies_schema_defaults():
+    from meal_planner.core.ai_assistant import _parse_recipe_json
+    recipe = _parse_recipe_json('```json\n{"rating": "9", "ingredients": [{"name": "salt"}, "junk"]}\n```')
+    assert (recipe.name, recipe.servings, recipe.rating) == ("Untitled Recipe", 4, 5)
+    assert [i.name for i in recipe.ingredients] == ["salt"]
+    assert _parse_recipe_json("[1, 2]") is None
+    recipe = _parse_recipe_json('{"servings": "6", "ingredients": [{"name": "a", "quantity": "1.5"}, {"name": "b", "quantity": "a pinch"}]}')
+    assert recipe.servings == 6
+    assert [i.quantity for i in recipe.ingredients] == [1.5, None]
+    assert _parse_recipe_json('{"servings": "several"}').servings == 4
+    assert _parse_recipe_json("not json") is None
+
+
+def test_anthropic_client_reused_until_key_changes(monkeypatch):
+    from meal_planner.core import ai_assistant
+    key = ["sk-one"]
+    monkeypatch.setattr(ai_assistant, "_get_api_key", lambda: key[0])
+    ai_assistant.invalidate_client()
+    first = ai_assistant._get_client()
+    assert ai_assistant._get_client() is first
+    key[0] = "sk-two"
+    second = ai_assistant._get_client()
+    assert second is not first and second.api_key == "sk-two"
+    ai_assistant.invalidate_cache()
+    assert ai_assistant._get_client() is not second
+    ai_assistant.invalidate_client()
+
+
+def test_modify_recipe_carries_prices_forward_by_ingredient_key(authed_client, monkeypatch):
+    from types import SimpleNamespace
+    from meal_planner.core import ai_assistant
+    from meal_planner.db.models import Recipe, RecipeIngredient
+    text = '```json\n{"name": "Keyed Chili v2", "ingredients": [{"name": "Black Beans "}, {"name": "tofu"}]}\n```'
+    monkeypatch.setattr(ai_assistant, "_get_client", lambda: SimpleNamespace(messages=SimpleNamespace(
+        create=lambda **kw: SimpleNamespace(content=[SimpleNamespace(text=text)]))))
+    original = Recipe(id=None, name="Keyed Chili", ingredients=[
+        RecipeIngredient(id=None, recipe_id=None, name="black beans", estimated_price=1.25),
+    ])
+    modified = ai_assistant.modify_recipe(original, "swap the beef for tofu")
+    assert [(i.key, i.estimated_price) for i in modified.ingredients] == [("black beans", 1.25), ("tofu", None)]
+    ing = modified.ingredients[1]
+    ing.name = " Silken TOFU"
+    assert ing.key == "silken tofu"
+
+
+def test_search_and_unnormalized_load_ingredients_per_recipe(authed_client):
+    from meal_planner.core import recipes as recipes_core
+    from meal_planner.db.models import Recipe, RecipeIngredient
+    raw_id, normalized_id = recipes_core.add_many([
+        Recipe(id=None, name="Bulkload Raw", ingredients=[
+            RecipeIngredient(id=None, recipe_id=None, name="raw a"),
+            RecipeIngredient(id=None, recipe_id=None, name="raw b"),
+        ]),
+        Recipe(id=None, name="Bulkload Normalized", ingredients=[
+            RecipeIngredient(id=None, recipe_id=None, name="norm a", shopping_name="norm a"),
+        ]),
+    ])
+    found = {r.id: [i.name for i in r.ingredients] for r in recipes_core.search("Bulkload")}
+    assert found == {raw_id: ["raw a", "raw b"], normalized_id: ["norm a"]}
+    pending = [r for r in recipes_core.get_unnormalized_recipes() if r.name.startswith("Bulkload")]
+    assert [(r.id, len(r.ingredients)) for r in pending] == [(raw_id, 2)]
+
+
+def test_seed_starter_recipes_fills_an_empty_library(tmp_path):
+    from meal_planner.core import recipes as recipes_core
+    from meal_planner.core.starter_recipes import STARTER_RECIPES, seed_starter_recipes
+    from meal_planner.db.database import init_db, override_db_path
+    with override_db_path(tmp_path / "starter.db"):
+        init_db()
+        seed_starter_recipes()
+        seed_starter_recipes()
+        recipes = recipes_core.get_all()
+        assert len(recipes) == len(STARTER_RECIPES)
+        assert sum(len(r.ingredients) for r in recipes) == sum(len(d["ingredients"]) for d in STARTER_RECIPES)
+
+
+def test_search_uses_trigram_index_and_follows_edits(authed_client):
+    from meal_planner.core import recipes as recipes_core
+    from meal_planner.db.models import Recipe
+    recipe_id = recipes_core.add(Recipe(id=None, name="Ftsabc Chowder", description='The "best" corn', tags="soup"))
+    assert [r.id for r in recipes_core.search("ftsABC")] == [recipe_id]
+    assert [r.id for r in recipes_core.search('"best" CORN')] == [recipe_id]
+    saved = recipes_core.get(recipe_id)
+    saved.name = "Ftsxyz Chowder"
+    recipes_core.update(saved)
+    assert recipes_core.search("ftsabc") == []
+    assert [r.id for r in recipes_core.search("Ftsxyz")] == [recipe_id]
+    assert recipe_id in [r.id for r in recipes_core.search("Ft")]  # below trigram length: LIKE
+    recipes_core.delete(recipe_id)
+    assert recipes_core.search("Ftsxyz") == []
@@ -30,3 +30,248 @@ def test_shopping_export(authed_client):
     })
     assert resp.status_code == 200
     assert "text/plain" in resp.headers["content-type"]
+
+
+def test_format_shopping_list_matches_streamed_lines():
+    from meal_planner.core.shopping_list import format_shopping_list, iter_shopping_lines
+    shopping = {
+        "Costco": [("rice", 2.0, "lbs", 3.5), ("beans", 0, "", None)],
+        "Aldi": [("milk", 1.0, "gal", None)],
+    }
+    text = format_shopping_list(shopping)
+    assert text == (
+        "=== Aldi ===\n  [ ] milk — 1 gal\n\n"
+        "=== Costco ===\n  [ ] rice — 2 lbs  $3.50\n  [ ] beans\n  Store subtotal: $3.50\n\n"
+        "Estimated total: $3.50"
+    )
+    assert "".join(iter_shopping_lines(shopping)).strip() == text
+    assert format_shopping_list({}) == "No items needed."
+
+
+def test_generate_is_memoized_until_data_changes(authed_client, monkeypatch):
+    from meal_planner.core import meal_plan as mp_core, recipes as recipes_core, shopping_list
+    from meal_planner.db.models import Recipe, RecipeIngredient
+    recipe_id = recipes_core.add(Recipe(id=None, name="Memo Toast", ingredients=[
+        RecipeIngredient(id=None, recipe_id=None, name="Memo Bread", quantity=2, unit="slices"),
+    ]))
+    mp_core.set_meal("2027-01-05", "Breakfast", recipe_id)
+    first = shopping_list.generate("2027-01-04", "2027-01-10", use_pantry=False)
+    assert any(item[0] == "Memo Bread" for items in first.values() for item in items)
+
+    calls = []
+    real = shopping_list._generate
+    monkeypatch.setattr(shopping_list, "_generate", lambda *a: calls.append(a) or real(*a))
+    assert shopping_list.generate("2027-01-04", "2027-01-10", use_pantry=False) == first
+    assert calls == []
+
+    mp_core.set_meal("2027-01-05", "Breakfast", None)
+    assert shopping_list.generate("2027-01-04", "2027-01-10", use_pantry=False) == {}
+    assert len(calls) == 1
+
+
+def test_generate_aggregates_recipes_and_groups_by_preferred_store(authed_client):
+    from meal_planner.core import meal_plan as mp_core, pantry as pantry_core, recipes as recipes_core
+    from meal_planner.core import shopping_list, stores as stores_core
+    from meal_planner.db.models import PantryItem, Recipe, RecipeIngredient, Store
+    store_id = stores_core.add(Store(id=None, name="Agg Grocer"))
+    pantry_core.add(PantryItem(id=None, name="Agg Flour", quantity=1, preferred_store_id=store_id))
+    pancakes, waffles = recipes_core.add_many([
+        Recipe(id=None, name="Agg Pancakes", ingredients=[
+            RecipeIngredient(id=None, recipe_id=None, name="Agg Flour", quantity=2, unit="cups"),
+        ]),
+        Recipe(id=None, name="Agg Waffles", ingredients=[
+            RecipeIngredient(id=None, recipe_id=None, name="agg flour", quantity=1, unit="cups"),
+            RecipeIngredient(id=None, recipe_id=None, name="Agg Syrup", quantity=1, unit="bottle"),
+        ]),
+    ])
+    mp_core.set_meals([
+        ("2027-02-01", "Breakfast", pancakes, 2, None),
+        ("2027-02-02", "Breakfast", waffles, 1, None),
+    ])
+    result = shopping_list.generate("2027-02-01", "2027-02-07")
+    assert ("Agg Flour", 4, "cups", None) in result["Agg Grocer"]
+    assert ("Agg Syrup", 1, "bottle", None) in result["No Store Assigned"]
+    sources = shopping_list.get_ingredient_sources("2027-02-01", "2027-02-07")
+    assert [(s[1], s[4]) for s in sources["agg flour"]] == [("Agg Pancakes", 4), ("Agg Waffles", 1)]
+    mp_core.set_meals([("2027-02-01", "Breakfast", None, 1, None), ("2027-02-02", "Breakfast", None, 1, None)])
+
+
+def test_generate_sums_shopping_fields_and_carries_recipe_price(authed_client):
+    from meal_planner.core import meal_plan as mp_core, recipes as recipes_core, shopping_list
+    from meal_planner.db.models import Recipe, RecipeIngredient
+    recipe_id = recipes_core.add(Recipe(id=None, name="Sum Chili", ingredients=[
+        RecipeIngredient(id=None, recipe_id=None, name="30oz black beans, drained", quantity=30, unit="oz",
+                         shopping_name="Sum Beans", shopping_qty=2, shopping_unit="Cans", estimated_price=1.5),
+        RecipeIngredient(id=None, recipe_id=None, name="Sum Beans", quantity=1, unit="cans", shopping_name=""),
+    ]))
+    mp_core.set_meals([("2027-03-01", "Dinner", recipe_id, 2, None)])
+    result = shopping_list.generate("2027-03-01", "2027-03-07", use_pantry=False)
+    assert result["No Store Assigned"] == [("Sum Beans", 6, "cans", 9.0)]
+    mp_core.set_meal("2027-03-01", "Dinner", None)
+
+
+def test_needed_staples_are_listed_once(authed_client):
+    from meal_planner.core import meal_plan as mp_core, recipes as recipes_core, shopping_list
+    from meal_planner.core import staples as staples_core
+    from meal_planner.db.models import Recipe, RecipeIngredient, Staple
+    recipe_id = recipes_core.add(Recipe(id=None, name="Staple Soup", ingredients=[
+        RecipeIngredient(id=None, recipe_id=None, name="Listed Stock", quantity=1, unit="qt"),
+    ]))
+    for name in ("listed stock", "Needed Cumin", "needed cumin"):
+        staples_core.set_need_to_buy(staples_core.add(Staple(id=None, name=name)), True)
+    mp_core.set_meal("2027-04-01", "Dinner", recipe_id)
+    names = [item[0].lower() for items in shopping_list.generate("2027-04-01", "2027-04-07").values()
+             for item in items]
+    assert names.count("listed stock") == 1 and names.count("needed cumin") == 1
+    mp_core.set_meal("2027-04-01", "Dinner", None)
+    for staple in staples_core.get_all():
+        if staple.name.lower() in ("listed stock", "needed cumin"):
+            staples_core.delete(staple.id)
+
+
+def test_ingredient_sources_are_memoized_until_data_changes(authed_client, monkeypatch):
+    from meal_planner.core import meal_plan as mp_core, recipes as recipes_core, shopping_list
+    from meal_planner.db.models import Recipe, RecipeIngredient
+    recipe_id = recipes_core.add(Recipe(id=None, name="Memo Sources", ingredients=[
+        RecipeIngredient(id=None, recipe_id=None, name="Memo Leek", quantity=1),
+    ]))
+    mp_core.set_meal("2027-05-03", "Lunch", recipe_id)
+    first = shopping_list.get_ingredient_sources("2027-05-03", "2027-05-09")
+    assert [s[1] for s in first["memo leek"]] == ["Memo Sources"]
+    first["memo leek"].clear()  # callers get their own lists
+
+    calls = []
+    real = shopping_list._get_ingredient_sources
+    monkeypatch.setattr(shopping_list, "_get_ingredient_sources", lambda *a: calls.append(a) or real(*a))
+    assert len(shopping_list.get_ingredient_sources("2027-05-03", "2027-05-09")["memo leek"]) == 1
+    assert calls == []
+    mp_core.set_meal("2027-05-03", "Lunch", None)
+    assert shopping_list.get_ingredient_sources("2027-05-03", "2027-05-09") == {}
+    assert len(calls) == 1
+
+
+def test_week_defaults_cover_monday_to_sunday():
+    from datetime import date
+    from app.routers.shopping import _week_defaults
+    assert _week_defaults(date(2026, 3, 12)) == ("2026-03-09", "2026-03-15")
+    assert _week_defaults(date(2026, 3, 12)) is _week_defaults(date(2026, 3, 12))
+
+
+def test_estimate_prices_keeps_only_requested_items(monkeypatch):
+    from types import SimpleNamespace
+    from meal_planner.core import ai_assistant
+    prompts = []
+
+    def create(**kwargs):
+        prompts.append(kwargs["messages"][0]["content"])
+        text = '```json\n{"Milk": 3.49, "eggs": 0, "caviar": 99, "bread": "n/a"}\n```'
+        return SimpleNamespace(content=[SimpleNamespace(text=text)])
+
+    monkeypatch.setattr(ai_assistant, "_get_client",
+                        lambda: SimpleNamespace(messages=SimpleNamespace(create=create)))
+    prices = ai_assistant.estimate_prices([("Milk ", 1, "gal"), ("Eggs", 12, ""), ("Bread", 1, "loaf")])
+    assert prices == {"milk": 3.49}
+    assert '"milk": <price per gal>' in prompts[0] and '"eggs": <price per unit>' in prompts[0]
+
+
+def test_normalize_ingredients_only_sends_unseen_ingredients(authed_client, monkeypatch):
+    import json
+    from types import SimpleNamespace
+    from meal_planner.core import ai_assistant
+    from meal_planner.db.models import RecipeIngredient
+    prompts = []
+
+    def create(**kwargs):
+        prompt = kwargs["messages"][0]["content"]
+        prompts.append(prompt)
+        items = [{"index": i, "shopping_name": line.split()[-1] + " (norm)", "shopping_qty": 1, "shopping_unit": "each"}
+                 for i, line in enumerate(prompt.splitlines()[1:])]
+        return SimpleNamespace(content=[SimpleNamespace(text="```json\n%s\n```" % json.dumps(items))])
+
+    monkeypatch.setattr(ai_assistant, "_get_client",
+                        lambda: SimpleNamespace(messages=SimpleNamespace(create=create)))
+
+    def ing(name, qty=None, unit=None):
+        return RecipeIngredient(id=None, recipe_id=None, name=name, quantity=qty, unit=unit)
+
+    first = ai_assistant.normalize_ingredients([ing("Zaatar", 2, "tbsp"), ing("sumac")])
+    assert [r["shopping_name"] for r in first] == ["Zaatar (norm)", "sumac (norm)"]
+    second = ai_assistant.normalize_ingredients([ing("sumac"), ing("ZAATAR ", 2, "TBSP"), ing("nigella"), ing("nigella")])
+    assert [r["shopping_name"] for r in second] == ["sumac (norm)", "Zaatar (norm)", "nigella (norm)", "nigella (norm)"]
+    assert len(prompts) == 2 and len(prompts[1].splitlines()) == 2 and "nigella" in prompts[1]
+
+
+def test_preferred_store_matches_pantry_names_like_ingredients(authed_client):
+    from meal_planner.core import meal_plan as mp_core, pantry as pantry_core, recipes as recipes_core
+    from meal_planner.core import shopping_list, stores as stores_core
+    from meal_planner.db.models import PantryItem, Recipe, RecipeIngredient, Store
+    store_id = stores_core.add(Store(id=None, name="Épicerie"))
+    pantry_core.add(PantryItem(id=None, name=" Crème Fraîche ", quantity=0, preferred_store_id=store_id))
+    recipe_id = recipes_core.add(Recipe(id=None, name="Store Tart", ingredients=[
+        RecipeIngredient(id=None, recipe_id=None, name="CRÈME FRAÎCHE", quantity=1, unit="cup"),
+    ]))
+    mp_core.set_meal("2027-06-01", "Dinner", recipe_id)
+    result = shopping_list.generate("2027-06-01", "2027-06-07")
+    assert [item[0].lower() for item in result["Épicerie"]] == ["crème fraîche"]
+    mp_core.set_meal("2027-06-01", "Dinner", None)
+
+
+def test_cached_list_is_compressed_and_reads_legacy_json(authed_client):
+    import json
+    from meal_planner.config import get_setting, set_setting
+    from meal_planner.core import shopping_list
+    data = {"Aldi": [("milk", 1.0, "gal", 3.5)]}
+    sources = {"milk": [(1, "Latte", "2027-07-01", "Breakfast", 1.0, "gal")]}
+    shopping_list.save_cached_list(data, sources, "2027-07-01", "2027-07-07", True)
+    assert get_setting(shopping_list._CACHE_KEY).startswith(shopping_list._CACHE_MAGIC)
+    loaded = shopping_list.load_cached_list()
+    assert loaded["shopping_data"] == data and loaded["ingredient_sources"] == sources
+    set_setting(shopping_list._CACHE_KEY, json.dumps({"shopping_data": data, "ingredient_sources": sources}))
+    assert shopping_list.load_cached_list()["shopping_data"] == data
+    set_setting(shopping_list._CACHE_KEY, shopping_list._CACHE_MAGIC + b"garbage")
+    assert shopping_list.load_cached_list() is None
+    shopping_list.clear_cached_list()
+
+
+def test_lookups_are_shared_across_ranges_until_data_changes(authed_client, monkeypatch):
+    from meal_planner.core import meal_plan as mp_core, pantry as pantry_core, recipes as recipes_core
+    from meal_planner.core import shopping_list
+    from meal_planner.db.models import PantryItem, Recipe, RecipeIngredient
+    recipe_id = recipes_core.add(Recipe(id=None, name="Lookup Stew", ingredients=[
+        RecipeIngredient(id=None, recipe_id=None, name="Lookup Carrot", quantity=3),
+    ]))
+    mp_core.set_meal("2027-08-02", "Dinner", recipe_id)
+    calls = []
+    real = shopping_list._load_lookups
+    monkeypatch.setattr(shopping_list, "_load_lookups", lambda: calls.append(1) or real())
+    shopping_list.generate("2027-08-02", "2027-08-08", use_pantry=True)
+    shopping_list.generate("2027-08-02", "2027-08-08", use_pantry=False)
+    assert len(calls) == 1
+    pantry_core.add(PantryItem(id=None, name="Lookup Carrot", quantity=2))
+    assert shopping_list.generate("2027-08-02", "2027-08-08")["No Store Assigned"] == [("Lookup Carrot", 1, "", None)]
+    assert len(calls) == 2
+    mp_core.set_meal("2027-08-02", "Dinner", None)
+
+
+def test_warm_generate_runs_only_the_required_query(authed_client):
+    from meal_planner.core import meal_plan as mp_core, recipes as recipes_core, shopping_list
+    from meal_planner.db.database import get_connection
+    from meal_planner.db.models import Recipe, RecipeIngredient
+    recipe_id = recipes_core.add(Recipe(id=None, name="Warm Porridge", ingredients=[
+        RecipeIngredient(id=None, recipe_id=None, name="Warm Oats", quantity=1, unit="cup"),
+    ]))
+    mp_core.set_meal("2027-09-06", "Breakfast", recipe_id)
+    shopping_list.generate("2027-09-06", "2027-09-12")
+    conn = get_connection()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        result = shopping_list.generate("2027-09-06", "2027-09-12", use_pantry=False)
+    finally:
+        conn.set_trace_callback(None)
+        conn.close()
+    assert ("Warm Oats", 1, "cup", None) in result["No Store Assigned"]
+    assert [s for s in statements if "FROM" in s and "change_counter" not in s] == [
+        s for s in statements if "recipe_ingredients" in s]
+    assert len([s for s in statements if "recipe_ingredients" in s]) == 1
+    mp_core.set_meal("2027-09-06", "Breakfast", None)
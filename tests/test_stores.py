@@ -26,3 +26,109 @@ def test_stores_delete_returns_empty(authed_client):
     resp = authed_client.delete(f"/stores/{store.id}")
     assert resp.status_code == 200
     assert resp.text.strip() == ""
+
+
+def test_stores_get_all_cache_invalidated_on_write(authed_client):
+    from meal_planner.core import stores as stores_core
+    from meal_planner.db.models import Store
+    before = stores_core.get_all()
+    store_id = stores_core.add(Store(id=None, name="Cache Check"))
+    assert any(s.id == store_id for s in stores_core.get_all())
+    stores_core.update(Store(id=store_id, name="Cache Check Renamed"))
+    assert any(s.name == "Cache Check Renamed" for s in stores_core.get_all())
+    stores_core.delete(store_id)
+    assert [s.id for s in stores_core.get_all()] == [s.id for s in before]
+
+
+def test_stores_edit_updates_and_404s_for_missing(authed_client):
+    from meal_planner.core import stores as stores_core
+    from meal_planner.db.models import Store
+    store_id = stores_core.add(Store(id=None, name="Edit Target"))
+    resp = authed_client.post(f"/stores/{store_id}/edit", data={"name": "Edited Target", "notes": "n"})
+    assert resp.status_code == 200
+    assert "Edited Target" in resp.text
+    assert stores_core.get(store_id).notes == "n"
+    assert authed_client.post("/stores/999999/edit", data={"name": "Ghost"}).status_code == 404
+
+
+def test_stores_add_and_edit_return_only_the_affected_row(authed_client):
+    from meal_planner.core import stores as stores_core
+    from meal_planner.db.models import Store
+    stores_core.add(Store(id=None, name="Bystander Store"))
+    resp = authed_client.post("/stores/add", data={"name": "Single Row Store"})
+    assert "Single Row Store" in resp.text
+    assert "Bystander Store" not in resp.text
+    assert 'hx-swap-oob="delete"' in resp.text
+    store = next(s for s in stores_core.get_all() if s.name == "Single Row Store")
+    resp = authed_client.post(f"/stores/{store.id}/edit", data={"name": "Single Row Renamed"})
+    assert resp.text.count("<tr") == 1
+    assert f'id="store-row-{store.id}"' in resp.text
+
+
+def test_stores_page_revalidates_until_a_store_changes(authed_client):
+    first = authed_client.get("/stores")
+    etag = first.headers["etag"]
+    assert authed_client.get("/stores", headers={"If-None-Match": etag}).status_code == 304
+    authed_client.post("/stores/add", data={"name": "ETag Market", "location": "", "notes": ""})
+    fresh = authed_client.get("/stores", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200 and "ETag Market" in fresh.text
+
+
+def test_delete_clears_every_store_reference_in_one_transaction(authed_client, monkeypatch):
+    import sqlite3
+    import pytest
+    from meal_planner.core import known_prices as prices_core, staples as staples_core, stores as stores_core
+    from meal_planner.db.models import Staple, Store
+    store_id = stores_core.add(Store(id=None, name="Doomed Mart"))
+    staple_id = staples_core.add(Staple(id=None, name="Doomed Salt", preferred_store_id=store_id))
+    prices_core.upsert("Doomed Pepper", 2.5, store_id=store_id)
+
+    monkeypatch.setattr(stores_core, "_CLEAR_REFERENCE_SQL", stores_core._CLEAR_REFERENCE_SQL[:1])
+    with pytest.raises(sqlite3.IntegrityError):
+        stores_core.delete(store_id)
+    assert stores_core.get(store_id) is not None
+    monkeypatch.undo()
+
+    stores_core.delete(store_id)
+    assert stores_core.get(store_id) is None
+    assert staples_core.get(staple_id).preferred_store_id is None
+    assert prices_core.get_by_name("Doomed Pepper").store_id is None
+
+
+def test_stores_read_in_field_order_whatever_the_table_order(tmp_path):
+    import sqlite3
+    from meal_planner.core import stores as stores_core
+    from meal_planner.db.database import init_db, override_db_path
+    from meal_planner.db.models import Store
+    db = tmp_path / "reordered.db"
+    conn = sqlite3.connect(db)
+    conn.execute("CREATE TABLE stores (id INTEGER PRIMARY KEY AUTOINCREMENT, notes TEXT, name TEXT NOT NULL UNIQUE, location TEXT)")
+    conn.execute("INSERT INTO stores (notes, name, location) VALUES ('bulk', 'Warehouse', 'Exit 9')")
+    conn.commit()
+    conn.close()
+    init_db(db)
+    with override_db_path(db):
+        assert stores_core.get_all() == [Store(id=1, name="Warehouse", location="Exit 9", notes="bulk")]
+        assert stores_core.get(1) == stores_core.get_all()[0]
+        assert stores_core.create("Corner", notes="late").notes == "late"
+
+
+def test_store_reference_cleanup_uses_indexes(authed_client):
+    from meal_planner.core.stores import _CLEAR_REFERENCE_SQL
+    from meal_planner.db.database import get_connection
+    conn = get_connection()
+    try:
+        plans = [" ".join(row["detail"] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, (1,)))
+                 for sql in _CLEAR_REFERENCE_SQL]
+    finally:
+        conn.close()
+    assert all("INDEX ix_" in plan for plan in plans), plans
+
+
+def test_page_etags_change_with_the_boot_token(authed_client, monkeypatch):
+    from app import caching
+    first = authed_client.get("/stores").headers["etag"]
+    assert authed_client.get("/stores").headers["etag"] == first
+    monkeypatch.setattr(caching, "_BOOT_TOKEN", "after-upgrade")
+    resp = authed_client.get("/stores", headers={"If-None-Match": first})
+    assert resp.status_code == 200 and resp.headers["etag"] != first
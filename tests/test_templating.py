@@ -0,0 +1,21 @@
+def test_templates_warmed_at_startup(client):
+    from app.templating import templates
+    names = templates.env.list_templates(extensions=["html"])
+    cached = {key[1] for key in templates.env.cache.keys()}
+    assert set(names) <= cached
+
+
+def test_routers_share_one_templates_instance():
+    import importlib
+    from app.templating import templates
+    for name in ("auth", "pantry", "recipes", "meal_plan", "shopping", "stores",
+                 "settings", "demo", "help", "admin", "staples", "known_prices"):
+        module = importlib.import_module(f"app.routers.{name}")
+        assert module.templates is templates
+
+
+def test_templates_use_disk_bytecode_cache():
+    import jinja2
+    from app.templating import templates
+    assert isinstance(templates.env.bytecode_cache, jinja2.FileSystemBytecodeCache)
+    assert templates.env.autoescape